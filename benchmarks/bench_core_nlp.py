@@ -0,0 +1,93 @@
+# =================================================================================================
+# Copyright (C) 2022 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+# Throughput benchmark for npt2.core_nlp: the rate at which the <t> and <name> nodes in the
+# middle of an RFC are annotated by spaCy. Pass --baseline <git revision> to time core_nlp from
+# that revision alongside the current one. Use --model blank:en to time the pipeline mechanics
+# with a tokenizer-only pipeline when no trained model is installed.
+#
+# Usage: python benchmarks/bench_core_nlp.py [--baseline REV] [--model NAME] [--batch-size N]
+#                                            [-j N] [document.xml]
+
+import argparse
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import spacy
+
+import npt2.core_nlp
+
+from npt2.loader_xml import load_xml
+from revisions       import load_source
+from typing          import Dict
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Time npt2.core_nlp over an RFC")
+    ap.add_argument("--baseline",   metavar="REV", help="also time core_nlp from this git revision")
+    ap.add_argument("--model",      default="en_core_web_sm", help="spaCy model to load, or blank:<lang> for a blank pipeline")
+    ap.add_argument("--batch-size", type=int, default=64, help="number of texts per batch")
+    ap.add_argument("-j",           dest="jobs", type=int, default=1, help="number of processes")
+    ap.add_argument("document",     nargs="?", default="examples/rfc/rfc9000/rfc9000.xml", help="XML document to annotate")
+    args = ap.parse_args()
+
+    if args.model.startswith("blank:"):
+        nlp = spacy.blank(args.model[len("blank:"):])
+    else:
+        nlp = spacy.load(args.model)
+    with open(args.document, "rb") as inf:
+        content = inf.read()
+
+    modules : Dict[str, types.ModuleType] = {}
+    if args.baseline is not None:
+        modules[args.baseline] = load_source(args.baseline, "npt2/core_nlp.py")
+    modules["current"] = npt2.core_nlp
+
+    print(f"{'revision':20} {'nodes':>8} {'words':>8} {'seconds':>10} {'nodes/s':>10} {'words/s':>10}")
+    for name, module in modules.items():
+        middle = load_xml(content, cleanup=True).root().child("middle")
+        start  = time.perf_counter()
+        if module is npt2.core_nlp:
+            module.core_nlp(middle, nlp, batch_size=args.batch_size, n_process=args.jobs)
+        else:
+            module.core_nlp(middle, nlp)
+        elapsed = time.perf_counter() - start
+        docs    = [node._meta["spacy-doc"] for node in middle.iter_descendants() if node._meta is not None and "spacy-doc" in node._meta]
+        words   = sum(len(doc) for doc in docs)
+        print(f"{name:20} {len(docs):8} {words:8} {elapsed:10.3f} {len(docs) / elapsed:10.0f} {words / elapsed:10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
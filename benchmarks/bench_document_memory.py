@@ -0,0 +1,95 @@
+# =================================================================================================
+# Copyright (C) 2022 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+# Memory benchmark for npt2.document: the memory allocated for the node trees that
+# npt2.loader_xml.load_xml builds for large RFCs. Pass --baseline <git revision> to measure
+# npt2.document from that revision alongside the current one.
+#
+# Usage: python benchmarks/bench_document_memory.py [--baseline REV] [document.xml ...]
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import npt2.loader_xml
+
+from revisions import load_source
+from typing    import Dict, Tuple
+
+
+def load_revision(revision: str) -> types.ModuleType:
+    # The loader from the revision must build nodes using npt2.document from that revision:
+    current = sys.modules["npt2.document"]
+    sys.modules["npt2.document"] = load_source(revision, "npt2/document.py")
+    try:
+        return load_source(revision, "npt2/loader_xml.py")
+    finally:
+        sys.modules["npt2.document"] = current
+
+
+def measure(module: types.ModuleType, content: bytes) -> Tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    doc = module.load_xml(content)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, 1 + len(doc.root().children(recursive=True))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Measure the memory used by npt2.document trees")
+    ap.add_argument("--baseline", metavar="REV", help="also measure npt2.document from this git revision")
+    ap.add_argument("documents",  nargs="*", default=["examples/rfc9293.xml", "examples/rfc/rfc9000/rfc9000.xml"],
+                    help="XML documents to load")
+    args = ap.parse_args()
+
+    modules : Dict[str, types.ModuleType] = {}
+    if args.baseline is not None:
+        modules[args.baseline] = load_revision(args.baseline)
+    modules["current"] = npt2.loader_xml
+
+    print(f"{'document':36} {'revision':20} {'nodes':>8} {'bytes':>12} {'bytes/node':>12}")
+    for filename in args.documents:
+        with open(filename, "rb") as inf:
+            content = inf.read()
+        for name, module in modules.items():
+            allocated, num_nodes = measure(module, content)
+            print(f"{os.path.basename(filename):36} {name:20} {num_nodes:8} {allocated:12} {allocated / num_nodes:12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
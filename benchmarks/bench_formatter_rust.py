@@ -0,0 +1,103 @@
+# =================================================================================================
+# Copyright (C) 2018-2020 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+
+# Benchmark for npt.formatter_rust: the time to generate the parser for a synthetic struct with
+# thousands of fields, each with a constraint. Pass --baseline <git revision> to time the
+# formatter from that revision alongside the current one.
+#
+# Usage: python benchmarks/bench_formatter_rust.py [--baseline REV] [--fields N] [--repeat N]
+
+import argparse
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import npt.formatter_rust
+
+from npt.protocol import *
+from revisions    import load_source
+from typing       import Dict, Optional
+
+
+def build_struct(fields: int) -> Struct:
+    struct_fields = []
+    constraints : List[Expression] = []
+    for f in range(fields):
+        struct_fields.append(StructField(f"field_{f}", BitString(f"Field{f}", ConstantExpression(Number(), 8))))
+    struct = Struct("Wide", struct_fields, [], [])
+    for f in range(fields):
+        value = MethodInvocationExpression(FieldAccessExpression(SelfExpression(), f"field_{f}"), "to_number", [])
+        struct.add_constraint(MethodInvocationExpression(value, "ne", [ArgumentExpression("other", ConstantExpression(Number(), f))]))
+    return struct
+
+
+def time_formatter(module: types.ModuleType, struct: Struct, repeat: int) -> Optional[float]:
+    best = float("inf")
+    for _ in range(repeat):
+        formatter  = module.RustFormatter()
+        constraints = [formatter.expr_traversal.dfs_expression(constraint) for constraint in struct.constraints]
+        start = time.perf_counter()
+        try:
+            formatter.format_struct(struct, constraints)
+        except RecursionError:
+            return None
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Time npt.formatter_rust on a wide synthetic struct")
+    ap.add_argument("--baseline", metavar="REV", help="also time the formatter from this git revision")
+    ap.add_argument("--fields",   type=int, default=5000, help="number of fields in the struct")
+    ap.add_argument("--repeat",   type=int, default=3, help="number of runs (best is reported)")
+    args = ap.parse_args()
+
+    formatters : Dict[str, types.ModuleType] = {}
+    if args.baseline is not None:
+        formatters[args.baseline] = load_source(args.baseline, "npt/formatter_rust.py")
+    formatters["current"] = npt.formatter_rust
+
+    struct = build_struct(args.fields)
+    print(f"{'revision':20} {'fields':>8} {'seconds':>10} {'us/field':>10}")
+    for name, module in formatters.items():
+        elapsed = time_formatter(module, struct, args.repeat)
+        if elapsed is None:
+            print(f"{name:20} {args.fields:8} {'exceeded the recursion limit':>21}")
+        else:
+            print(f"{name:20} {args.fields:8} {elapsed:10.3f} {elapsed / args.fields * 1e6:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# =================================================================================================
+# Copyright (C) 2018-2020 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+# Micro-benchmark for npt.parser_rfc_xml: the cost per XML element of converting the documents
+# in examples/ into the RFC DOM. Pass --baseline <git revision> to time the parser from that
+# revision alongside the current one.
+#
+# Usage: python benchmarks/bench_parser_rfc_xml.py [--baseline REV] [--repeat N]
+
+import argparse
+import glob
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lxml.etree # type: ignore
+
+import npt.parser_rfc_xml
+
+from npt.__main__ import DTDResolver
+from revisions    import load_source
+from typing       import Any, Dict, List, Tuple
+
+
+def load_examples() -> List[Tuple[str, Any]]:
+    examples = []
+    for filename in sorted(glob.glob("examples/*.xml")):
+        parser = lxml.etree.XMLParser(dtd_validation=False, load_dtd=True, attribute_defaults=True,
+                                      no_network=False, remove_comments=True, remove_pis=False,
+                                      remove_blank_text=False, resolve_entities=False, strip_cdata=True)
+        parser.resolvers.add(DTDResolver())
+        with open(filename, "rb") as inf:
+            examples.append((filename, lxml.etree.fromstring(inf.read(), parser=parser)))
+    return examples
+
+
+def time_parser(module: types.ModuleType, root: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        module.parse_rfc(root)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Time npt.parser_rfc_xml over the bundled examples")
+    ap.add_argument("--baseline", metavar="REV", help="also time the parser from this git revision")
+    ap.add_argument("--repeat",   type=int, default=5, help="number of runs per document (best is reported)")
+    args = ap.parse_args()
+
+    parsers : Dict[str, types.ModuleType] = {}
+    if args.baseline is not None:
+        parsers[args.baseline] = load_source(args.baseline, "npt/parser_rfc_xml.py")
+    parsers["current"] = npt.parser_rfc_xml
+
+    print(f"{'document':56} {'elements':>8} " + " ".join(f"{name + ' ns/elem':>20}" for name in parsers))
+    totals = {name: 0.0 for name in parsers}
+    total_elements = 0
+    for filename, root in load_examples():
+        elements = sum(1 for _ in root.iter())
+        total_elements += elements
+        timings = []
+        for name, module in parsers.items():
+            elapsed = time_parser(module, root, args.repeat)
+            totals[name] += elapsed
+            timings.append(f"{elapsed / elements * 1e9:20.0f}")
+        print(f"{os.path.basename(filename):56} {elements:8} " + " ".join(timings))
+    print(f"{'total':56} {total_elements:8} " + " ".join(f"{totals[name] / total_elements * 1e9:20.0f}" for name in parsers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# =================================================================================================
+# Copyright (C) 2018-2020 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+
+# Memory benchmark for npt.protocol: the memory allocated to build a synthetic protocol of the
+# size of QUIC, with many structs of bit-string fields. Pass --baseline <git revision> to measure
+# npt.protocol from that revision alongside the current one.
+#
+# Usage: python benchmarks/bench_protocol_memory.py [--baseline REV] [--structs N] [--fields N]
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import npt.protocol
+
+from revisions import load_source
+from typing    import Any, Dict, Tuple
+
+
+def build_protocol(module: types.ModuleType, structs: int, fields: int) -> Any:
+    proto = module.Protocol()
+    for s in range(structs):
+        struct_fields = []
+        for f in range(fields):
+            field_type = proto.add_type(module.BitString(f"Field{s}x{f}", module.ConstantExpression(module.Number(), 8)))
+            struct_fields.append(module.StructField(f"field_{f}", field_type))
+        proto.add_type(module.Struct(f"Struct{s}", struct_fields, [], []))
+        proto.define_pdu(f"Struct{s}")
+    proto.synthesise()
+    return proto
+
+
+def measure(module: types.ModuleType, structs: int, fields: int) -> Tuple[int, int]:
+    # Build one protocol first, so that singletons and other one-off allocations are not counted
+    build_protocol(module, 1, 1)
+    gc.collect()
+    tracemalloc.start()
+    proto = build_protocol(module, structs, fields)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, len(proto.get_type_names())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Measure the memory used by npt.protocol types")
+    ap.add_argument("--baseline", metavar="REV", help="also measure npt.protocol from this git revision")
+    ap.add_argument("--structs",  type=int, default=100, help="number of structs in the protocol")
+    ap.add_argument("--fields",   type=int, default=20,  help="number of fields in each struct")
+    args = ap.parse_args()
+
+    modules : Dict[str, types.ModuleType] = {}
+    if args.baseline is not None:
+        modules[args.baseline] = load_source(args.baseline, "npt/protocol.py")
+    modules["current"] = npt.protocol
+
+    print(f"{'revision':20} {'types':>8} {'bytes':>12} {'bytes/type':>12}")
+    for name, module in modules.items():
+        allocated, num_types = measure(module, args.structs, args.fields)
+        print(f"{name:20} {num_types:8} {allocated:12} {allocated / num_types:12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,8 +30,11 @@
 # =================================================================================================
 
 import argparse
+import io
 import lxml.etree # type: ignore
 import os
+import sys
+import time
 import npt.parser
 import npt.parser_rfc_txt
 import npt.parser_rfc_xml
@@ -39,13 +42,14 @@ import npt.rfc
 import npt.protocol
 import npt.helpers
 
+from concurrent.futures       import ProcessPoolExecutor, as_completed
 from npt.formatter            import Formatter
 from npt.formatter_rust       import RustFormatter
 from npt.formatter_simple     import SimpleFormatter
-from npt.loader               import InputFile, load_file
-from npt.parser_asciidiagrams import AsciiDiagramsParser
+from npt.loader               import InputFile, load_file, prefetch
+from npt.parser_asciidiagrams import AsciiDiagramsParser, GRAMMAR_FILE, compiled_grammar, grammar_cache_dir
 from pathlib                  import Path
-from typing                   import Any, Optional, List, Tuple, Union, cast
+from typing                   import Any, Dict, Optional, List, Tuple, cast
 from urllib.parse             import urlparse
 
 
@@ -56,116 +60,51 @@ class DTDResolver(lxml.etree.Resolver):
         else:
             return self.resolve_filename(os.path.join("npt/", os.path.basename(system_url)), context)
 
-# Protocol DFS
-
-def dfs_struct(struct: npt.protocol.Struct, type_names:List[str]) -> None:
-    for field in struct.get_fields():
-        dfs_protocoltype(field.field_type, type_names)
-
-def dfs_array(array: npt.protocol.Array, type_names:List[str]) -> None:
-    dfs_protocoltype(array.element_type, type_names)
-    #dfs_protocoltype(array.parse_from, type_names)
-    #dfs_protocoltype(array.serialise_to, type_names)
-
-def dfs_enum(enum: npt.protocol.Enum, type_names:List[str]) -> None:
-    for variant in enum.variants:
-        dfs_protocoltype(variant, type_names)
-    #dfs_protocoltype(enum.parse_from, type_names)
-    #dfs_protocoltype(enum.serialise_to, type_names)
-
-def dfs_function(function: npt.protocol.Function, type_names:List[str]) -> None:
-    for parameter in function.parameters:
-        if not isinstance(parameter.param_type, npt.protocol.TypeVariable) and isinstance(parameter.param_type, npt.protocol.ConstructableType) and parameter.param_type.name not in type_names:
-            dfs_protocoltype(parameter.param_type, type_names)
-    if not isinstance(function.return_type, npt.protocol.TypeVariable) and isinstance(function.return_type, npt.protocol.ConstructableType) and function.return_type.name not in type_names:
-        dfs_protocoltype(function.return_type, type_names)
-
-def dfs_context(context: npt.protocol.Context, type_names:List[str]) -> None:
-    for field in context.get_fields():
-        dfs_protocoltype(field.field_type, type_names)
-
-def dfs_protocoltype(pt: Union[None, npt.protocol.Function, npt.protocol.ProtocolType], type_names:List[str]) -> None:
-    if isinstance(pt, npt.protocol.BitString):
-        type_names.append(pt.name)
-    elif isinstance(pt, npt.protocol.Struct):
-        dfs_struct(pt, type_names)
-        type_names.append(pt.name)
-    elif isinstance(pt, npt.protocol.Array):
-        dfs_array(pt, type_names)
-        type_names.append(pt.name)
-    elif isinstance(pt, npt.protocol.Enum):
-        dfs_enum(pt, type_names)
-        type_names.append(pt.name)
-    elif isinstance(pt, npt.protocol.Function):
-        dfs_function(pt, type_names)
-        type_names.append(pt.name)
-    elif isinstance(pt, npt.protocol.Context):
-        dfs_context(pt, type_names)
-        type_names.append(pt.name)
-    elif pt is None:
-        return
-
-def dfs_protocol(protocol: npt.protocol.Protocol) -> List[str]:
-    type_names : List[str] = []
-
-    for pdu_name in protocol.get_pdu_names():
-        dfs_protocoltype(protocol.get_pdu(pdu_name), type_names)
-
-    dfs_protocoltype(protocol.get_context(), type_names)
-
-    type_names_dedupe = []
-
-    for type_name in type_names:
-        if type_name not in type_names_dedupe:
-            type_names_dedupe.append(type_name)
-
-    return type_names_dedupe
-
-
-
 # =================================================================================================================================
 
 
-def main():
-    ap = argparse.ArgumentParser(description=f"Parse IETF drafts and RFCs and generate protocol parsers")
-    ap.add_argument("-d",  dest="outdir", help="directory in which to store output files", required=True)
-    ap.add_argument("-f", dest="format", help="output format", required=True)
-    ap.add_argument("document", help="document to process")
-    args = ap.parse_args()
+def load_formatter(format: str) -> Formatter:
+    if format == "simple":
+        return SimpleFormatter()
+    elif format == "rust":
+        return RustFormatter()
+    elif format == "rust-zerocopy":
+        return RustFormatter(zero_copy=True)
+    else:
+        raise ValueError(f"cannot load output formatter {format}")
 
+
+def process_document(document: str, outdir: str, format: str, input_doc: Optional[InputFile] = None) -> None:
+    """
+    Parse a document and write the generated parser for the protocol it describes into
+    `outdir`. The document is loaded unless it has already been loaded as `input_doc`.
+    Raises ValueError if the document or output format cannot be loaded.
+    """
     # Load the output formatter:
-    if args.format == "simple":
-        formatter : Formatter = SimpleFormatter()
-    elif args.format == "rust":
-        formatter = RustFormatter()
-    else:
-        print(f"Error: cannot load output formatter {args.format}")
-        return 1
+    formatter = load_formatter(format)
 
-    input_doc = load_file(args.document)
     if input_doc is None:
-        print(f"Error: cannot load input document {args.document}")
-        return 1
+        input_doc = load_file(document)
+    if input_doc is None:
+        raise ValueError(f"cannot load input document {document}")
 
     if input_doc.fmt == ".xml":
-        parser = lxml.etree.XMLParser(dtd_validation=False, load_dtd=True, attribute_defaults=True, 
-                                      no_network=False, remove_comments=True, remove_pis=False, 
-                                      remove_blank_text=False, resolve_entities=False, strip_cdata=True)
-        parser.resolvers.add(DTDResolver())
-        xml_tree = lxml.etree.fromstring(input_doc.data, parser=parser)
-        content = npt.parser_rfc_xml.parse_rfc(xml_tree)
+        content = npt.parser_rfc_xml.parse_rfc_stream(io.BytesIO(input_doc.data), resolvers=[DTDResolver()],
+                                                      dtd_validation=False, load_dtd=True, attribute_defaults=True,
+                                                      no_network=False, remove_comments=True, remove_pis=False,
+                                                      remove_blank_text=False, resolve_entities=False, strip_cdata=True)
     elif input_doc.fmt == '.txt':
         content = npt.parser_rfc_txt.parse_rfc(input_doc.data.decode('UTF-8').splitlines())
     else:
-        print(f"Error: cannot parse format {input_doc.fmt}")
-        return 1
+        raise ValueError(f"cannot parse format {input_doc.fmt}")
 
     dom_parser = AsciiDiagramsParser()
     protocol = dom_parser.build_protocol(None , content )
     protocol.synthesise()
+    protocol.simplify_sizes()
 
-    expr_traversal = npt.helpers.ExpressionTraversal(formatter)
-    for type_name in dfs_protocol(protocol):
+    expr_traversal = npt.helpers.ExpressionTraversal(formatter, use_stack=True)
+    for type_name in protocol.topological_sort():
         if protocol.has_type(type_name):
             pt = protocol.get_type(type_name)
             if isinstance(pt, npt.protocol.BitString):
@@ -188,15 +127,127 @@ def main():
 
     formatter.format_protocol(protocol)
 
-    output_dir = Path(args.outdir)
+    output_dir = Path(outdir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    for output_file, output_string in formatter.generate_output(Path(args.document).stem).items():
+    for output_file, output_string in formatter.generate_output(Path(document).stem).items():
         output_filepath = output_dir / Path(output_file)
         output_filepath.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
         with open(output_filepath, "w") as outf:
             outf.write(output_string)
 
+# =================================================================================================================================
+# Batch mode
+
+def read_manifest(manifest: str) -> List[str]:
+    """
+    Read a list of documents, one per line. Blank lines and lines starting with # are ignored.
+    """
+    documents = []
+    with open(manifest, "r") as inf:
+        for line in inf:
+            line = line.strip()
+            if line != "" and not line.startswith("#"):
+                documents.append(line)
+    return documents
+
+
+def batch_worker_init() -> None:
+    # Load the compiled grammar once per worker process, rather than once per document:
+    compiled_grammar(GRAMMAR_FILE, grammar_cache_dir())
+
+
+def batch_worker(document: str, outdir: str, format: str, input_doc: Optional[InputFile]) -> Tuple[float, Optional[str]]:
+    start = time.perf_counter()
+    try:
+        process_document(document, outdir, format, input_doc)
+        error = None
+    except (Exception, SystemExit) as e:
+        # ietfdata exits, rather than raising an exception, if the DataTracker cannot be
+        # reached, but that must only fail this document.
+        error = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start, error
+
+
+def batch_main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(prog="npt batch", description=f"Generate protocol parsers for many IETF drafts and RFCs in parallel")
+    ap.add_argument("-d", dest="outdir", help="directory in which to store output files, one subdirectory per document", required=True)
+    ap.add_argument("-f", dest="format", help="output format", required=True)
+    ap.add_argument("-j", dest="jobs", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    ap.add_argument("-m", dest="manifest", action="append", default=[], help="file listing documents to process, one per line")
+    ap.add_argument("documents", nargs="*", help="documents to process")
+    args = ap.parse_args(argv)
+
+    try:
+        load_formatter(args.format)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    documents : List[str] = []
+    for manifest in args.manifest:
+        documents.extend(read_manifest(manifest))
+    documents.extend(args.documents)
+    documents = list(dict.fromkeys(documents))
+    if len(documents) == 0:
+        print(f"Error: no documents to process")
+        return 1
+
+    # The output for each document is written to a subdirectory named after it, so two
+    # documents with the same name, in different formats or directories, would overwrite
+    # each other's output:
+    outdirs : Dict[str, str]       = {document: str(Path(args.outdir) / Path(document).stem) for document in documents}
+    writers : Dict[str, List[str]] = {}
+    for document, outdir in outdirs.items():
+        writers.setdefault(outdir, []).append(document)
+    clashes = [names for names in writers.values() if len(names) > 1]
+    for names in clashes:
+        print(f"Error: the output for {' and '.join(names)} would be written to the same directory, {outdirs[names[0]]}")
+    if len(clashes) > 0:
+        return 1
+
+    results : Dict[str, Tuple[float, Optional[str]]] = {}
+    start = time.perf_counter()
+    # Download documents that are not local files concurrently, before parsing any of them:
+    prefetched = prefetch([document for document in documents if not Path(document).exists()])
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=batch_worker_init) as executor:
+        futures = {executor.submit(batch_worker, document, outdirs[document], args.format, prefetched.get(document)): document
+                   for document in documents}
+        for future in as_completed(futures):
+            document = futures[future]
+            try:
+                results[document] = future.result()
+            except (Exception, SystemExit) as e:
+                results[document] = (0.0, f"{type(e).__name__}: {e}")
+            elapsed, error = results[document]
+            print(f"{'FAILED' if error else 'ok':6} {elapsed:8.2f}s  {document}", flush=True)
+    total = time.perf_counter() - start
+
+    failures = [document for document in documents if results[document][1] is not None]
+    print(f"\nProcessed {len(documents)} documents in {total:.2f}s: {len(documents) - len(failures)} succeeded, {len(failures)} failed")
+    for document in failures:
+        print(f"  {document}: {results[document][1]}")
+    return 1 if failures else 0
+
+# =================================================================================================================================
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        return batch_main(sys.argv[2:])
+
+    ap = argparse.ArgumentParser(description=f"Parse IETF drafts and RFCs and generate protocol parsers")
+    ap.add_argument("-d",  dest="outdir", help="directory in which to store output files", required=True)
+    ap.add_argument("-f", dest="format", help="output format", required=True)
+    ap.add_argument("document", help="document to process")
+    args = ap.parse_args()
+
+    try:
+        process_document(args.document, args.outdir, args.format)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -29,9 +29,11 @@
 # =================================================================================================
 
 import itertools
+import textwrap
 
 from string  import ascii_letters
 from pathlib import Path
+from typing  import Set
 
 from npt.protocol  import *
 from npt.formatter import Formatter
@@ -39,6 +41,8 @@ from npt.helpers   import ExpressionTraversal
 
 import re
 
+SELF_FIELD_ACCESS = re.compile(r"self\(([\w]*)\)")
+
 def camelcase(name: str) -> str:
     return name.replace("-", " ").replace("_", " ").title().replace(" ", "")
 
@@ -48,18 +52,42 @@ class RustFormatter(Formatter):
     """
 
     output: List[str]
+    structs: Dict[str, Any]
+    struct_field_signatures: Dict[str, List[str]]
     expr_traversal: ExpressionTraversal
+    zero_copy: bool
+    borrowed_types: Set[str]
 
     #add necessary imports at the start of every generated rust file
-    def __init__(self):
+    def __init__(self, zero_copy: bool = False):
+        """
+        If `zero_copy` is set, variable-length bitstrings that start on a byte boundary and
+        span whole bytes are returned as slices borrowed from the input, rather than being
+        copied into a new vector. Types that contain such bitstrings borrow from the input,
+        and take an `'a` lifetime parameter. This mode is experimental: it has not yet been
+        run against the pcap test harnesses.
+        """
         self.output = []
         self.structs = {}
         self.struct_field_signatures = {}
-        self.expr_traversal = ExpressionTraversal(self)
+        self.expr_traversal = ExpressionTraversal(self, use_stack=True)
+        self.zero_copy = zero_copy
+        self.borrowed_types = set()
+
+    def type_ref(self, type_name: str) -> str:
+        if camelcase(type_name) in self.borrowed_types:
+            return f"{camelcase(type_name)}<'a>"
+        return camelcase(type_name)
+
+    def mark_borrowed(self, type_name: str, member_names: List[str]):
+        if any(camelcase(member_name) in self.borrowed_types for member_name in member_names):
+            self.borrowed_types.add(camelcase(type_name))
 
     def generate_output(self, output_name: str) -> Dict[Path, str]:
         manifest = f"[package]\nname = \"{output_name.replace('-', '_')}\"\nversion = \"0.1.0\"\n\n[dependencies]\nlexical-core = \"0.7.5\"\nnom = \"5.1.2\"\n\n"
         self.output = ["extern crate nom;\n\nuse nom::bits::complete::take;\nuse nom::IResult;\nuse nom::Err;\nuse nom::error::ErrorKind;\n"] + self.output
+        if self.zero_copy:
+            self.output.insert(1, "use std::borrow::Cow;\n")
         output_files = {Path(f"src/lib.rs"): "".join(self.output),
                         Path(f"Cargo.toml"): manifest}
         return output_files
@@ -126,7 +154,7 @@ class RustFormatter(Formatter):
         if type(size) is not str:
             data_type = f"u{self.assign_int_size(size)}"
         else:
-            data_type = "Vec<u8>"
+            data_type = "Cow<'a, [u8]>" if self.zero_copy else "Vec<u8>"
             self_vars = re.findall(r"self\(([\w]*)\)", size)
             size = re.sub(r"self\(([\w]*)\)", r"\1", size)
             self.struct_field_signatures[f"parse_{bitstring.name.lower()}"] = self_vars
@@ -134,24 +162,38 @@ class RustFormatter(Formatter):
         assert bitstring.name not in self.output
         self.output.append(f"\n// Structure and parser for {bitstring.name} (bitstring type)\n")
         self.output.append("\n#[derive(Clone, Debug, PartialEq, Eq)]\n")
-        self.output.extend(["pub struct ", camelcase(bitstring.name), "(pub %s);\n" % (data_type)])
+        if data_type == "Cow<'a, [u8]>":
+            self.borrowed_types.add(camelcase(bitstring.name))
+        self.output.extend(["pub struct ", self.type_ref(bitstring.name), "(pub %s);\n" % (data_type)])
         self.output.extend(["\n#[inline]"])
         if len(required_vars) > 0:
-            self.output.append("\npub fn parse_{fname}<'a>(input: (&'a [u8], usize), context: &'a mut Context, {required_vars_signatures}) -> (IResult<(&'a [u8], usize), {typename}>, &'a mut Context) {{\n".format(fname=bitstring.name.lower(), typename=camelcase(bitstring.name), required_vars_signatures=", ".join(required_vars)))
+            self.output.append("\npub fn parse_{fname}<'a>(input: (&'a [u8], usize), context: &'a mut Context, {required_vars_signatures}) -> (IResult<(&'a [u8], usize), {typename}>, &'a mut Context) {{\n".format(fname=bitstring.name.lower(), typename=self.type_ref(bitstring.name), required_vars_signatures=", ".join(required_vars)))
         else:
-            self.output.append("\npub fn parse_{fname}<'a>(input: (&'a [u8], usize), context: &'a mut Context) -> (IResult<(&'a [u8], usize), {typename}>, &'a mut Context) {{\n".format(fname=bitstring.name.lower(), typename=camelcase(bitstring.name)))
-        if data_type == "Vec<u8>":
+            self.output.append("\npub fn parse_{fname}<'a>(input: (&'a [u8], usize), context: &'a mut Context) -> (IResult<(&'a [u8], usize), {typename}>, &'a mut Context) {{\n".format(fname=bitstring.name.lower(), typename=self.type_ref(bitstring.name)))
+        if type(size) is str:
             if size[0] == "(" and size[-1] == ")":
                 size = size[1:-1]
             self.output.append(f"    let mut {bitstring.name.lower()}_size = {size};\n")
-            self.output.append(f"    let mut {bitstring.name.lower()} = {camelcase(bitstring.name)}(Vec::new());\n")
+            if self.zero_copy:
+                self.output.append(f"    if input.1 == 0 && {bitstring.name.lower()}_size % 8 == 0 {{\n")
+                self.output.append(f"        // byte aligned, so borrow the field from the input\n")
+                self.output.append(f"        if input.0.len() < {bitstring.name.lower()}_size / 8 {{\n")
+                self.output.append(f"            // fail at the end of the input, as parsing the field a byte at a time would\n")
+                self.output.append(f"            return (IResult::Err(Err::Error(((&input.0[input.0.len()..], 0), ErrorKind::Eof))), context);\n")
+                self.output.append(f"        }}\n")
+                self.output.append(f"        let (bytes, rest) = input.0.split_at({bitstring.name.lower()}_size / 8);\n")
+                self.output.append(f"        return (IResult::Ok(((rest, 0), {camelcase(bitstring.name)}(Cow::Borrowed(bytes)))), context);\n")
+                self.output.append(f"    }}\n")
+                self.output.append(f"    let mut {bitstring.name.lower()} = {camelcase(bitstring.name)}(Cow::Owned(Vec::new()));\n")
+            else:
+                self.output.append(f"    let mut {bitstring.name.lower()} = {camelcase(bitstring.name)}(Vec::new());\n")
             self.output.append(f"    let mut input = input;\n")
             self.output.append(f"    while {bitstring.name.lower()}_size > 0 {{\n")
             self.output.append(f"        let bits_consumed = if {bitstring.name.lower()}_size > 8 {{ 8 }} else {{ {bitstring.name.lower()}_size }};\n")
             self.output.append(f"        match take(bits_consumed as usize)(input) {{\n")
             self.output.append(f"            IResult::Ok((i, o)) => {{\n")
             self.output.append(f"                input = i;\n")
-            self.output.append(f"                {bitstring.name.lower()}.0.push(o);\n")
+            self.output.append(f"                {bitstring.name.lower()}.0{'.to_mut()' if self.zero_copy else ''}.push(o);\n")
             self.output.append(f"            }},\n")
             self.output.append(f"            IResult::Err(e) => return (IResult::Err(e), context)\n")
             self.output.append(f"        }}\n")
@@ -177,31 +219,115 @@ class RustFormatter(Formatter):
         else:
             return 128
 
-    def format_struct_field(self, index: int, struct_name: str, field_names: List[str], parser_func_names: List[str], constraints, presence_constraints):
+    def format_struct_fields(self, struct_name: str, field_names: List[str], parser_func_names: List[str], constraints, presence_constraints, type_names: List[str], field_sizes: List[Optional[int]]):
+        # process constraints: each can be expressed once the last of the fields it uses is parsed
+        field_indices : Dict[str, int] = {}
+        for index, field_name in enumerate(field_names):
+            field_indices.setdefault(field_name, index)
+        constraints_at : Dict[int, List[Any]] = {}
+        for constraint in constraints:
+            if all(field in field_indices for field in constraint[1]):
+                constraints_at.setdefault(max([field_indices[field] for field in constraint[1]], default=0), []).append(constraint)
+
+        # the offset in bits from the start of the struct, if it is known statically
+        offset : Optional[int] = 0
+        index = 0
+        while index < len(field_names):
+            # find the run of fixed-size fields starting here, each of which can be loaded from the
+            # bytes that hold it as a single integer
+            end  = index
+            bits = 0
+            while offset is not None and offset % 8 == 0 and end < len(field_names) and presence_constraints[end] == "True":
+                size = field_sizes[end]
+                if size is None or size == 0 or (bits % 8 + size + 7) // 8 > 16:
+                    break
+                bits += size
+                end  += 1
+            if end - index > 1:
+                offset = cast(int, offset) + bits
+                self.format_aligned_struct_fields(field_names[index:end], type_names[index:end], field_sizes[index:end], [constraints_at.get(i, []) for i in range(index, end)])
+                self.output.append(" else {\n")
+                output_len = len(self.output)
+                for i in range(index, end):
+                    self.format_struct_field(i, field_names, parser_func_names, constraints_at, presence_constraints)
+                fallback = textwrap.indent("".join(self.output[output_len:]).rstrip("\n") + "\n", "    ", lambda line: line.strip() != "")
+                del self.output[output_len:]
+                self.output.append(fallback)
+                self.output.append(f"        ({', '.join(field_names[index:end])})\n")
+                self.output.append("    };\n\n")
+                index = end
+            else:
+                size = field_sizes[index]
+                if offset is not None and size is not None and presence_constraints[index] == "True":
+                    offset += size
+                else:
+                    offset = None
+                self.format_struct_field(index, field_names, parser_func_names, constraints_at, presence_constraints)
+                index += 1
+
+    def format_aligned_struct_fields(self, field_names: List[str], type_names: List[str], field_sizes: List[Optional[int]], constraints: List[List[Any]]):
+        """
+        Parse a run of fixed-size fields directly from the input bytes, when the input is byte
+        aligned and long enough to hold them all, loading each with a single big-endian read
+        rather than parsing it a bit at a time. The caller generates the `else` branch that
+        parses the fields when this fast path cannot be used.
+        """
+        sizes = [cast(int, size) for size in field_sizes]
+        total = sum(sizes)
+        self.output.append(f"    // fixed-size fields: read directly from the input when it is byte aligned\n")
+        self.output.append(f"    let ({', '.join(field_names)}) = if input.1 == 0 && input.0.len() >= {(total + 7) // 8} {{\n")
+        self.output.append(f"        let bytes = input.0;\n")
+        offset = 0
+        for field_name, type_name, size, field_constraints in zip(field_names, type_names, sizes, constraints):
+            self.output.append(f"        let {field_name} = {type_name}({self.format_bits_load(offset, size)});\n")
+            # a failed constraint is reported at the start of the field, as the parser for the
+            # field would report it
+            position = "input" if offset == 0 else f"(&bytes[{offset // 8}..], {offset % 8})"
+            for constraint in field_constraints:
+                constraint_text = SELF_FIELD_ACCESS.sub(r"\1", constraint[0])
+                constraint_expr = SELF_FIELD_ACCESS.sub(r"\1.0", constraint[0])
+                self.output.append(f"        // check constraint: {constraint_text}\n")
+                self.output.append(f"        if !({constraint_expr}) {{\n")
+                self.output.append(f"            return (IResult::Err(Err::Error(({position}, ErrorKind::NonEmpty))), context);\n")
+                self.output.append(f"        }};\n")
+            offset += size
+        self.output.append(f"        input = (&input.0[{total // 8}..], {total % 8});\n")
+        self.output.append(f"        ({', '.join(field_names)})\n")
+        self.output.append(f"    }}")
+
+    def format_bits_load(self, offset: int, size: int) -> str:
+        # the value of the `size` bits starting `offset` bits into `bytes`, as an integer of the
+        # type used for a bitstring of that size
+        first = offset // 8
+        span  = (offset % 8 + size + 7) // 8
+        load_size = self.assign_int_size(span * 8)
+        if span == 1:
+            value = f"bytes[{first}]"
+        else:
+            load_bytes = ["0"] * (load_size // 8 - span) + [f"bytes[{first + i}]" for i in range(span)]
+            value = f"u{load_size}::from_be_bytes([{', '.join(load_bytes)}])"
+        shift = span * 8 - offset % 8 - size
+        if shift > 0:
+            value = f"{value} >> {shift}"
+        if offset % 8 != 0:
+            value = f"({value}) & 0x{(1 << size) - 1:x}" if shift > 0 else f"{value} & 0x{(1 << size) - 1:x}"
+        if load_size != self.assign_int_size(size):
+            value = f"({value}) as u{self.assign_int_size(size)}"
+        return value
+
+    def format_struct_field(self, index: int, field_names: List[str], parser_func_names: List[str], constraints_at: Dict[int, List[Any]], presence_constraints):
         args = []
         if parser_func_names[index] in self.struct_field_signatures:
             args = [f"{arg}.0 as usize" for arg in self.struct_field_signatures[parser_func_names[index]]]
-        indentation = "    "*(index+1) + "    "*(index)
-        generated_code = []
 
-        # process constraints: find those that can be expressed here
         handled_constraints = []
-        unhandled_constraints = []
-        for constraint in constraints:
-            if all(field in field_names[:index+1] for field in constraint[1]):
-                constraint_expr = constraint[0]
-                for field in constraint[1]:
-                    if field == field_names[index]:
-                        constraint_expr = constraint_expr.replace(field, "o.0")
-                    else:
-                        constraint_expr = constraint_expr.replace(field, f"{field}.0")
-                handled_constraints.append((constraint_expr, constraint[0]))
-            else:
-                unhandled_constraints.append(constraint)
-
+        for constraint in constraints_at.get(index, []):
+            # the field just parsed is bound to `o`, earlier fields to their own names
+            constraint_expr = SELF_FIELD_ACCESS.sub(lambda m: "o.0" if m.group(1) == field_names[index] else f"{m.group(1)}.0", constraint[0])
+            handled_constraints.append((constraint_expr, SELF_FIELD_ACCESS.sub(r"\1", constraint[0])))
 
         if presence_constraints == None or presence_constraints[index] != "True":
-            presence_constraints[index] = re.sub(r"self\(([\w]*)\)", r"\1.0", presence_constraints[index])
+            presence_constraints[index] = SELF_FIELD_ACCESS.sub(r"\1.0", presence_constraints[index])
             if presence_constraints[index][0] == "(" and presence_constraints[index][-1] == ")":
                 presence_constraints[index] = presence_constraints[index][1:-1]
             presence_constraint = f"if {presence_constraints[index]} {{ Some("
@@ -211,32 +337,29 @@ class RustFormatter(Formatter):
             presence_else = ""
         constraint_code = "\n" + "\n".join([f"            // check constraint: {constraint[1]}\n            if !({constraint[0]}) {{\n                return (IResult::Err(Err::Error((input, ErrorKind::NonEmpty))), c);\n            }};" for constraint in handled_constraints]) + "\n"
         if len(args) > 0:
-            generated_code.append(f"    let {field_names[index]} = {presence_constraint}match {parser_func_names[index]}(input, context, {', '.join(args)}) {{\n")
+            self.output.append(f"    let {field_names[index]} = {presence_constraint}match {parser_func_names[index]}(input, context, {', '.join(args)}) {{\n")
         else:
-            generated_code.append(f"    let {field_names[index]} = {presence_constraint}match {parser_func_names[index]}(input, context) {{\n")
+            self.output.append(f"    let {field_names[index]} = {presence_constraint}match {parser_func_names[index]}(input, context) {{\n")
         if len(handled_constraints) > 0:
-            generated_code.append(f"        (IResult::Ok((i, o)), c) => {{{constraint_code}            input = i;\n")
-            generated_code.append(f"            context = c;\n")
-            generated_code.append(f"            o\n")
-            generated_code.append(f"        }},\n")
+            self.output.append(f"        (IResult::Ok((i, o)), c) => {{{constraint_code}            input = i;\n")
+            self.output.append(f"            context = c;\n")
+            self.output.append(f"            o\n")
+            self.output.append(f"        }},\n")
         else:
-            generated_code.append("        (IResult::Ok((i, o)), c) => {\n");
-            generated_code.append("            input = i;\n");
-            generated_code.append("            context = c;\n");
-            generated_code.append("            o\n")
-            generated_code.append("        }\n")
-        generated_code.append("        (IResult::Err(e), c) => return (IResult::Err(e), c),\n")
-        generated_code.append(f"    {presence_else}}};\n\n")
-        if index+1 < len(field_names):
-            generated_code = generated_code + self.format_struct_field(index+1, struct_name, field_names, parser_func_names, unhandled_constraints, presence_constraints)
-        return generated_code
+            self.output.append("        (IResult::Ok((i, o)), c) => {\n");
+            self.output.append("            input = i;\n");
+            self.output.append("            context = c;\n");
+            self.output.append("            o\n")
+            self.output.append("        }\n")
+        self.output.append("        (IResult::Err(e), c) => return (IResult::Err(e), c),\n")
+        self.output.append(f"    {presence_else}}};\n\n")
 
     def format_struct(self, struct: Struct, constraints: List[str]):
         assert struct.name not in self.output
-        # process constraints - pick out field names and build structure
+        # process constraints - pair each with the fields it depends on, taken from the expression
         processed_constraints = []
-        for constraint in constraints:
-            processed_constraints.append((re.sub(r"self\(([\w]*)\)", r"\1", constraint), re.findall(r"self\(([\w]*)\)", constraint)))
+        for constraint_expr, constraint in zip(struct.constraints, constraints):
+            processed_constraints.append((constraint, field_dependencies(constraint_expr)))
         self.output.append(f"\n// Structure and parser for {struct.name}\n")
         self.output.append("\n#[derive(Clone, Debug, PartialEq, Eq")
         for trait in struct.traits:
@@ -245,23 +368,29 @@ class RustFormatter(Formatter):
             elif trait == "Ordinal":
                 self.output.append(", Ord")
         self.output.append(")]\n")
-        self.output.extend(["pub struct ", camelcase(struct.name), " {\n"])
+        self.mark_borrowed(struct.name, [field.field_type.name for field in struct.get_fields() if isinstance(field.field_type, ConstructableType)])
+        self.output.extend(["pub struct ", self.type_ref(struct.name), " {\n"])
         parser_functions = []
         field_names = []
         presence_constraints = []
+        type_names = []
+        field_sizes : List[Optional[int]] = []
         for field in struct.get_fields():
             type_name = field.field_type.name if isinstance(field.field_type, ConstructableType) else "nothing"
             if not(isinstance(field.is_present, ConstantExpression) and type(field.is_present.constant_type) is Boolean and field.is_present.constant_value is True):
-                self.output.append("    pub %s: Option<%s>,\n" % (field.field_name, camelcase(type_name)))
+                self.output.append("    pub %s: Option<%s>,\n" % (field.field_name, self.type_ref(type_name)))
             else:
-                self.output.append("    pub %s: %s,\n" % (field.field_name, camelcase(type_name)))
+                self.output.append("    pub %s: %s,\n" % (field.field_name, self.type_ref(type_name)))
             presence_constraints.append(self.expr_traversal.dfs_expression(field.is_present))
             parser_functions.append("parse_{name}".format(name=type_name.lower()))
             field_names.append(f"{field.field_name}")
+            type_names.append(camelcase(type_name))
+            size = self.expr_traversal.dfs_expression(field.field_type.size) if isinstance(field.field_type, BitString) else None
+            field_sizes.append(size if type(size) is int else None)
         self.output.append("}\n")
         self.output.extend(["\n#[inline]"])
-        self.output.append("\npub fn parse_{fname}<'a>(mut input: (&'a [u8], usize), mut context: &'a mut Context) -> (IResult<(&'a [u8], usize), {typename}>, &'a mut Context) {{\n".format(fname=struct.name.replace(" ", "_").replace("-", "_").lower(),typename=camelcase(struct.name)))
-        self.output += self.format_struct_field(0, camelcase(struct.name), field_names, parser_functions, processed_constraints, presence_constraints)
+        self.output.append("\npub fn parse_{fname}<'a>(mut input: (&'a [u8], usize), mut context: &'a mut Context) -> (IResult<(&'a [u8], usize), {typename}>, &'a mut Context) {{\n".format(fname=struct.name.replace(" ", "_").replace("-", "_").lower(),typename=self.type_ref(struct.name)))
+        self.format_struct_fields(camelcase(struct.name), field_names, parser_functions, processed_constraints, presence_constraints, type_names, field_sizes)
         self.output.append(f"    (IResult::Ok((\n")
         self.output.append(f"        input,\n")
         self.output.append(f"        {camelcase(struct.name)} {{\n")
@@ -279,7 +408,8 @@ class RustFormatter(Formatter):
         element_type_name = array.element_type.name if isinstance(array.element_type, ConstructableType) else "nothing"
         self.output.append(f"\n// Structure and parser for {array.name}\n")
         self.output.append("\n#[derive(Clone, Debug, PartialEq, Eq)]")
-        self.output.append("\npub struct %s(pub Vec<%s>);\n" % (camelcase(array.name), camelcase(element_type_name)))
+        self.mark_borrowed(array.name, [element_type_name])
+        self.output.append("\npub struct %s(pub Vec<%s>);\n" % (self.type_ref(array.name), self.type_ref(element_type_name)))
         self.output.extend(["\n#[inline]"])
         if (array.length is not None):
             size = self.expr_traversal.dfs_expression(array.length)
@@ -288,7 +418,7 @@ class RustFormatter(Formatter):
             self.struct_field_signatures[f"parse_{fname}"] = self_vars
             required_vars = [f"{var_name}: usize" for var_name in self_vars]
             required_vars_signatures=", ".join(required_vars)
-            self.output.append(f"\npub fn parse_{fname}<'a>(mut input: (&'a [u8], usize), mut context: &'a mut Context, {required_vars_signatures}) -> (IResult<(&'a [u8], usize), {camelcase(array.name)}>, &'a mut Context) {{")
+            self.output.append(f"\npub fn parse_{fname}<'a>(mut input: (&'a [u8], usize), mut context: &'a mut Context, {required_vars_signatures}) -> (IResult<(&'a [u8], usize), {self.type_ref(array.name)}>, &'a mut Context) {{")
             self.output.append(f"\n    let mut {fname} = {camelcase(array.name)}(Vec::new());")
             self.output.append(f"\n    for _n in 1..={size} {{")
             self.output.append(f"\n        match parse_{element_type_name.replace(' ', '_').replace('-', '_').lower()}(input, context) {{")
@@ -304,7 +434,7 @@ class RustFormatter(Formatter):
             self.struct_field_signatures[f"parse_{fname}"] = self_vars
             required_vars = [f"{var_name}: usize" for var_name in self_vars]
             required_vars_signatures=", ".join(required_vars)
-            self.output.append(f"\npub fn parse_{fname}<'a>(mut input: (&'a [u8], usize), mut context: &'a mut Context, {required_vars_signatures}) -> (IResult<(&'a [u8], usize), {camelcase(array.name)}>, &'a mut Context) {{")
+            self.output.append(f"\npub fn parse_{fname}<'a>(mut input: (&'a [u8], usize), mut context: &'a mut Context, {required_vars_signatures}) -> (IResult<(&'a [u8], usize), {self.type_ref(array.name)}>, &'a mut Context) {{")
             self.output.append(f"\n    let mut {fname} = {camelcase(array.name)}(Vec::new());")
             self.output.append(f"\n    let mut bits_read = 0;")
             self.output.append(f"\n    let bits_to_read = {size_expr};")
@@ -334,8 +464,9 @@ class RustFormatter(Formatter):
         func_name = enum.name.replace(" ", "_").replace("-", "_").lower()
         self.output.append(f"\n// Parse enum `{enum.name}`\n")
         self.output.append("\n#[derive(Clone, Debug, PartialEq, Eq)]")
-        self.output.append(f"\npub enum {camelcase(enum.name)} {{\n")
-        self.output.append("\n".join([f"    {camelcase(variant.name)}({camelcase(variant.name)})," for variant in enum.variants if isinstance(variant, ConstructableType)]))
+        self.mark_borrowed(enum.name, [variant.name for variant in enum.variants if isinstance(variant, ConstructableType)])
+        self.output.append(f"\npub enum {self.type_ref(enum.name)} {{\n")
+        self.output.append("\n".join([f"    {camelcase(variant.name)}({self.type_ref(variant.name)})," for variant in enum.variants if isinstance(variant, ConstructableType)]))
         self.output.append("\n}\n\n")
         parse_funcs = []
         type_names = []
@@ -345,8 +476,8 @@ class RustFormatter(Formatter):
                 parse_func_name = variant.name.replace(" ", "_").replace("-", "_").lower()
                 parse_funcs.append(f"parse_{parse_func_name}")
         self.output.extend(["\n#[inline]"])
-        self.output.append(f"pub fn parse_{func_name}<'a>(input: (&'a [u8], usize), mut context: &'a mut Context) -> (IResult<(&'a [u8], usize), {camelcase(enum.name)}>, &'a mut Context) {{\n")
-        self.output += self.format_enum_variants(camelcase(enum.name), 0, parse_funcs, type_names)
+        self.output.append(f"pub fn parse_{func_name}<'a>(input: (&'a [u8], usize), mut context: &'a mut Context) -> (IResult<(&'a [u8], usize), {self.type_ref(enum.name)}>, &'a mut Context) {{\n")
+        self.format_enum_variants(camelcase(enum.name), parse_funcs, type_names)
         self.output.append("    (IResult::Err(Err::Error((input, ErrorKind::NonEmpty))), context)\n")
         self.output.append("}\n")
 
@@ -379,31 +510,24 @@ class RustFormatter(Formatter):
         context_output += ",\n".join(fields_output) + "\n}\n"
         self.output = [context_output] + self.output
 
-    def format_pdu_variants(self, container_name: str, index: int, parser_func_names: List[str], type_names: List[str]):
-        generated_code = []
-        generated_code.append(f"    match {parser_func_names[index]}(input, context) {{\n")
-        generated_code.append(f"        (IResult::Ok((([], 0), o)), c) => return (IResult::Ok(((&[], 0), {container_name}::{type_names[index]}(o))), c),\n")
-        generated_code.append(f"        (IResult::Ok(_), c) | (IResult::Err(_), c) => {{ context = c; }}\n    }}\n\n")
-
-        if index+1 < len(parser_func_names):
-            generated_code = generated_code + self.format_pdu_variants(container_name, index+1, parser_func_names, type_names)
-        return generated_code
-
-    def format_enum_variants(self, container_name: str, index: int, parser_func_names: List[str], type_names: List[str]):
-        generated_code = []
-        generated_code.append(f"    match {parser_func_names[index]}(input, context) {{\n")
-        generated_code.append(f"        (IResult::Ok((i, o)), c) => return (IResult::Ok((i, {container_name}::{type_names[index]}(o))), c),\n")
-        generated_code.append(f"        (IResult::Err(_), c) =>  {{ context = c; }}\n    }}\n\n")
+    def format_pdu_variants(self, container_name: str, parser_func_names: List[str], type_names: List[str]):
+        for parser_func_name, type_name in zip(parser_func_names, type_names):
+            self.output.append(f"    match {parser_func_name}(input, context) {{\n")
+            self.output.append(f"        (IResult::Ok((([], 0), o)), c) => return (IResult::Ok(((&[], 0), {container_name}::{type_name}(o))), c),\n")
+            self.output.append(f"        (IResult::Ok(_), c) | (IResult::Err(_), c) => {{ context = c; }}\n    }}\n\n")
 
-        if index+1 < len(parser_func_names):
-            generated_code = generated_code + self.format_enum_variants(container_name, index+1, parser_func_names, type_names)
-        return generated_code
+    def format_enum_variants(self, container_name: str, parser_func_names: List[str], type_names: List[str]):
+        for parser_func_name, type_name in zip(parser_func_names, type_names):
+            self.output.append(f"    match {parser_func_name}(input, context) {{\n")
+            self.output.append(f"        (IResult::Ok((i, o)), c) => return (IResult::Ok((i, {container_name}::{type_name}(o))), c),\n")
+            self.output.append(f"        (IResult::Err(_), c) =>  {{ context = c; }}\n    }}\n\n")
 
     def format_protocol(self, protocol: Protocol):
         self.output.append("\n// Parse incoming PDUs\n")
         self.output.append("\n#[derive(Clone, Debug, PartialEq, Eq)]")
-        self.output.append("\npub enum PDU {\n")
-        self.output.append("\n".join([f"    {camelcase(pdu_name)}({camelcase(pdu_name)})," for pdu_name in protocol.get_pdu_names()]))
+        pdu_type = "PDU<'a>" if any(camelcase(pdu_name) in self.borrowed_types for pdu_name in protocol.get_pdu_names()) else "PDU"
+        self.output.append(f"\npub enum {pdu_type} {{\n")
+        self.output.append("\n".join([f"    {camelcase(pdu_name)}({self.type_ref(pdu_name)})," for pdu_name in protocol.get_pdu_names()]))
         self.output.append("\n}\n\n")
         parse_funcs = []
         type_names = []
@@ -411,7 +535,7 @@ class RustFormatter(Formatter):
             type_names.append(camelcase(pdu_name))
             parse_funcs.append(f"parse_{pdu_name.replace(' ', '_').replace('-', '_').lower()}")
         self.output.extend(["#[inline]\n"])
-        self.output.append("pub fn parse_pdu<'a>(input: (&'a [u8], usize), mut context: &'a mut Context) -> (IResult<(&'a [u8], usize), PDU>, &'a mut Context) {\n")
-        self.output += self.format_pdu_variants("PDU", 0, parse_funcs, type_names)
+        self.output.append(f"pub fn parse_pdu<'a>(input: (&'a [u8], usize), mut context: &'a mut Context) -> (IResult<(&'a [u8], usize), {pdu_type}>, &'a mut Context) {{\n")
+        self.format_pdu_variants("PDU", parse_funcs, type_names)
         self.output.append("    (IResult::Err(Err::Error((input, ErrorKind::NonEmpty))), context)")
         self.output.append("\n}")
@@ -28,7 +28,7 @@
 # SPDX-License-Identifier: BSD-2-Clause
 # =================================================================================================
 
-from typing import Optional, List, Any, cast
+from typing import Optional, Callable, Dict, List, Any, Tuple, Type, cast
 
 from npt.formatter     import Formatter
 from npt.protocol     import *
@@ -36,59 +36,96 @@ from npt.protocol     import *
 # Expression DFS
 
 class ExpressionTraversal:
+    """
+    Formats expressions using a Formatter, by formatting the operands of each expression
+    before the expression itself. Each traversal remembers the formatted form of every
+    expression it has formatted, keyed by identity; since expressions are interned, shared
+    sub-expressions and repeated requests for the same expression are formatted only once.
+    If `use_stack` is set, expressions are traversed using an explicit stack rather than
+    recursion, so that very deep expressions do not exceed the recursion limit.
+    """
     formatter: Formatter
+    use_stack: bool
 
-    def __init__(self, formatter: Formatter):
+    def __init__(self, formatter: Formatter, use_stack: bool = False):
         self.formatter = formatter
-    
+        self.use_stack = use_stack
+        self._memo : Dict[int, Tuple[Expression, Any]] = {}
+
     def dfs_expression(self, expr: Optional[Expression]) -> Any:
         if expr is None:
             return None
-        if isinstance(expr, ArgumentExpression):
-            return self.dfs_argumentexpression(expr)
-        elif isinstance(expr, MethodInvocationExpression):
-            return self.dfs_methodinvocationexpr(expr)
-        elif isinstance(expr, FunctionInvocationExpression):
-            return self.dfs_functioninvocationexpr(expr)
-        elif isinstance(expr, FieldAccessExpression):
-            return self.dfs_fieldaccessexpr(expr)
-        elif isinstance(expr, ContextAccessExpression):
-            return self.dfs_contextaccessexpr(expr)
-        elif isinstance(expr, IfElseExpression):
-            return self.dfs_ifelseexpr(expr)
-        elif isinstance(expr, SelfExpression):
-            return self.dfs_selfexpr(expr)
-        elif isinstance(expr, ConstantExpression):
-            return self.dfs_constantexpr(expr)
-    
-    def dfs_argumentexpression(self, expr: ArgumentExpression) -> Any:
-        arg_value = self.dfs_expression(expr.arg_value)
-        return self.formatter.format_argumentexpression(expr.arg_name, arg_value)
-    
-    def dfs_methodinvocationexpr(self, expr: MethodInvocationExpression) -> Any:
-        target = self.dfs_expression(expr.target)
-        arg_exprs = [self.dfs_expression(args_expr) for args_expr in expr.arg_exprs]
-        return self.formatter.format_methodinvocationexpr(target, expr.method_name, arg_exprs)
-    
-    def dfs_functioninvocationexpr(self, expr: FunctionInvocationExpression) -> Any:
-        args_exprs = [self.dfs_expression(arg_expr) for arg_expr in expr.arg_exprs]
-        return self.formatter.format_functioninvocationexpr(expr.func.name, args_exprs)
-    
-    def dfs_fieldaccessexpr(self, expr: FieldAccessExpression) -> Any:
-        target = self.dfs_expression(expr.target)
-        return self.formatter.format_fieldaccessexpr(target, expr.field_name)
-    
-    def dfs_contextaccessexpr(self, expr: ContextAccessExpression) -> Any:
+        memo = self._memo.get(id(expr))
+        if memo is not None:
+            return memo[1]
+        if self.use_stack:
+            return self._dfs_with_stack(expr)
+        return self._format(expr, [self.dfs_expression(operand) for operand in expr.operands()])
+
+    def _dfs_with_stack(self, expr: Expression) -> Any:
+        stack = [(expr, False)]
+        while stack:
+            node, operands_done = stack.pop()
+            if id(node) in self._memo:
+                continue
+            if operands_done:
+                self._format(node, [self._memo[id(operand)][1] for operand in node.operands()])
+            else:
+                stack.append((node, True))
+                for operand in reversed(node.operands()):
+                    if id(operand) not in self._memo:
+                        stack.append((operand, False))
+        return self._memo[id(expr)][1]
+
+    def _format(self, expr: Expression, operands: List[Any]) -> Any:
+        dfs_func = _dispatch(type(expr))
+        result = dfs_func(self, expr, operands) if dfs_func is not None else None
+        self._memo[id(expr)] = (expr, result)
+        return result
+
+    # Each of the following formats an expression, given its formatted operands:
+
+    def dfs_argumentexpression(self, expr: ArgumentExpression, operands: List[Any]) -> Any:
+        return self.formatter.format_argumentexpression(expr.arg_name, operands[0])
+
+    def dfs_methodinvocationexpr(self, expr: MethodInvocationExpression, operands: List[Any]) -> Any:
+        return self.formatter.format_methodinvocationexpr(operands[0], expr.method_name, operands[1:])
+
+    def dfs_functioninvocationexpr(self, expr: FunctionInvocationExpression, operands: List[Any]) -> Any:
+        return self.formatter.format_functioninvocationexpr(expr.func.name, operands)
+
+    def dfs_fieldaccessexpr(self, expr: FieldAccessExpression, operands: List[Any]) -> Any:
+        return self.formatter.format_fieldaccessexpr(operands[0], expr.field_name)
+
+    def dfs_contextaccessexpr(self, expr: ContextAccessExpression, operands: List[Any]) -> Any:
         return self.formatter.format_contextaccessexpr(expr.field_name)
-    
-    def dfs_ifelseexpr(self, expr: IfElseExpression) -> Any:
-        condition = self.dfs_expression(expr.condition)
-        if_true = self.dfs_expression(expr.if_true)
-        if_false = self.dfs_expression(expr.if_false)
-        return self.formatter.format_ifelseexpr(condition, if_true, if_false)
-    
-    def dfs_selfexpr(self,expr: SelfExpression) -> Any:
+
+    def dfs_ifelseexpr(self, expr: IfElseExpression, operands: List[Any]) -> Any:
+        return self.formatter.format_ifelseexpr(operands[0], operands[1], operands[2])
+
+    def dfs_selfexpr(self, expr: SelfExpression, operands: List[Any]) -> Any:
         return self.formatter.format_selfexpr()
-    
-    def dfs_constantexpr(self, expr: ConstantExpression) -> Any:
+
+    def dfs_constantexpr(self, expr: ConstantExpression, operands: List[Any]) -> Any:
         return self.formatter.format_constantexpr(expr.constant_type, expr.constant_value)
+
+
+DFS_DISPATCH : Dict[Type[Expression], Optional[Callable[[ExpressionTraversal, Any, List[Any]], Any]]] = {
+    ArgumentExpression           : ExpressionTraversal.dfs_argumentexpression,
+    MethodInvocationExpression   : ExpressionTraversal.dfs_methodinvocationexpr,
+    FunctionInvocationExpression : ExpressionTraversal.dfs_functioninvocationexpr,
+    FieldAccessExpression        : ExpressionTraversal.dfs_fieldaccessexpr,
+    ContextAccessExpression      : ExpressionTraversal.dfs_contextaccessexpr,
+    IfElseExpression             : ExpressionTraversal.dfs_ifelseexpr,
+    SelfExpression               : ExpressionTraversal.dfs_selfexpr,
+    ConstantExpression           : ExpressionTraversal.dfs_constantexpr,
+}
+
+
+def _dispatch(expr_type: Type[Expression]) -> Optional[Callable[[ExpressionTraversal, Any, List[Any]], Any]]:
+    if expr_type not in DFS_DISPATCH:
+        # Sub-classes of the expression types are formatted as their nearest base class, and
+        # other expressions format as None
+        base = next((base for base in expr_type.__mro__ if base in DFS_DISPATCH), None)
+        DFS_DISPATCH[expr_type] = DFS_DISPATCH[base] if base is not None else None
+    return DFS_DISPATCH[expr_type]
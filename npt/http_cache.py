@@ -0,0 +1,179 @@
+# =================================================================================================
+# Copyright (C) 2021 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+import hashlib
+import json
+import os
+import requests
+import tempfile
+import threading
+
+from pathlib import Path
+from typing  import Any, Dict, Optional, Tuple, Union
+
+# The number of documents that are fetched concurrently, and hence the number of
+# connections kept open to each host:
+FETCH_WORKERS = 8
+
+_session      : Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def http_session() -> requests.Session:
+    """
+    The process-wide HTTP session. This keeps connections alive between requests,
+    and can be shared between threads.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter  = requests.adapters.HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS)
+            _session = requests.Session()
+            _session.mount("http://",  adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+
+class HTTPCache:
+    cache_dir : Optional[Path]
+    offline   : bool
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, offline: bool = False) -> None:
+        """
+        A cache of documents fetched over HTTP.
+
+        The body of each response, along with its ETag and Last-Modified headers, is
+        stored in `cache_dir`, keyed by URL. Cached responses are revalidated using
+        If-None-Match and If-Modified-Since. If `offline` is True, or if the server
+        cannot be reached, cached responses are returned without revalidation. If
+        `cache_dir` is None, nothing is cached and every request goes to the network.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.offline   = offline
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        assert self.cache_dir is not None
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+
+    def _cached(self, url: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        # The meta file is written after the body, and records a digest of it, so a
+        # body without matching meta data (e.g., if the process was interrupted while
+        # storing a response) is never used.
+        if self.cache_dir is None:
+            return None
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as inf:
+                meta : Dict[str, Any] = json.load(inf)
+            if meta.get("url") != url:
+                return None
+            with open(body_path, "rb") as inf:
+                body = inf.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("sha256") != hashlib.sha256(body).hexdigest():
+            return None
+        return meta, body
+
+
+    def _store(self, url: str, response: requests.Response) -> None:
+        assert self.cache_dir is not None
+        body_path, meta_path = self._paths(url)
+        meta = {"url"           : url,
+                "etag"          : response.headers.get("ETag"),
+                "last_modified" : response.headers.get("Last-Modified"),
+                "sha256"        : hashlib.sha256(response.content).hexdigest()}
+        for path, data in [(body_path, response.content), (meta_path, json.dumps(meta).encode("utf-8"))]:
+            # Each store writes its own temporary file, so threads or processes storing
+            # the same URL at the same time cannot write into each other's files:
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix=path.name, suffix=".tmp", delete=False) as outf:
+                outf.write(data)
+            os.replace(outf.name, path)
+
+
+    def fetch_path(self, url: str) -> Optional[Path]:
+        """
+        Fetch `url`, returning the path to the cached body, or None if it could not be
+        fetched. This requires a cache directory.
+        """
+        if self.fetch(url) is None:
+            return None
+        return self._paths(url)[0]
+
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        """
+        Fetch `url`, returning the body of the response or None if it could not be fetched.
+        """
+        cached = self._cached(url)
+        if self.offline:
+            return cached[1] if cached is not None else None
+
+        headers = {}
+        cached_body : Optional[bytes] = None
+        if cached is not None:
+            meta, cached_body = cached
+            if meta["etag"] is not None:
+                headers["If-None-Match"] = meta["etag"]
+            if meta["last_modified"] is not None:
+                headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            response = http_session().get(url, headers=headers, verify=True)
+        except requests.ConnectionError:
+            if cached_body is not None:
+                return cached_body
+            raise
+
+        if response.status_code == 304 and cached_body is not None:
+            return cached_body
+        if response.status_code == 200:
+            if self.cache_dir is not None:
+                self._store(url, response)
+            return response.content
+        return None
+
+
+_http_cache : Optional[HTTPCache] = None
+
+def http_cache() -> HTTPCache:
+    """
+    The process-wide HTTP cache. This is stored in the directory named by the
+    NPT_HTTP_CACHE environment variable, if set, and is used offline if the
+    NPT_OFFLINE environment variable is set to a non-empty value.
+    """
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HTTPCache(os.environ.get("NPT_HTTP_CACHE") or None, bool(os.environ.get("NPT_OFFLINE")))
+    return _http_cache
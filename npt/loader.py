@@ -28,13 +28,17 @@
 # SPDX-License-Identifier: BSD-2-Clause
 # =================================================================================================
 
-import requests
-
+from concurrent.futures   import ThreadPoolExecutor
 from dataclasses          import dataclass
 from ietfdata.datatracker import DataTracker
 from ietfdata.rfcindex    import RFCIndex
+from npt.http_cache       import FETCH_WORKERS, http_cache
 from pathlib              import Path
-from typing               import Optional
+from typing               import Dict, List, Optional
+
+# Where documents are fetched from. Tests can point these at a local server.
+IETF_ARCHIVE_URL = "https://www.ietf.org/archive/id"
+RFC_EDITOR_URL   = "https://www.rfc-editor.org"
 
 
 @dataclass
@@ -54,10 +58,10 @@ def _load_file(name: str) -> Optional[InputFile]:
 def _load_draft(name: str) -> Optional[InputFile]:
     if name.endswith(".txt"):
         fmt = ".txt"
-        url = f"https://www.ietf.org/archive/id/{name}"
+        url = f"{IETF_ARCHIVE_URL}/{name}"
     elif name.endswith(".xml"):
         fmt = ".xml"
-        url = f"https://www.ietf.org/archive/id/{name}"
+        url = f"{IETF_ARCHIVE_URL}/{name}"
     else:
         dt = DataTracker()
         if name[-1].isdecimal() and name[-2].isdecimal() and name[-3] == "-":
@@ -72,41 +76,45 @@ def _load_draft(name: str) -> Optional[InputFile]:
             rev = doc.rev
 
         if doc.submissions != []:
-            for submission_uri in doc.submissions:
-                submission = dt.submission(submission_uri)
+            # Look up the submissions concurrently, since there can be many of them:
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+                submissions = list(executor.map(dt.submission, doc.submissions))
+            for submission in submissions:
                 assert submission is not None
                 if submission.rev == rev:
                     if ".xml" in submission.file_types.split(","):
                         fmt = ".xml"
-                        url = f"https://www.ietf.org/archive/id/{submission.name}-{submission.rev}.xml"
+                        url = f"{IETF_ARCHIVE_URL}/{submission.name}-{submission.rev}.xml"
                     elif ".txt" in submission.file_types.split(","):
                         fmt = ".txt"
-                        url = f"https://www.ietf.org/archive/id/{submission.name}-{submission.rev}.txt"
+                        url = f"{IETF_ARCHIVE_URL}/{submission.name}-{submission.rev}.txt"
                     else:
                         return None
         else:
             fmt = ".txt"
-            url = f"https://www.ietf.org/archive/id/{doc.name}-{rev}.txt"
-    with requests.Session() as session:
-        #print(f"Download {url}")
-        response = session.get(url, verify=True)
-        if response.status_code == 200:
-            return InputFile(fmt, response.content)
-        else:
-            return None
+            url = f"{IETF_ARCHIVE_URL}/{doc.name}-{rev}.txt"
+    #print(f"Download {url}")
+    data = http_cache().fetch(url)
+    if data is not None:
+        return InputFile(fmt, data)
+    else:
+        return None
 
 
 def _load_rfc(name: str) -> Optional[InputFile]:
     url = None
     if name.endswith(".txt"):
         fmt = ".txt"
-        url = f"https://www.rfc-editor.org/rfc/{name}"
+        url = f"{RFC_EDITOR_URL}/rfc/{name}"
     elif name.endswith(".xml"):
         fmt = ".xml"
-        url = f"https://www.rfc-editor.org/rfc/{name}"
+        url = f"{RFC_EDITOR_URL}/rfc/{name}"
     else:
-        #print(f"Download https://www.rfc-editor.org/rfc-index.xml")
-        entry = RFCIndex().rfc(name.upper())
+        #print(f"Download {RFC_EDITOR_URL}/rfc-index.xml")
+        rfc_index = None
+        if http_cache().cache_dir is not None:
+            rfc_index = http_cache().fetch_path(f"{RFC_EDITOR_URL}/rfc-index.xml")
+        entry = RFCIndex(rfc_index=str(rfc_index) if rfc_index is not None else None).rfc(name.upper())
         if entry is None:
             return None
         fmt = ".xml"
@@ -116,13 +124,12 @@ def _load_rfc(name: str) -> Optional[InputFile]:
             url = entry.content_url("ASCII")
             if url is None:
                 raise KeyError(f"no known format for {name}")
-    with requests.Session() as session:
-        #print(f"Download {url}")
-        response = session.get(url, verify=True)
-        if response.status_code == 200:
-            return InputFile(fmt, response.content)
-        else:
-            return None
+    #print(f"Download {url}")
+    data = http_cache().fetch(url)
+    if data is not None:
+        return InputFile(fmt, data)
+    else:
+        return None
 
 
 def load_file(name: str) -> Optional[InputFile]:
@@ -136,3 +143,20 @@ def load_file(name: str) -> Optional[InputFile]:
         return None
 
 
+def _prefetch_file(name: str) -> Optional[InputFile]:
+    try:
+        return load_file(name)
+    except (Exception, SystemExit):
+        # ietfdata exits, rather than raising an exception, if the DataTracker cannot
+        # be reached, but that must only fail this document.
+        return None
+
+
+def prefetch(names: List[str]) -> Dict[str, Optional[InputFile]]:
+    """
+    Load several documents concurrently, as `load_file()` does for each one. This
+    returns a map from each name to the loaded document, or None if it cannot be
+    loaded for any reason.
+    """
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        return dict(zip(names, executor.map(_prefetch_file, names)))
@@ -28,14 +28,160 @@
 # SPDX-License-Identifier: BSD-2-Clause
 # =================================================================================================
 
+import hashlib
+import json
+import os
+import sqlite3
 import string
 import parsley
 
 import npt.rfc as rfc
 import npt.protocol
 
-from npt.parser import Parser
-from typing     import cast, Optional, Union, List, Tuple
+from collections    import Counter, OrderedDict
+from ometa.builder  import moduleFromGrammar, writePython # type: ignore
+from ometa.grammar  import OMeta                          # type: ignore
+from ometa.runtime  import OMetaBase                      # type: ignore
+from npt.parser     import Parser
+from pathlib        import Path
+from types          import ModuleType
+from typing         import cast, Any, Callable, Dict, Optional, Union, List, Tuple
+
+# =================================================================================================
+# Compiled grammar cache:
+
+GRAMMAR_FILE = Path(__file__).parent / "grammar_asciidiagrams.txt"
+
+# Generated grammar modules, keyed by the SHA-256 hash of the grammar source. Each
+# module defines a createParserClass() function that binds a set of callbacks to a
+# new parser class, so the expensive grammar compilation happens only once per
+# process, while each AsciiDiagramsParser still gets its own bindings.
+_grammar_modules : Dict[str, ModuleType] = {}
+
+def grammar_cache_dir() -> Optional[Path]:
+    """
+    The directory used to store generated grammar code between runs, taken from
+    the NPT_GRAMMAR_CACHE environment variable, or None if it is not set.
+    """
+    cache_dir = os.environ.get("NPT_GRAMMAR_CACHE")
+    if cache_dir is None or cache_dir == "":
+        return None
+    return Path(cache_dir)
+
+
+def grammar_digest(grammar_file: Path) -> str:
+    """
+    Return the SHA-256 hash of the Parsley grammar in `grammar_file`.
+    """
+    with open(grammar_file, "r") as inf:
+        return hashlib.sha256(inf.read().encode("utf-8")).hexdigest()
+
+
+def compiled_grammar(grammar_file: Path, cache_dir: Optional[Path] = None) -> ModuleType:
+    """
+    Return the generated parser module for the Parsley grammar in `grammar_file`.
+
+    The grammar is only compiled if one with the same content hash has not already
+    been compiled by this process. If `cache_dir` is specified, the generated code is
+    also stored there, and reused by later processes rather than being regenerated.
+    """
+    with open(grammar_file, "r") as inf:
+        grammar = inf.read()
+    digest = hashlib.sha256(grammar.encode("utf-8")).hexdigest()
+    if digest not in _grammar_modules:
+        modname = f"pymeta_grammar__{grammar_file.stem}_{digest[:16]}"
+        source  = None
+        if cache_dir is not None:
+            cache_file = cache_dir / f"{grammar_file.stem}-{digest}.py"
+            if cache_file.exists():
+                with open(cache_file, "r") as inf:
+                    source = inf.read()
+        if source is None:
+            source = writePython(OMeta(grammar).parseGrammar("Grammar"), grammar)
+            if cache_dir is not None:
+                # Write then rename, so concurrent processes never see a partial file
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp_file, "w") as outf:
+                    outf.write(source)
+                os.replace(tmp_file, cache_file)
+        _grammar_modules[digest] = moduleFromGrammar(source, "Grammar", modname, f"/pymeta_generated_code/{modname}.py")
+    return _grammar_modules[digest]
+
+# =================================================================================================
+# Parsed diagram cache:
+
+DiagramFields = List[Tuple[Union[int, str], str]]
+
+class DiagramCache:
+    """
+    A cache of the field lists parsed from artwork diagrams, keyed by a hash of the
+    grammar and the diagram text. The most recently used `max_entries` results are
+    held in memory. If `db_path` is specified, results are also stored in an SQLite
+    database, so that later runs over the same diagrams can skip parsing them.
+    """
+    max_entries : int
+    db_path     : Optional[Path]
+    _entries    : "OrderedDict[str, DiagramFields]"
+    _db         : Optional[sqlite3.Connection]
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[Path] = None) -> None:
+        self.max_entries = max_entries
+        self.db_path     = db_path
+        self._entries    = OrderedDict()
+        self._db         = None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is not None and self._db is None:
+            self._db = sqlite3.connect(self.db_path, timeout=30)
+            self._db.execute("CREATE TABLE IF NOT EXISTS diagrams (key TEXT PRIMARY KEY, fields TEXT NOT NULL)")
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, fields: DiagramFields) -> None:
+        self._entries[key] = fields
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[DiagramFields]:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        db = self._connect()
+        if db is not None:
+            row = db.execute("SELECT fields FROM diagrams WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                fields = [(length, label) for length, label in json.loads(row[0])]
+                self._remember(key, fields)
+                return fields
+        return None
+
+    def put(self, key: str, fields: DiagramFields) -> None:
+        self._remember(key, fields)
+        db = self._connect()
+        if db is not None:
+            db.execute("INSERT OR REPLACE INTO diagrams (key, fields) VALUES (?, ?)", (key, json.dumps(fields)))
+            db.commit()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_diagram_cache : Optional[DiagramCache] = None
+
+def diagram_cache() -> DiagramCache:
+    """
+    The process-wide diagram cache. This is backed by the SQLite database named by
+    the NPT_DIAGRAM_CACHE environment variable, if that is set.
+    """
+    global _diagram_cache
+    if _diagram_cache is None:
+        db_path = os.environ.get("NPT_DIAGRAM_CACHE")
+        _diagram_cache = DiagramCache(db_path=Path(db_path) if db_path else None)
+    return _diagram_cache
+
+# =================================================================================================
 
 def stem(phrase):
     if phrase[-1] == 's':
@@ -62,9 +208,30 @@ def resolve_multiline_length(tokens):
                     else max([ length for desc, delim, length in tokens]) * (field.count('\n')+1)
     return ( length , field.strip())
 
+# Each statement rule in the grammar requires certain literal keywords to be present
+# in a paragraph. Checking for these first is much cheaper than attempting a parse,
+# and rules out all but (at most) one of the statement rules for most paragraphs.
+STATEMENT_PREFILTERS : Dict[str, Callable[[str], bool]] = {
+    "preamble"            : lambda text: "formatted" in text and "follows" in text,
+    "function"            : lambda text: "function is defined as:" in text,
+    "enum"                : lambda text: "is one of" in text or "is either " in text,
+    "serialised_to_func"  : lambda text: "is serialised to " in text,
+    "parsed_from_func"    : lambda text: "is parsed from " in text,
+    "protocol_definition" : lambda text: "document" in text and "describes" in text,
+}
+
 class AsciiDiagramsParser(Parser):
+    probe_attempts : Counter[str]
+    probe_hits     : Counter[str]
+    diagram_cache  : DiagramCache
+    grammar_digest : str
+
     def __init__(self) -> None:
         super().__init__()
+        self.diagram_cache = diagram_cache()
+        # Number of times each statement rule has been tried, and has matched:
+        self.probe_attempts = Counter()
+        self.probe_hits     = Counter()
 
     def new_field(self, full_label, short_label, options, size, units, value_constraint, is_present, is_array):
         return {"full_label": valid_field_name_convertor(full_label), "short_label": valid_field_name_convertor(short_label), "options" : options, "size": size, "units": units, "value_constraint": value_constraint, "is_present": is_present, "is_array": is_array}
@@ -119,8 +286,9 @@ class AsciiDiagramsParser(Parser):
         self.functions = {}
         self.serialise_to = {}
         self.parse_from = {}
-        with open("npt/grammar_asciidiagrams.txt") as grammarFile:
-            return parsley.makeGrammar(grammarFile.read(),
+        self.grammar_digest = grammar_digest(GRAMMAR_FILE)
+        grammar = compiled_grammar(GRAMMAR_FILE, grammar_cache_dir())
+        return parsley.wrapGrammar(grammar.createParserClass(OMetaBase,
                                    {
                                      "ascii_uppercase"          : string.ascii_uppercase,
                                      "ascii_lowercase"          : string.ascii_lowercase,
@@ -136,11 +304,23 @@ class AsciiDiagramsParser(Parser):
                                      "stem"                     : stem,
                                      "resolve_multiline_length" : resolve_multiline_length,
                                      "protocol"                 : self.proto
-                                   })
-
-    def process_diagram(self, artwork: str, parser) -> List[Tuple[Union[int, str], str]]:
-        delim_units = parser(artwork.strip()).diagram()
-        fields : List[Tuple[Union[int, str], str]] = []
+                                   }))
+
+    def process_diagram(self, artwork: str, parser) -> DiagramFields:
+        # The parsed fields depend only on the grammar and the diagram text, so
+        # diagrams seen before (e.g., in an earlier revision of a draft) are not
+        # parsed again.
+        diagram = artwork.strip()
+        key = hashlib.sha256(f"{self.grammar_digest}\n{diagram}".encode("utf-8")).hexdigest()
+        fields = self.diagram_cache.get(key)
+        if fields is None:
+            fields = self.parse_diagram(diagram, parser)
+            self.diagram_cache.put(key, fields)
+        return list(fields)
+
+    def parse_diagram(self, diagram: str, parser) -> DiagramFields:
+        delim_units = parser(diagram).diagram()
+        fields : DiagramFields = []
 
         for d_unit in delim_units:
             hlines =  d_unit.split(sep="\n")
@@ -165,135 +345,158 @@ class AsciiDiagramsParser(Parser):
         return fields
 
 
+    def classify_statement(self, text: str) -> List[str]:
+        """
+        Return the names of the statement rules that could match `text`.
+        """
+        return [rule for rule, prefilter in STATEMENT_PREFILTERS.items() if prefilter(text)]
+
+    def probe_rule(self, parser, text: str, rule: str) -> Any:
+        self.probe_attempts[rule] += 1
+        result = getattr(parser(text), rule)()
+        self.probe_hits[rule] += 1
+        return result
+
     def process_section(self, section : rfc.Section, parser, structs):
         for i in range(len(section.content)):
             t = section.content[i]
             if isinstance(t, rfc.T):
                 for j in range(len(t.content)):
-                    inner_t = cast(rfc.Text, t.content[j])
-                    try:
-                        pdu_name = parser(inner_t.content.strip()).preamble()
-                        if isinstance(section.content[i+1], rfc.Figure):
-                            fig = cast(rfc.Figure, section.content[i+1])
-                            artwork = fig.content[0].content
-                        else:
-                            artwork = cast(rfc.Artwork, section.content[i+1]).content
-                        artwork_fields = self.process_diagram( cast(rfc.Text, artwork).content, parser)
-                        where = section.content[i+2]
-                        fields = {}
-                        name_map = {}
-                        t_elem : Optional[rfc.T] = None
-                        if len(section.content) >= i+2 and type(section.content[i+2]) == rfc.T:
-                            t_elem = cast(rfc.T, section.content[i+2])
-                        if t_elem is not None and len(t_elem.content) >= 2 and type(t_elem.content[1]) == rfc.List:
-                                rfc_list = t_elem.content[1]
-                                desc_list = rfc_list.content[0].content
-                                for element in desc_list:
-                                    if type(element) is rfc.T:
-                                        t_elem = element
-                                        if t_elem.hangText is not None:
-                                            field = parser(t_elem.hangText.strip()).field_title()
-                                            field["context_field"] = None
-                                            if field["short_label"] is not None:
-                                                name_map[field["short_label"]] = field["full_label"]
-                                            fields[field["full_label"]] = field
-                        elif len(section.content) >= i+3 and isinstance(section.content[i+3], rfc.DL):
-                            desc_list = section.content[i+3] # type: ignore
-                            assert isinstance(desc_list, rfc.DL)
-                            for k in range(len(desc_list.content)):
-                                title, desc = desc_list.content[k]
-                                subfields = [type(desc_elem) is rfc.DL for desc_elem in desc.content]
-                                if subfields[-1] is True:
-                                    sub_desc_list = desc.content[len(subfields)-1]
-                                    assert isinstance(sub_desc_list, rfc.DL)
-                                    for j in range(len(sub_desc_list.content)):
-                                        sub_title, sub_desc = sub_desc_list.content[j]
-                                        sub_field = parser(cast(rfc.Text, sub_title.content[0]).content.strip()).field_title()
-                                        if len(sub_desc.content) >= 2:
-                                            sub_field_details = parser(cast(rfc.Text, cast(rfc.T, sub_desc.content[0]).content[0]).content.strip()).field_details()
-                                            sub_field["size"] = sub_field_details[0]
-                                            sub_field["units"] = sub_field_details[1]
-                                            sub_field["is_present"] = sub_field_details[2]
+                    inner_t = t.content[j]
+                    if not isinstance(inner_t, rfc.Text):
+                        continue
+                    text = inner_t.content.strip()
+                    candidates = self.classify_statement(text)
+
+                    if "preamble" in candidates:
+                        try:
+                            pdu_name = self.probe_rule(parser, text, "preamble")
+                            if isinstance(section.content[i+1], rfc.Figure):
+                                fig = cast(rfc.Figure, section.content[i+1])
+                                artwork = fig.content[0].content
+                            else:
+                                artwork = cast(rfc.Artwork, section.content[i+1]).content
+                            artwork_fields = self.process_diagram( cast(rfc.Text, artwork).content, parser)
+                            where = section.content[i+2]
+                            fields = {}
+                            name_map = {}
+                            t_elem : Optional[rfc.T] = None
+                            if len(section.content) >= i+2 and type(section.content[i+2]) == rfc.T:
+                                t_elem = cast(rfc.T, section.content[i+2])
+                            if t_elem is not None and len(t_elem.content) >= 2 and type(t_elem.content[1]) == rfc.List:
+                                    rfc_list = t_elem.content[1]
+                                    desc_list = rfc_list.content[0].content
+                                    for element in desc_list:
+                                        if type(element) is rfc.T:
+                                            t_elem = element
+                                            if t_elem.hangText is not None:
+                                                field = parser(t_elem.hangText.strip()).field_title()
+                                                field["context_field"] = None
+                                                if field["short_label"] is not None:
+                                                    name_map[field["short_label"]] = field["full_label"]
+                                                fields[field["full_label"]] = field
+                            elif len(section.content) >= i+3 and isinstance(section.content[i+3], rfc.DL):
+                                desc_list = section.content[i+3] # type: ignore
+                                assert isinstance(desc_list, rfc.DL)
+                                for k in range(len(desc_list.content)):
+                                    title, desc = desc_list.content[k]
+                                    subfields = [type(desc_elem) is rfc.DL for desc_elem in desc.content]
+                                    if subfields[-1] is True:
+                                        sub_desc_list = desc.content[len(subfields)-1]
+                                        assert isinstance(sub_desc_list, rfc.DL)
+                                        for j in range(len(sub_desc_list.content)):
+                                            sub_title, sub_desc = sub_desc_list.content[j]
+                                            sub_field = parser(cast(rfc.Text, sub_title.content[0]).content.strip()).field_title()
+                                            if len(sub_desc.content) >= 2:
+                                                sub_field_details = parser(cast(rfc.Text, cast(rfc.T, sub_desc.content[0]).content[0]).content.strip()).field_details()
+                                                sub_field["size"] = sub_field_details[0]
+                                                sub_field["units"] = sub_field_details[1]
+                                                sub_field["is_present"] = sub_field_details[2]
+                                                try:
+                                                    sub_context_field = parser(cast(rfc.Text, cast(rfc.Text, sub_desc.content[1]).content[0]).content.strip()).context_use()
+                                                except:
+                                                    sub_context_field = None
+                                            else:
+                                                try:
+                                                    sub_context_field = parser(cast(rfc.Text, sub_desc.content[-1]).content.strip()).context_use()
+                                                except:
+                                                    sub_context_field = None
+                                            sub_field["context_field"] = sub_context_field
+                                            if sub_field["short_label"] is not None:
+                                                name_map[sub_field["short_label"]] = sub_field["full_label"]
+                                            fields[sub_field["full_label"]] = sub_field
+                                    else:
+                                        field = parser(cast(rfc.Text, title.content[0]).content.strip()).field_title()
+                                        if len(desc.content) >= 2 and field["size"] is None and field["units"] is None:
+                                            field_details = parser(cast(rfc.Text, cast(rfc.Text, desc.content[0]).content[0]).content.strip()).field_details()
+                                            if len(field_details) == 5 and field_details[0] == "array":
+                                                field["size"] = None
+                                                field["units"] = field_details[1]
+                                                field["is_present"] = field_details[3]
+                                                field["value_constraint"] = field_details[2]
+                                                field["is_array"] = True
+                                            else:
+                                                field["size"] = field_details[0]
+                                                field["units"] = field_details[1]
+                                                field["value_constraint"] = field_details[2]
+                                                field["is_present"] = field_details[3]
                                             try:
-                                                sub_context_field = parser(cast(rfc.Text, cast(rfc.Text, sub_desc.content[1]).content[0]).content.strip()).context_use()
+                                                context_field = parser(cast(rfc.Text, cast(rfc.Text, desc.content[1]).content[0]).content.strip()).context_use()
                                             except:
-                                                sub_context_field = None
+                                                context_field = None
                                         else:
                                             try:
-                                                sub_context_field = parser(cast(rfc.Text, sub_desc.content[-1]).content.strip()).context_use()
+                                                context_field = parser(cast(rfc.Text, desc.content[-1]).content.strip()).context_use()
                                             except:
-                                                sub_context_field = None
-                                        sub_field["context_field"] = sub_context_field
-                                        if sub_field["short_label"] is not None:
-                                            name_map[sub_field["short_label"]] = sub_field["full_label"]
-                                        fields[sub_field["full_label"]] = sub_field
-                                else:
-                                    field = parser(cast(rfc.Text, title.content[0]).content.strip()).field_title()
-                                    if len(desc.content) >= 2 and field["size"] is None and field["units"] is None:
-                                        field_details = parser(cast(rfc.Text, cast(rfc.Text, desc.content[0]).content[0]).content.strip()).field_details()
-                                        if len(field_details) == 5 and field_details[0] == "array":
-                                            field["size"] = None
-                                            field["units"] = field_details[1]
-                                            field["is_present"] = field_details[3]
-                                            field["value_constraint"] = field_details[2]
-                                            field["is_array"] = True
-                                        else:
-                                            field["size"] = field_details[0]
-                                            field["units"] = field_details[1]
-                                            field["value_constraint"] = field_details[2]
-                                            field["is_present"] = field_details[3]
-                                        try:
-                                            context_field = parser(cast(rfc.Text, cast(rfc.Text, desc.content[1]).content[0]).content.strip()).context_use()
-                                        except:
-                                            context_field = None
-                                    else:
-                                        try:
-                                            context_field = parser(cast(rfc.Text, desc.content[-1]).content.strip()).context_use()
-                                        except:
-                                            context_field = None
-                                    field["context_field"] = context_field
-                                    if field["short_label"] is not None:
-                                        name_map[field["short_label"]] = field["full_label"]
-                                    fields[field["full_label"]] = field
-                        self.structs[valid_type_name_convertor(pdu_name)] = {}
-                        self.structs[valid_type_name_convertor(pdu_name)]["name_map"] = name_map
-                        self.structs[valid_type_name_convertor(pdu_name)]["fields"] = fields
-                    except Exception as e:
-                        pass
-
-                    try:
-                        function_name = parser(inner_t.content.strip()).function()
-                        function_artwork = cast(rfc.Artwork, section.content[i+1])
-                        function_text = cast(rfc.Text, function_artwork.content)
-                        function_def = parser(function_text.content.strip()).function_signature()
-                        self.functions[valid_field_name_convertor(function_name)] = function_def
-                    except Exception as e:
-                        pass
-
-                    try:
-                        enum_name, variants = parser(inner_t.content.strip()).enum()
-                        self.enums[valid_type_name_convertor(enum_name)] = [valid_type_name_convertor(variant) for variant in variants]
-                    except Exception as e:
-                        pass
-
-                    try:
-                        from_type, to_type, func_name = parser(inner_t.content.strip()).serialised_to_func()
-                        self.serialise_to[valid_type_name_convertor(from_type)] = (valid_type_name_convertor(to_type), valid_field_name_convertor(func_name))
-                    except Exception as e:
-                        pass
-
-                    try:
-                        from_type, to_type, func_name = parser(inner_t.content.strip()).parsed_from_func()
-                        self.parse_from[valid_type_name_convertor(from_type)] = (valid_type_name_convertor(to_type), valid_field_name_convertor(func_name))
-                    except Exception as e:
-                        pass
-
-                    try:
-                        protocol_name, pdus = parser(inner_t.content.strip()).protocol_definition()
-                        self.protocol_name = protocol_name
-                        self.pdus = [valid_type_name_convertor(pdu) for pdu in pdus]
-                    except Exception as e:
-                        continue
+                                                context_field = None
+                                        field["context_field"] = context_field
+                                        if field["short_label"] is not None:
+                                            name_map[field["short_label"]] = field["full_label"]
+                                        fields[field["full_label"]] = field
+                            self.structs[valid_type_name_convertor(pdu_name)] = {}
+                            self.structs[valid_type_name_convertor(pdu_name)]["name_map"] = name_map
+                            self.structs[valid_type_name_convertor(pdu_name)]["fields"] = fields
+                        except Exception as e:
+                            pass
+
+                    if "function" in candidates:
+                        try:
+                            function_name = self.probe_rule(parser, text, "function")
+                            function_artwork = cast(rfc.Artwork, section.content[i+1])
+                            function_text = cast(rfc.Text, function_artwork.content)
+                            function_def = parser(function_text.content.strip()).function_signature()
+                            self.functions[valid_field_name_convertor(function_name)] = function_def
+                        except Exception as e:
+                            pass
+
+                    if "enum" in candidates:
+                        try:
+                            enum_name, variants = self.probe_rule(parser, text, "enum")
+                            self.enums[valid_type_name_convertor(enum_name)] = [valid_type_name_convertor(variant) for variant in variants]
+                        except Exception as e:
+                            pass
+
+                    if "serialised_to_func" in candidates:
+                        try:
+                            from_type, to_type, func_name = self.probe_rule(parser, text, "serialised_to_func")
+                            self.serialise_to[valid_type_name_convertor(from_type)] = (valid_type_name_convertor(to_type), valid_field_name_convertor(func_name))
+                        except Exception as e:
+                            pass
+
+                    if "parsed_from_func" in candidates:
+                        try:
+                            from_type, to_type, func_name = self.probe_rule(parser, text, "parsed_from_func")
+                            self.parse_from[valid_type_name_convertor(from_type)] = (valid_type_name_convertor(to_type), valid_field_name_convertor(func_name))
+                        except Exception as e:
+                            pass
+
+                    if "protocol_definition" in candidates:
+                        try:
+                            protocol_name, pdus = self.probe_rule(parser, text, "protocol_definition")
+                            self.protocol_name = protocol_name
+                            self.pdus = [valid_type_name_convertor(pdu) for pdu in pdus]
+                        except Exception as e:
+                            continue
         if section.sections is not None:
             for subsection in section.sections:
                 self.process_section(subsection, parser, structs)
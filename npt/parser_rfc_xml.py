@@ -28,7 +28,7 @@
 # SPDX-License-Identifier: BSD-2-Clause
 # =================================================================================================
 
-from typing import List as ListType, Union, Optional, Tuple
+from typing import List as ListType, Union, Optional, Tuple, Any, BinaryIO, Callable, Dict
 
 import sys
 from lxml import etree as ET # type: ignore
@@ -36,6 +36,153 @@ from lxml import etree as ET # type: ignore
 import npt.rfc as rfc
 
 
+# =================================================================================================
+# Content model
+# =================================================================================================
+
+# The child elements that each element may contain, following RFC 7991, grouped by the slot
+# that the parsed children are collected into. Each child is parsed by the `parse_<tag>()`
+# function; elements not listed here are ignored. The DISPATCH table is derived from this
+# at the end of the module.
+
+INLINE = ["bcp14", "cref", "em", "eref", "iref", "relref", "strong", "sub", "sup", "tt", "xref"]
+BLOCK  = ["artwork", "dl", "figure", "ol", "sourcecode", "t", "ul"]
+
+CONTENT_MODEL : Dict[str, Dict[str, ListType[str]]] = {
+    "em"             : {"content"     : ["bcp14", "cref", "iref", "relref", "strong", "sub", "sup", "tt", "xref"]},
+    "cref"           : {"content"     : ["em", "eref", "relref", "strong", "sub", "sup", "tt", "xref"]},
+    "strong"         : {"content"     : [tag for tag in INLINE if tag != "strong"]},
+    "tt"             : {"content"     : [tag for tag in INLINE if tag != "tt"]},
+    "sub"            : {"content"     : [tag for tag in INLINE if tag not in ["sub", "sup"]]},
+    "sup"            : {"content"     : [tag for tag in INLINE if tag not in ["sub", "sup"]]},
+    "list"           : {"content"     : ["t"]},
+    "t"              : {"content"     : INLINE + ["spanx", "vspace", "t", "list"]},
+    "artwork"        : {"content"     : ["svg"]},
+    "postamble"      : {"content"     : [tag for tag in INLINE if tag != "relref"] + ["spanx"]},
+    "preamble"       : {"content"     : [tag for tag in INLINE if tag != "relref"] + ["spanx"]},
+    "name"           : {"content"     : ["cref", "eref", "relref", "tt", "xref"]},
+    "figure"         : {"name"        : ["name"],
+                        "irefs"       : ["iref"],
+                        "preamble"    : ["preamble"],
+                        "content"     : ["artwork", "sourcecode"],
+                        "postamble"   : ["postamble"]},
+    # Variants one and two in RFC 7991 section 2.29:
+    "li"             : {"content"     : BLOCK + INLINE},
+    "ul"             : {"content"     : ["li"]},
+    "ol"             : {"content"     : ["li"]},
+    # Variants one and two in RFC 7991 section 2.18:
+    "dd"             : {"content"     : BLOCK + INLINE},
+    "dt"             : {"content"     : INLINE},
+    "dl"             : {"dt"          : ["dt"],
+                        "dd"          : ["dd"]},
+    "ttcol"          : {"content"     : ["cref", "eref", "iref", "xref"]},
+    "c"              : {"content"     : [tag for tag in INLINE if tag != "relref"] + ["spanx"]},
+    "texttable"      : {"name"        : ["name"],
+                        "preamble"    : ["preamble"],
+                        "ttcols"      : ["ttcol"],
+                        "cs"          : ["c"],
+                        "postamble"   : ["postamble"]},
+    # Variants one and two in RFC 7991 sections 2.56 and 2.58:
+    "th"             : {"content"     : BLOCK + INLINE + ["br"]},
+    "td"             : {"content"     : BLOCK + INLINE + ["br"]},
+    "tr"             : {"content"     : ["td", "th"]},
+    "tbody"          : {"content"     : ["tr"]},
+    "tfoot"          : {"content"     : ["tr"]},
+    "thead"          : {"content"     : ["tr"]},
+    "table"          : {"name"        : ["name"],
+                        "irefs"       : ["iref"],
+                        "thead"       : ["thead"],
+                        "tbody"       : ["tbody"],
+                        "tfoot"       : ["tfoot"]},
+    "aside"          : {"content"     : ["artwork", "dl", "figure", "iref", "list", "ol", "t", "table", "ul"]},
+    # Variants one and two in RFC 7991 section 2.10:
+    "blockquote"     : {"content"     : BLOCK + INLINE},
+    "section"        : {"name"        : ["name"],
+                        "content"     : ["artwork", "aside", "blockquote", "dl", "figure", "iref", "ol",
+                                         "sourcecode", "t", "table", "texttable", "ul", "list"],
+                        "sections"    : ["section"]},
+    "middle"         : {"content"     : ["section"]},
+    # Variants one and two in RFC 7991 section 2.37:
+    "postal"         : {"content"     : ["city", "code", "country", "region", "street", "postalLine"]},
+    "address"        : {"postal"      : ["postal"],
+                        "phone"       : ["phone"],
+                        "facsimile"   : ["facsimile"],
+                        "email"       : ["email"],
+                        "uri"         : ["uri"]},
+    "author"         : {"org"         : ["organization"],
+                        "address"     : ["address"]},
+    "abstract"       : {"content"     : ["dl", "ol", "t", "ul"]},
+    "note"           : {"name"        : ["name"],
+                        "content"     : ["dl", "ol", "t", "ul"]},
+    "boilerplate"    : {"content"     : ["section"]},
+    "front"          : {"title"       : ["title"],
+                        "seriesInfo"  : ["seriesInfo"],
+                        "authors"     : ["author"],
+                        "date"        : ["date"],
+                        "areas"       : ["area"],
+                        "workgroups"  : ["workgroup"],
+                        "keywords"    : ["keyword"],
+                        "abstract"    : ["abstract"],
+                        "notes"       : ["note"],
+                        "boilerplate" : ["boilerplate"]},
+    "annotation"     : {"content"     : INLINE + ["spanx"]},
+    "refcontent"     : {"content"     : ["bcp14", "em", "strong", "sub", "sup", "tt"]},
+    "reference"      : {"front"       : ["front"],
+                        "content"     : ["annotation", "format", "refcontent", "seriesInfo"]},
+    "referencegroup" : {"content"     : ["reference"]},
+    "references"     : {"name"        : ["name"],
+                        "content"     : ["reference", "referencegroup"]},
+    "back"           : {"displayrefs" : ["displayreference"],
+                        "refs"        : ["references"],
+                        "sections"    : ["section"]},
+    "rfc"            : {"links"       : ["link"],
+                        "front"       : ["front"],
+                        "middle"      : ["middle"],
+                        "back"        : ["back"]},
+}
+
+# For each element, a map from the tag of each child element it may contain to the slot
+# that child is collected into and the function that parses it.
+DISPATCH : Dict[str, Dict[str, Tuple[str, Callable[[ET.Element], Any]]]] = {}
+
+
+def parse_children(xmlElement: ET.Element, model: str) -> Dict[str, ListType[Any]]:
+    """
+    Parse the children of an element with the given content model, collecting the
+    results into their slots in document order.
+    """
+    dispatch = DISPATCH[model]
+    slots : Dict[str, ListType[Any]] = {slot: [] for slot in CONTENT_MODEL[model]}
+    for child in xmlElement:
+        entry = dispatch.get(child.tag)
+        if entry is not None:
+            slots[entry[0]].append(entry[1](child))
+    return slots
+
+
+def parse_content(xmlElement: ET.Element, model: str, content: ListType[Any]) -> ListType[Any]:
+    """
+    Parse the children of an element whose content model has a single slot, appending
+    the results to `content`.
+    """
+    dispatch = DISPATCH[model]
+    for child in xmlElement:
+        entry = dispatch.get(child.tag)
+        if entry is not None:
+            content.append(entry[1](child))
+    return content
+
+
+def last(content: ListType[Any]) -> Any:
+    """
+    The last element of a slot that holds at most one element, or None.
+    """
+    return content[-1] if content else None
+
+# =================================================================================================
+# Element parsers
+# =================================================================================================
+
 def parse_bcp14(xmlElement: ET.Element) -> rfc.BCP14:
     assert xmlElement.text is not None
     return rfc.BCP14(rfc.Text(xmlElement.text))
@@ -45,25 +192,7 @@ def parse_em(xmlElement: ET.Element) -> rfc.EM:
     content : ListType[rfc.EmContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for emChild in xmlElement:
-        if emChild.tag == "bcp14":
-            content.append(parse_bcp14(emChild))
-        elif emChild.tag == "cref":
-            content.append(parse_cref(emChild))
-        elif emChild.tag == "iref":
-            content.append(parse_iref(emChild))
-        elif emChild.tag == "relref":
-            content.append(parse_relref(emChild))
-        elif emChild.tag == "strong":
-            content.append(parse_strong(emChild))
-        elif emChild.tag == "sub":
-            content.append(parse_sub(emChild))
-        elif emChild.tag == "sup":
-            content.append(parse_sup(emChild))
-        elif emChild.tag == "tt":
-            content.append(parse_tt(emChild))
-        elif emChild.tag == "xref":
-            content.append(parse_xref(emChild))
+    parse_content(xmlElement, "em", content)
     return rfc.EM(content)
 
 
@@ -103,23 +232,7 @@ def parse_cref(xmlElement: ET.Element) -> rfc.CRef:
     content : ListType[rfc.CRefContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for crefChild in xmlElement:
-        if crefChild.tag == "em":
-            content.append(parse_em(crefChild))
-        elif crefChild.tag == "eref":
-            content.append(parse_eref(crefChild))
-        elif crefChild.tag == "relref":
-            content.append(parse_relref(crefChild))
-        elif crefChild.tag == "strong":
-            content.append(parse_strong(crefChild))
-        elif crefChild.tag == "sub":
-            content.append(parse_sub(crefChild))
-        elif crefChild.tag == "sup":
-            content.append(parse_sup(crefChild))
-        elif crefChild.tag == "tt":
-            content.append(parse_tt(crefChild))
-        elif crefChild.tag == "xref":
-            content.append(parse_xref(crefChild))
+    parse_content(xmlElement, "cref", content)
     return rfc.CRef(content,
                     xmlElement.attrib.get("anchor", None),
                     xmlElement.attrib.get("display", True) == "true",
@@ -130,27 +243,7 @@ def parse_strong(xmlElement: ET.Element) -> rfc.Strong:
     content : ListType[rfc.StrongContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for strongChild in xmlElement:
-        if strongChild.tag == "bcp14":
-            content.append(parse_bcp14(strongChild))
-        elif strongChild.tag == "cref":
-            content.append(parse_cref(strongChild))
-        elif strongChild.tag == "em":
-            content.append(parse_em(strongChild))
-        elif strongChild.tag == "eref":
-            content.append(parse_eref(strongChild))
-        elif strongChild.tag == "iref":
-            content.append(parse_iref(strongChild))
-        elif strongChild.tag == "relref":
-            content.append(parse_relref(strongChild))
-        elif strongChild.tag == "sub":
-            content.append(parse_sub(strongChild))
-        elif strongChild.tag == "sup":
-            content.append(parse_sup(strongChild))
-        elif strongChild.tag == "tt":
-            content.append(parse_tt(strongChild))
-        elif strongChild.tag == "xref":
-            content.append(parse_xref(strongChild))
+    parse_content(xmlElement, "strong", content)
     return rfc.Strong(content)
 
 
@@ -158,27 +251,7 @@ def parse_tt(xmlElement: ET.Element) -> rfc.TT:
     content : ListType[rfc.TTContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for ttChild in xmlElement:
-        if ttChild.tag == "bcp14":
-            content.append(parse_bcp14(ttChild))
-        elif ttChild.tag == "cref":
-            content.append(parse_cref(ttChild))
-        elif ttChild.tag == "em":
-            content.append(parse_em(ttChild))
-        elif ttChild.tag == "eref":
-            content.append(parse_eref(ttChild))
-        elif ttChild.tag == "iref":
-            content.append(parse_iref(ttChild))
-        elif ttChild.tag == "relref":
-            content.append(parse_relref(ttChild))
-        elif ttChild.tag == "sub":
-            content.append(parse_sub(ttChild))
-        elif ttChild.tag == "sup":
-            content.append(parse_sup(ttChild))
-        elif ttChild.tag == "strong":
-            content.append(parse_strong(ttChild))
-        elif ttChild.tag == "xref":
-            content.append(parse_xref(ttChild))
+    parse_content(xmlElement, "tt", content)
     return rfc.TT(content)
 
 
@@ -186,25 +259,7 @@ def parse_sub(xmlElement: ET.Element) -> rfc.Sub:
     content : ListType[rfc.SubContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for subChild in xmlElement:
-        if subChild.tag == "bcp14":
-            content.append(parse_bcp14(subChild))
-        elif subChild.tag == "cref":
-            content.append(parse_cref(subChild))
-        elif subChild.tag == "em":
-            content.append(parse_em(subChild))
-        elif subChild.tag == "eref":
-            content.append(parse_eref(subChild))
-        elif subChild.tag == "iref":
-            content.append(parse_iref(subChild))
-        elif subChild.tag == "relref":
-            content.append(parse_relref(subChild))
-        elif subChild.tag == "strong":
-            content.append(parse_strong(subChild))
-        elif subChild.tag == "tt":
-            content.append(parse_tt(subChild))
-        elif subChild.tag == "xref":
-            content.append(parse_xref(subChild))
+    parse_content(xmlElement, "sub", content)
     return rfc.Sub(content)
 
 
@@ -212,25 +267,7 @@ def parse_sup(xmlElement: ET.Element) -> rfc.Sup:
     content : ListType[rfc.SupContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for supChild in xmlElement:
-        if supChild.tag == "bcp14":
-            content.append(parse_bcp14(supChild))
-        elif supChild.tag == "cref":
-            content.append(parse_cref(supChild))
-        elif supChild.tag == "em":
-            content.append(parse_em(supChild))
-        elif supChild.tag == "eref":
-            content.append(parse_eref(supChild))
-        elif supChild.tag == "iref":
-            content.append(parse_iref(supChild))
-        elif supChild.tag == "relref":
-            content.append(parse_relref(supChild))
-        elif supChild.tag == "strong":
-            content.append(parse_strong(supChild))
-        elif supChild.tag == "tt":
-            content.append(parse_tt(supChild))
-        elif supChild.tag == "xref":
-            content.append(parse_xref(supChild))
+    parse_content(xmlElement, "sup", content)
     return rfc.Sup(content)
 
 
@@ -243,9 +280,13 @@ def parse_spanx(xmlElement: ET.Element) -> rfc.SpanX:
 
 def parse_list(xmlElement: ET.Element) -> rfc.List:
     content : ListType[rfc.T] = []
+    dispatch = DISPATCH["list"]
     for listChild in xmlElement:
-        if listChild.tag == "t":
-            content.append(parse_t(xmlElement))
+        entry = dispatch.get(listChild.tag)
+        if entry is not None:
+            # Each <t> is parsed from the enclosing <list>, as it always has been; the
+            # protocol parser and formatters depend on the resulting structure.
+            content.append(entry[1](xmlElement))
     return rfc.List(content,
                     xmlElement.attrib.get("counter", None),
                     xmlElement.attrib.get("hangIndent", None),
@@ -260,37 +301,11 @@ def parse_t(xmlElement: ET.Element) -> rfc.T:
     content : ListType[rfc.TContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
+    dispatch = DISPATCH["t"]
     for child in xmlElement:
-        if child.tag == "bcp14":
-            content.append(parse_bcp14(child))
-        elif child.tag == "cref":
-            content.append(parse_cref(child))
-        elif child.tag == "em":
-            content.append(parse_em(child))
-        elif child.tag == "eref":
-            content.append(parse_eref(child))
-        elif child.tag == "iref":
-            content.append(parse_iref(child))
-        elif child.tag == "relref":
-            content.append(parse_relref(child))
-        elif child.tag == "spanx":
-            content.append(parse_spanx(child))
-        elif child.tag == "strong":
-            content.append(parse_strong(child))
-        elif child.tag == "sub":
-            content.append(parse_sub(child))
-        elif child.tag == "sup":
-            content.append(parse_sup(child))
-        elif child.tag == "tt":
-            content.append(parse_tt(child))
-        elif child.tag == "vspace":
-            content.append(parse_vspace(child))
-        elif child.tag == "t":
-            content.append(parse_t(child))
-        elif child.tag == "xref":
-            content.append(parse_xref(child))
-        elif child.tag == "list":
-            content.append(parse_list(child))
+        entry = dispatch.get(child.tag)
+        if entry is not None:
+            content.append(entry[1](child))
         if child.tail is not None:
             content.append(rfc.Text(child.tail))
     if xmlElement.tail is not None and len(xmlElement.tail.strip()) != 0:
@@ -302,15 +317,16 @@ def parse_t(xmlElement: ET.Element) -> rfc.T:
                  xmlElement.attrib.get("keepWithPrevious") == "true")
 
 
+def parse_svg(xmlElement: ET.Element) -> rfc.SVG:
+    return rfc.SVG()
+
+
 def parse_artwork(xmlElement: ET.Element) -> rfc.Artwork:
     content : Union[rfc.Text, ListType[rfc.SVG]]
     if xmlElement.text is not None:
         content = rfc.Text(xmlElement.text)
     else:
-        content = []
-        for artworkChild in xmlElement:
-            if artworkChild.tag == "svg":
-                content.append(rfc.SVG())
+        content = parse_content(xmlElement, "artwork", [])
     return rfc.Artwork(content,
                        xmlElement.attrib.get("align", "left"),
                        xmlElement.attrib.get("alt"),
@@ -327,29 +343,7 @@ def parse_postamble(xmlElement: ET.Element) -> rfc.Postamble:
     content : ListType[rfc.PostambleContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for postambleChild in xmlElement:
-        if postambleChild.tag == "bcp14":
-            content.append(parse_bcp14(postambleChild))
-        elif postambleChild.tag == "cref":
-            content.append(parse_cref(postambleChild))
-        elif postambleChild.tag == "em":
-            content.append(parse_em(postambleChild))
-        elif postambleChild.tag == "eref":
-            content.append(parse_eref(postambleChild))
-        elif postambleChild.tag == "iref":
-            content.append(parse_iref(postambleChild))
-        elif postambleChild.tag == "spanx":
-            content.append(parse_spanx(postambleChild))
-        elif postambleChild.tag == "strong":
-            content.append(parse_strong(postambleChild))
-        elif postambleChild.tag == "sub":
-            content.append(parse_sub(postambleChild))
-        elif postambleChild.tag == "sup":
-            content.append(parse_sup(postambleChild))
-        elif postambleChild.tag == "tt":
-            content.append(parse_tt(postambleChild))
-        elif postambleChild.tag == "xref":
-            content.append(parse_xref(postambleChild))
+    parse_content(xmlElement, "postamble", content)
     return rfc.Postamble(content)
 
 
@@ -357,29 +351,7 @@ def parse_preamble(xmlElement: ET.Element) -> rfc.Preamble:
     content : ListType[rfc.PreambleContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for preambleChild in xmlElement:
-        if preambleChild.tag == "bcp14":
-            content.append(parse_bcp14(preambleChild))
-        elif preambleChild.tag == "cref":
-            content.append(parse_cref(preambleChild))
-        elif preambleChild.tag == "em":
-            content.append(parse_em(preambleChild))
-        elif preambleChild.tag == "eref":
-            content.append(parse_eref(preambleChild))
-        elif preambleChild.tag == "iref":
-            content.append(parse_iref(preambleChild))
-        elif preambleChild.tag == "spanx":
-            content.append(parse_spanx(preambleChild))
-        elif preambleChild.tag == "strong":
-            content.append(parse_strong(preambleChild))
-        elif preambleChild.tag == "sub":
-            content.append(parse_sub(preambleChild))
-        elif preambleChild.tag == "sup":
-            content.append(parse_sup(preambleChild))
-        elif preambleChild.tag == "tt":
-            content.append(parse_tt(preambleChild))
-        elif preambleChild.tag == "xref":
-            content.append(parse_xref(preambleChild))
+    parse_content(xmlElement, "preamble", content)
     return rfc.Preamble(content)
 
 
@@ -387,17 +359,7 @@ def parse_name(xmlElement: ET.Element) -> rfc.Name:
     content : ListType[rfc.NameContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for nameChild in xmlElement:
-        if nameChild.tag == "cref":
-            content.append(parse_cref(nameChild))
-        elif nameChild.tag == "eref":
-            content.append(parse_eref(nameChild))
-        elif nameChild.tag == "relref":
-            content.append(parse_relref(nameChild))
-        elif nameChild.tag == "tt":
-            content.append(parse_tt(nameChild))
-        elif nameChild.tag == "xref":
-            content.append(parse_xref(nameChild))
+    parse_content(xmlElement, "name", content)
     return rfc.Name(content)
 
 
@@ -411,29 +373,12 @@ def parse_sourcecode(xmlElement: ET.Element) -> rfc.SourceCode:
 
 
 def parse_figure(xmlElement: ET.Element) -> rfc.Figure:
-    name = None
-    irefs = []
-    preamble = None
-    content : ListType[Union[rfc.Artwork, rfc.SourceCode]] = []
-    postamble = None
-    for figureChild in xmlElement:
-        if figureChild.tag == "name":
-            name = parse_name(figureChild)
-        elif figureChild.tag == "iref":
-            irefs.append(parse_iref(figureChild))
-        elif figureChild.tag == "preamble":
-            preamble = parse_preamble(figureChild)
-        elif figureChild.tag == "artwork":
-            content.append(parse_artwork(figureChild))
-        elif figureChild.tag == "sourcecode":
-            content.append(parse_sourcecode(figureChild))
-        elif figureChild.tag == "postamble":
-            postamble = parse_postamble(figureChild)
-    return rfc.Figure(name,
-                      irefs,
-                      preamble,
-                      content,
-                      postamble,
+    children = parse_children(xmlElement, "figure")
+    return rfc.Figure(last(children["name"]),
+                      children["irefs"],
+                      last(children["preamble"]),
+                      children["content"],
+                      last(children["postamble"]),
                       xmlElement.attrib.get("align", "left"),
                       xmlElement.attrib.get("alt"),
                       xmlElement.attrib.get("anchor"),
@@ -448,65 +393,19 @@ def parse_li(xmlElement: ET.Element) -> rfc.LI:
     content : ListType[rfc.LIContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for liChild in xmlElement:
-        # Variant one in RFC 7991 section 2.29:
-        if liChild.tag == "artwork":
-            content.append(parse_artwork(liChild))
-        elif liChild.tag == "dl":
-            content.append(parse_dl(liChild))
-        elif liChild.tag == "figure":
-            content.append(parse_figure(liChild))
-        elif liChild.tag == "ol":
-            content.append(parse_ol(liChild))
-        elif liChild.tag == "sourcecode":
-            content.append(parse_sourcecode(liChild))
-        elif liChild.tag == "t":
-            content.append(parse_t(liChild))
-        elif liChild.tag == "ul":
-            content.append(parse_ul(liChild))
-        # Variant two in RFC 7991 section 2.29:
-        elif liChild.tag == "bcp14":
-            content.append(parse_bcp14(liChild))
-        elif liChild.tag == "cref":
-            content.append(parse_cref(liChild))
-        elif liChild.tag == "em":
-            content.append(parse_em(liChild))
-        elif liChild.tag == "eref":
-            content.append(parse_eref(liChild))
-        elif liChild.tag == "iref":
-            content.append(parse_iref(liChild))
-        elif liChild.tag == "relref":
-            content.append(parse_relref(liChild))
-        elif liChild.tag == "strong":
-            content.append(parse_strong(liChild))
-        elif liChild.tag == "sub":
-            content.append(parse_sub(liChild))
-        elif liChild.tag == "sup":
-            content.append(parse_sup(liChild))
-        elif liChild.tag == "tt":
-            content.append(parse_tt(liChild))
-        elif liChild.tag == "xref":
-            content.append(parse_xref(liChild))
+    parse_content(xmlElement, "li", content)
     return rfc.LI(content, xmlElement.attrib.get("anchor", None))
 
 
 def parse_ul(xmlElement: ET.Element) -> rfc.UL:
-    content = []
-    for ulChild in xmlElement:
-        if ulChild.tag == "li":
-            content.append(parse_li(ulChild))
-    return rfc.UL(content,
+    return rfc.UL(parse_content(xmlElement, "ul", []),
                   xmlElement.attrib.get("anchor"),
                   xmlElement.attrib.get("empty") == "true",
                   xmlElement.attrib.get("spacing", "normal"))
 
 
 def parse_ol(xmlElement: ET.Element) -> rfc.OL:
-    content = []
-    for olChild in xmlElement:
-        if olChild.tag == "li":
-            content.append(parse_li(olChild))
-    return rfc.OL(content,
+    return rfc.OL(parse_content(xmlElement, "ol", []),
                   xmlElement.attrib.get("anchor"),
                   xmlElement.attrib.get("group"),
                   xmlElement.attrib.get("spacing", "normal"),
@@ -520,45 +419,11 @@ def parse_dd(xmlElement: ET.Element) -> rfc.DD:
     if xmlElement.text is not None and len(xmlElement.text.strip()) != 0:
         content.append(rfc.Text(xmlElement.text))
 
+    dispatch = DISPATCH["dd"]
     for ddChild in xmlElement:
-        # Variant one in RFC 7991 section 2.18:
-        if ddChild.tag == "artwork":
-            content.append(parse_artwork(ddChild))
-        elif ddChild.tag == "dl":
-            content.append(parse_dl(ddChild))
-        elif ddChild.tag == "figure":
-            content.append(parse_figure(ddChild))
-        elif ddChild.tag == "ol":
-            content.append(parse_ol(ddChild))
-        elif ddChild.tag == "sourcecode":
-            content.append(parse_sourcecode(ddChild))
-        elif ddChild.tag == "t":
-            content.append(parse_t(ddChild))
-        elif ddChild.tag == "ul":
-            content.append(parse_ul(ddChild))
-        # Variant two in RFC 7991 section 2.18:
-        elif ddChild.tag == "bcp14":
-            content.append(parse_bcp14(ddChild))
-        elif ddChild.tag == "cref":
-            content.append(parse_cref(ddChild))
-        elif ddChild.tag == "em":
-            content.append(parse_em(ddChild))
-        elif ddChild.tag == "eref":
-            content.append(parse_eref(ddChild))
-        elif ddChild.tag == "iref":
-            content.append(parse_iref(ddChild))
-        elif ddChild.tag == "relref":
-            content.append(parse_relref(ddChild))
-        elif ddChild.tag == "strong":
-            content.append(parse_strong(ddChild))
-        elif ddChild.tag == "sub":
-            content.append(parse_sub(ddChild))
-        elif ddChild.tag == "sup":
-            content.append(parse_sup(ddChild))
-        elif ddChild.tag == "tt":
-            content.append(parse_tt(ddChild))
-        elif ddChild.tag == "xref":
-            content.append(parse_xref(ddChild))
+        entry = dispatch.get(ddChild.tag)
+        if entry is not None:
+            content.append(entry[1](ddChild))
         if ddChild.tail is not None and len(ddChild.tail.strip()) != 0:
             content.append(rfc.Text(ddChild.tail))
 
@@ -569,46 +434,25 @@ def parse_dt(xmlElement: ET.Element) -> rfc.DT:
     content : ListType[rfc.DTContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for dtChild in xmlElement:
-        if dtChild.tag == "bcp14":
-            content.append(parse_bcp14(dtChild))
-        elif dtChild.tag == "cref":
-            content.append(parse_cref(dtChild))
-        elif dtChild.tag == "em":
-            content.append(parse_em(dtChild))
-        elif dtChild.tag == "eref":
-            content.append(parse_eref(dtChild))
-        elif dtChild.tag == "iref":
-            content.append(parse_iref(dtChild))
-        elif dtChild.tag == "relref":
-            content.append(parse_relref(dtChild))
-        elif dtChild.tag == "strong":
-            content.append(parse_strong(dtChild))
-        elif dtChild.tag == "sub":
-            content.append(parse_sub(dtChild))
-        elif dtChild.tag == "sup":
-            content.append(parse_sup(dtChild))
-        elif dtChild.tag == "tt":
-            content.append(parse_tt(dtChild))
-        elif dtChild.tag == "xref":
-            content.append(parse_xref(dtChild))
+    parse_content(xmlElement, "dt", content)
     return rfc.DT(content, xmlElement.attrib.get("anchor"))
 
 
 def parse_dl(xmlElement) -> rfc.DL:
     content : ListType[Tuple[rfc.DT, rfc.DD]] = []
     dt = None
-    dd = None
+    dispatch = DISPATCH["dl"]
     for dlChild in xmlElement:
-        if dlChild.tag == "dt":
-            assert dd == None
-            dt = parse_dt(dlChild)
-        elif dlChild.tag == "dd":
+        entry = dispatch.get(dlChild.tag)
+        if entry is None:
+            continue
+        slot, handler = entry
+        if slot == "dt":
+            dt = handler(dlChild)
+        else:
             assert dt is not None
-            dd = parse_dd(dlChild)
-            content.append((dt, dd))
+            content.append((dt, handler(dlChild)))
             dt = None
-            dd = None
     return rfc.DL(content,
                   xmlElement.attrib.get("anchor"),
                   not xmlElement.attrib.get("hanging") == "false",
@@ -616,16 +460,7 @@ def parse_dl(xmlElement) -> rfc.DL:
 
 
 def parse_ttcol(xmlElement: ET.Element) -> rfc.TTCol:
-    content : ListType[Union[rfc.Text, rfc.CRef, rfc.ERef, rfc.IRef, rfc.XRef]] = []
-    for ttcolChild in xmlElement:
-        if ttcolChild.tag == "cref":
-            content.append(parse_cref(ttcolChild))
-        elif ttcolChild.tag == "eref":
-            content.append(parse_eref(ttcolChild))
-        elif ttcolChild.tag == "iref":
-            content.append(parse_iref(ttcolChild))
-        elif ttcolChild.tag == "xref":
-            content.append(parse_xref(ttcolChild))
+    content : ListType[Union[rfc.Text, rfc.CRef, rfc.ERef, rfc.IRef, rfc.XRef]] = parse_content(xmlElement, "ttcol", [])
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
     return rfc.TTCol(content,
@@ -635,56 +470,23 @@ def parse_ttcol(xmlElement: ET.Element) -> rfc.TTCol:
 
 def parse_c(xmlElement: ET.Element) -> rfc.C:
     content :  ListType[rfc.CContent] = []
+    dispatch = DISPATCH["c"]
     for cChild in xmlElement:
-        if cChild.tag == "bcp14":
-            content.append(parse_bcp14(cChild))
-        elif cChild.tag == "cref":
-            content.append(parse_cref(cChild))
-        elif cChild.tag == "em":
-            content.append(parse_em(cChild))
-        elif cChild.tag == "eref":
-            content.append(parse_eref(cChild))
-        elif cChild.tag == "iref":
-            content.append(parse_iref(cChild))
-        elif cChild.tag == "spanx":
-            content.append(parse_spanx(cChild))
-        elif cChild.tag == "strong":
-            content.append(parse_strong(cChild))
-        elif cChild.tag == "sub":
-            content.append(parse_sub(cChild))
-        elif cChild.tag == "sup":
-            content.append(parse_sup(cChild))
-        elif cChild.tag == "tt":
-            content.append(parse_tt(cChild))
-        elif cChild.tag == "xref":
-            content.append(parse_xref(cChild))
+        entry = dispatch.get(cChild.tag)
+        if entry is not None:
+            content.append(entry[1](cChild))
         if cChild.text is not None:
             content.append(rfc.Text(cChild.text))
     return rfc.C(content)
 
 
 def parse_texttable(xmlElement: ET.Element) -> rfc.TextTable:
-    name = None
-    preamble = None
-    ttcols = []
-    cs = []
-    postamble = None
-    for texttableChild in xmlElement:
-        if texttableChild.tag == "name":
-            name = parse_name(texttableChild)
-        elif texttableChild.tag == "preamble":
-            preamble = parse_preamble(texttableChild)
-        elif texttableChild.tag == "ttcol":
-            ttcols.append(parse_ttcol(texttableChild))
-        elif texttableChild.tag == "c":
-            cs.append(parse_c(texttableChild))
-        elif texttableChild.tag == "postamble":
-            postamble = parse_postamble(texttableChild)
-    return rfc.TextTable(name,
-                         preamble,
-                         ttcols,
-                         cs,
-                         postamble,
+    children = parse_children(xmlElement, "texttable")
+    return rfc.TextTable(last(children["name"]),
+                         last(children["preamble"]),
+                         children["ttcols"],
+                         children["cs"],
+                         last(children["postamble"]),
                          xmlElement.attrib.get("align", "center"),
                          xmlElement.attrib.get("anchor"),
                          xmlElement.attrib.get("style"),
@@ -700,47 +502,7 @@ def parse_th(xmlElement: ET.Element) -> rfc.TH:
     content : ListType[rfc.THContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for thChild in xmlElement:
-        # Variant one in RFC 7991 section 2.58:
-        if thChild.tag == "artwork":
-            content.append(parse_artwork(thChild))
-        elif thChild.tag == "dl":
-            content.append(parse_dl(thChild))
-        elif thChild.tag == "figure":
-            content.append(parse_figure(thChild))
-        elif thChild.tag == "ol":
-            content.append(parse_ol(thChild))
-        elif thChild.tag == "sourcecode":
-            content.append(parse_sourcecode(thChild))
-        elif thChild.tag == "t":
-            content.append(parse_t(thChild))
-        elif thChild.tag == "ul":
-            content.append(parse_ul(thChild))
-        # Variant two in RFC 7991 section 2.58:
-        elif thChild.tag == "bcp14":
-            content.append(parse_bcp14(thChild))
-        elif thChild.tag == "br":
-            content.append(parse_br(thChild))
-        elif thChild.tag == "cref":
-            content.append(parse_cref(thChild))
-        elif thChild.tag == "em":
-            content.append(parse_em(thChild))
-        elif thChild.tag == "eref":
-            content.append(parse_eref(thChild))
-        elif thChild.tag == "iref":
-            content.append(parse_iref(thChild))
-        elif thChild.tag == "relref":
-            content.append(parse_relref(thChild))
-        elif thChild.tag == "strong":
-            content.append(parse_strong(thChild))
-        elif thChild.tag == "sub":
-            content.append(parse_sub(thChild))
-        elif thChild.tag == "sup":
-            content.append(parse_sup(thChild))
-        elif thChild.tag == "tt":
-            content.append(parse_tt(thChild))
-        elif thChild.tag == "xref":
-            content.append(parse_xref(thChild))
+    parse_content(xmlElement, "th", content)
     return rfc.TH(content,
                   xmlElement.attrib.get("align", "left"),
                   xmlElement.attrib.get("anchor", None),
@@ -752,47 +514,7 @@ def parse_td(xmlElement: ET.Element) -> rfc.TD:
     content : ListType[rfc.TDContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for tdChild in xmlElement:
-        # Variant one in RFC 7991 section 2.56:
-        if tdChild.tag == "artwork":
-            content.append(parse_artwork(tdChild))
-        elif tdChild.tag == "dl":
-            content.append(parse_dl(tdChild))
-        elif tdChild.tag == "figure":
-            content.append(parse_figure(tdChild))
-        elif tdChild.tag == "ol":
-            content.append(parse_ol(tdChild))
-        elif tdChild.tag == "sourcecode":
-            content.append(parse_sourcecode(tdChild))
-        elif tdChild.tag == "t":
-            content.append(parse_t(tdChild))
-        elif tdChild.tag == "ul":
-            content.append(parse_ul(tdChild))
-        # Variant two in RFC 7991 section 2.56:
-        elif tdChild.tag == "bcp14":
-            content.append(parse_bcp14(tdChild))
-        elif tdChild.tag == "br":
-            content.append(parse_br(tdChild))
-        elif tdChild.tag == "cref":
-            content.append(parse_cref(tdChild))
-        elif tdChild.tag == "em":
-            content.append(parse_em(tdChild))
-        elif tdChild.tag == "eref":
-            content.append(parse_eref(tdChild))
-        elif tdChild.tag == "iref":
-            content.append(parse_iref(tdChild))
-        elif tdChild.tag == "relref":
-            content.append(parse_relref(tdChild))
-        elif tdChild.tag == "strong":
-            content.append(parse_strong(tdChild))
-        elif tdChild.tag == "sub":
-            content.append(parse_sub(tdChild))
-        elif tdChild.tag == "sup":
-            content.append(parse_sup(tdChild))
-        elif tdChild.tag == "tt":
-            content.append(parse_tt(tdChild))
-        elif tdChild.tag == "xref":
-            content.append(parse_xref(tdChild))
+    parse_content(xmlElement, "td", content)
     return rfc.TD(content,
                   xmlElement.attrib.get("align", "left"),
                   xmlElement.attrib.get("anchor", None),
@@ -801,136 +523,49 @@ def parse_td(xmlElement: ET.Element) -> rfc.TD:
 
 
 def parse_tr(xmlElement: ET.Element) -> rfc.TR:
-    content : ListType[Union[rfc.TD, rfc.TH]] = []
-    for trChild in xmlElement:
-        if trChild.tag == "td":
-            content.append(parse_td(trChild))
-        elif trChild.tag == "th":
-            content.append(parse_th(trChild))
-    return rfc.TR(content,
+    return rfc.TR(parse_content(xmlElement, "tr", []),
                   xmlElement.attrib.get("anchor", None))
 
 
 def parse_tbody(xmlElement: ET.Element) -> rfc.TBody:
-    content = []
-    for tbodyChild in xmlElement:
-        if tbodyChild.tag == "tr":
-            content.append(parse_tr(tbodyChild))
-    return rfc.TBody(content,
+    return rfc.TBody(parse_content(xmlElement, "tbody", []),
                      xmlElement.attrib.get("anchor", None))
 
 
 def parse_tfoot(xmlElement: ET.Element) -> rfc.TFoot:
-    content = []
-    for tfootChild in xmlElement:
-        if tfootChild.tag == "tr":
-            content.append(parse_tr(tfootChild))
-    return rfc.TFoot(content,
+    return rfc.TFoot(parse_content(xmlElement, "tfoot", []),
                      xmlElement.attrib.get("anchor", None))
 
 
 def parse_thead(xmlElement: ET.Element) -> rfc.THead:
-    content = []
-    for theadChild in xmlElement:
-        if theadChild.tag == "tr":
-            content.append(parse_tr(theadChild))
-    return rfc.THead(content,
+    return rfc.THead(parse_content(xmlElement, "thead", []),
                      xmlElement.attrib.get("anchor", None))
 
 
 def parse_table(xmlElement: ET.Element) -> rfc.Table:
-    name = None
-    irefs = []
-    thead = None
-    tbody = []
-    tfoot = None
-    for tableChild in xmlElement:
-        if tableChild.tag == "name":
-            name = parse_name(tableChild)
-        elif tableChild.tag == "iref":
-            irefs.append(parse_iref(tableChild))
-        elif tableChild.tag == "thead":
-            thead = parse_thead(tableChild)
-        elif tableChild.tag == "tbody":
-            tbody.append(parse_tbody(tableChild))
-        elif tableChild.tag == "tfoot":
-            tfoot = parse_tfoot(tableChild)
-    return rfc.Table(name,
-                     irefs,
-                     thead,
-                     tbody,
-                     tfoot,
+    children = parse_children(xmlElement, "table")
+    return rfc.Table(last(children["name"]),
+                     children["irefs"],
+                     last(children["thead"]),
+                     children["tbody"],
+                     last(children["tfoot"]),
                      xmlElement.attrib.get("anchor"))
 
 
 def parse_aside(xmlElement: ET.Element) -> rfc.Aside:
-    content : ListType[Union[rfc.Artwork, rfc.DL, rfc.Figure, rfc.IRef, rfc.List, rfc.OL, rfc.T, rfc.Table, rfc.UL]] = []
-    for asideChild in xmlElement:
-        if asideChild.tag == "artwork":
-            content.append(parse_artwork(asideChild))
-        elif asideChild.tag == "dl":
-            content.append(parse_dl(asideChild))
-        elif asideChild.tag == "figure":
-            content.append(parse_figure(asideChild))
-        elif asideChild.tag == "iref":
-            content.append(parse_iref(asideChild))
-        elif asideChild.tag == "list":
-            content.append(parse_list(asideChild))
-        elif asideChild.tag == "ol":
-            content.append(parse_ol(asideChild))
-        elif asideChild.tag == "t":
-            content.append(parse_t(asideChild))
-        elif asideChild.tag == "table":
-            content.append(parse_table(asideChild))
-        elif asideChild.tag == "ul":
-            content.append(parse_ul(asideChild))
-    return rfc.Aside(content,
+    return rfc.Aside(parse_content(xmlElement, "aside", []),
                      xmlElement.attrib.get("anchor", None))
 
 
 def parse_blockquote(xmlElement: ET.Element) -> rfc.BlockQuote:
     content : ListType[rfc.BlockQuoteContent] = []
+    dispatch = DISPATCH["blockquote"]
     for blockquoteChild in xmlElement:
         if blockquoteChild.text is not None:
             content.append(rfc.Text(blockquoteChild.text))
-        # Variant one in RFC 7991 section 2.10:
-        if blockquoteChild.tag == "artwork":
-            content.append(parse_artwork(blockquoteChild))
-        elif blockquoteChild.tag == "dl":
-            content.append(parse_dl(blockquoteChild))
-        elif blockquoteChild.tag == "figure":
-            content.append(parse_figure(blockquoteChild))
-        elif blockquoteChild.tag == "ol":
-            content.append(parse_ol(blockquoteChild))
-        elif blockquoteChild.tag == "sourcecode":
-            content.append(parse_sourcecode(blockquoteChild))
-        elif blockquoteChild.tag == "t":
-            content.append(parse_t(blockquoteChild))
-        elif blockquoteChild.tag == "ul":
-            content.append(parse_ul(blockquoteChild))
-        # Variant two in RFC 7991 section 2.10:
-        elif blockquoteChild.tag == "bcp14":
-            content.append(parse_bcp14(blockquoteChild))
-        elif blockquoteChild.tag == "cref":
-            content.append(parse_cref(blockquoteChild))
-        elif blockquoteChild.tag == "em":
-            content.append(parse_em(blockquoteChild))
-        elif blockquoteChild.tag == "eref":
-            content.append(parse_eref(blockquoteChild))
-        elif blockquoteChild.tag == "iref":
-            content.append(parse_iref(blockquoteChild))
-        elif blockquoteChild.tag == "relref":
-            content.append(parse_relref(blockquoteChild))
-        elif blockquoteChild.tag == "strong":
-            content.append(parse_strong(blockquoteChild))
-        elif blockquoteChild.tag == "sub":
-            content.append(parse_sub(blockquoteChild))
-        elif blockquoteChild.tag == "sup":
-            content.append(parse_sup(blockquoteChild))
-        elif blockquoteChild.tag == "tt":
-            content.append(parse_tt(blockquoteChild))
-        elif blockquoteChild.tag == "xref":
-            content.append(parse_xref(blockquoteChild))
+        entry = dispatch.get(blockquoteChild.tag)
+        if entry is not None:
+            content.append(entry[1](blockquoteChild))
     return rfc.BlockQuote(content,
                           xmlElement.attrib.get("anchor", None),
                           xmlElement.attrib.get("cite", None),
@@ -938,43 +573,10 @@ def parse_blockquote(xmlElement: ET.Element) -> rfc.BlockQuote:
 
 
 def parse_section(xmlElement: ET.Element) -> rfc.Section:
-    name = None
-    content : ListType[Union[rfc.Artwork, rfc.Aside, rfc.BlockQuote, rfc.DL, rfc.Figure, rfc.IRef, rfc.OL, rfc.SourceCode, rfc.T, rfc.Table, rfc.TextTable, rfc.UL, rfc.List]] = []
-    sections = []
-    for sectionChild in xmlElement:
-        if sectionChild.tag == "artwork":
-            content.append(parse_artwork(sectionChild))
-        elif sectionChild.tag == "aside":
-            content.append(parse_aside(sectionChild))
-        elif sectionChild.tag == "blockquote":
-            content.append(parse_blockquote(sectionChild))
-        elif sectionChild.tag == "dl":
-            content.append(parse_dl(sectionChild))
-        elif sectionChild.tag == "figure":
-            content.append(parse_figure(sectionChild))
-        elif sectionChild.tag == "iref":
-            content.append(parse_iref(sectionChild))
-        elif sectionChild.tag == "ol":
-            content.append(parse_ol(sectionChild))
-        elif sectionChild.tag == "sourcecode":
-            content.append(parse_sourcecode(sectionChild))
-        elif sectionChild.tag == "t":
-            content.append(parse_t(sectionChild))
-        elif sectionChild.tag == "table":
-            content.append(parse_table(sectionChild))
-        elif sectionChild.tag == "texttable":
-            content.append(parse_texttable(sectionChild))
-        elif sectionChild.tag == "ul":
-            content.append(parse_ul(sectionChild))
-        elif sectionChild.tag == "list":
-            content.append(parse_list(sectionChild))
-        elif sectionChild.tag == "section":
-            sections.append(parse_section(sectionChild))
-        elif sectionChild.tag == "name":
-            name = parse_name(sectionChild)
-    return rfc.Section(name,
-                       content,
-                       sections,
+    children = parse_children(xmlElement, "section")
+    return rfc.Section(last(children["name"]),
+                       children["content"],
+                       children["sections"],
                        xmlElement.attrib.get("anchor"),
                        not xmlElement.attrib.get("numbered") == "false",
                        xmlElement.attrib.get("removeInRFC") == "true",
@@ -983,11 +585,7 @@ def parse_section(xmlElement: ET.Element) -> rfc.Section:
 
 
 def parse_middle(xmlElement: ET.Element) -> rfc.Middle:
-    content = []
-    for middleChild in xmlElement:
-        if middleChild.tag == "section":
-            content.append(parse_section(middleChild))
-    return rfc.Middle(content)
+    return rfc.Middle(parse_content(xmlElement, "middle", []))
 
 
 def parse_street(xmlElement: ET.Element) -> rfc.Street:
@@ -1021,23 +619,7 @@ def parse_country(xmlElement: ET.Element) -> rfc.Country:
 
 
 def parse_postal(xmlElement: ET.Element) -> rfc.Postal:
-    postalElements : ListType[rfc.PostalContent] = []
-    for postalChild in xmlElement:
-        # Variant one in RFC 7991 section 2.37:
-        if postalChild.tag == "city":
-            postalElements.append(parse_city(postalChild))
-        elif postalChild.tag == "code":
-            postalElements.append(parse_code(postalChild))
-        elif postalChild.tag == "country":
-            postalElements.append(parse_country(postalChild))
-        elif postalChild.tag == "region":
-            postalElements.append(parse_region(postalChild))
-        elif postalChild.tag == "street":
-            postalElements.append(parse_street(postalChild))
-        # Variant two in RFC 7991 section 2.37:
-        elif postalChild.tag == "postalLine":
-            postalElements.append(parse_postalline(postalChild))
-    return rfc.Postal(postalElements)
+    return rfc.Postal(parse_content(xmlElement, "postal", []))
 
 
 def parse_email(xmlElement: ET.Element) -> rfc.Email:
@@ -1061,23 +643,12 @@ def parse_facsimile(xmlElement: ET.Element) -> rfc.Facsimile:
 
 
 def parse_address(xmlElement: ET.Element) -> rfc.Address:
-    postal = None
-    phone = None
-    facsimile = None
-    email = None
-    uri = None
-    for addressChild in xmlElement:
-        if addressChild.tag == "postal":
-            postal = parse_postal(addressChild)
-        elif addressChild.tag == "phone":
-            phone = parse_phone(addressChild)
-        elif addressChild.tag == "facsimile":
-            facsimile = parse_facsimile(addressChild)
-        elif addressChild.tag == "email":
-            email = parse_email(addressChild)
-        elif addressChild.tag == "uri":
-            uri = parse_uri(addressChild)
-    return rfc.Address(postal, phone, facsimile, email, uri)
+    children = parse_children(xmlElement, "address")
+    return rfc.Address(last(children["postal"]),
+                       last(children["phone"]),
+                       last(children["facsimile"]),
+                       last(children["email"]),
+                       last(children["uri"]))
 
 
 def parse_organization(xmlElement: ET.Element) -> rfc.Organization:
@@ -1088,15 +659,9 @@ def parse_organization(xmlElement: ET.Element) -> rfc.Organization:
 
 
 def parse_author(xmlElement: ET.Element) -> rfc.Author:
-    org = None
-    address = None
-    for authorChild in xmlElement:
-        if authorChild.tag == "organization":
-            org = parse_organization(authorChild)
-        elif authorChild.tag == "address":
-            address = parse_address(authorChild)
-    return rfc.Author(org,
-                      address,
+    children = parse_children(xmlElement, "author")
+    return rfc.Author(last(children["org"]),
+                      last(children["address"]),
                       xmlElement.attrib.get("asciiFullname", None),
                       xmlElement.attrib.get("asciiInitials", None),
                       xmlElement.attrib.get("asciiSurname", None),
@@ -1144,77 +709,30 @@ def parse_keyword(xmlElement: ET.Element) -> rfc.Keyword:
 
 
 def parse_abstract(xmlElement: ET.Element) -> rfc.Abstract:
-    content : ListType[Union[rfc.DL, rfc.OL, rfc.T, rfc.UL]] = []
-    for abstractChild in xmlElement:
-        if abstractChild.tag == "dl":
-            content.append(parse_dl(abstractChild))
-        elif abstractChild.tag == "ol":
-            content.append(parse_ol(abstractChild))
-        elif abstractChild.tag == "t":
-            content.append(parse_t(abstractChild))
-        elif abstractChild.tag == "ul":
-            content.append(parse_ul(abstractChild))
-    return rfc.Abstract(content, xmlElement.attrib.get("anchor", None))
+    return rfc.Abstract(parse_content(xmlElement, "abstract", []), xmlElement.attrib.get("anchor", None))
 
 
 def parse_note(xmlElement: ET.Element) -> rfc.Note:
-    name = None
-    content : ListType[Union[rfc.DL, rfc.OL, rfc.T, rfc.UL]] = []
-    for noteChild in xmlElement:
-        if noteChild.tag == "dl":
-            content.append(parse_dl(noteChild))
-        elif noteChild.tag == "ol":
-            content.append(parse_ol(noteChild))
-        elif noteChild.tag == "t":
-            content.append(parse_t(noteChild))
-        elif noteChild.tag == "ul":
-            content.append(parse_ul(noteChild))
-        elif noteChild.tag == "name":
-            name = parse_name(noteChild)
-    return rfc.Note(name, content, xmlElement.attrib.get("removeInRFC") == "true", xmlElement.attrib.get("title"))
+    children = parse_children(xmlElement, "note")
+    return rfc.Note(last(children["name"]), children["content"], xmlElement.attrib.get("removeInRFC") == "true", xmlElement.attrib.get("title"))
 
 
 def parse_boilerplate(xmlElement: ET.Element) -> rfc.Boilerplate:
-    content = []
-    for boilerplateChild in xmlElement:
-        if boilerplateChild.tag == "section":
-            content.append(parse_section(boilerplateChild))
-    return rfc.Boilerplate(content)
+    return rfc.Boilerplate(parse_content(xmlElement, "boilerplate", []))
 
 
 def parse_front(xmlElement: ET.Element) -> rfc.Front:
-    title : rfc.Title
-    seriesInfo = []
-    authors = []
-    date = None
-    areas = []
-    workgroups = []
-    keywords = []
-    abstract = None
-    notes = []
-    boilerplate = None
-    for frontChild in xmlElement:
-        if frontChild.tag == "title":
-            title = parse_title(frontChild)
-        elif frontChild.tag == "seriesInfo":
-            seriesInfo.append(parse_seriesinfo(frontChild))
-        elif frontChild.tag == "author":
-            authors.append(parse_author(frontChild))
-        elif frontChild.tag == "date":
-            date = parse_date(frontChild)
-        elif frontChild.tag == "area":
-            areas.append(parse_area(frontChild))
-        elif frontChild.tag == "workgroup":
-            workgroups.append(parse_workgroup(frontChild))
-        elif frontChild.tag == "keyword":
-            keywords.append(parse_keyword(frontChild))
-        elif frontChild.tag == "abstract":
-            abstract = parse_abstract(frontChild)
-        elif frontChild.tag == "note":
-            notes.append(parse_note(frontChild))
-        elif frontChild.tag == "boilerplate":
-            boilerplate = parse_boilerplate(frontChild)
-    return rfc.Front(title, seriesInfo, authors, date, areas, workgroups, keywords, abstract, notes, boilerplate)
+    children = parse_children(xmlElement, "front")
+    return rfc.Front(last(children["title"]),
+                     children["seriesInfo"],
+                     children["authors"],
+                     last(children["date"]),
+                     children["areas"],
+                     children["workgroups"],
+                     children["keywords"],
+                     last(children["abstract"]),
+                     children["notes"],
+                     last(children["boilerplate"]))
 
 
 def parse_format(xmlElement: ET.Element) -> rfc.Format:
@@ -1225,95 +743,34 @@ def parse_annotation(xmlElement: ET.Element) -> rfc.Annotation:
     content : ListType[rfc.AnnotationContent] = []
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
-    for annotationChild in xmlElement:
-        if annotationChild.tag == "bcp14":
-            content.append(parse_bcp14(annotationChild))
-        elif annotationChild.tag == "cref":
-            content.append(parse_cref(annotationChild))
-        elif annotationChild.tag == "em":
-            content.append(parse_em(annotationChild))
-        elif annotationChild.tag == "eref":
-            content.append(parse_eref(annotationChild))
-        elif annotationChild.tag == "iref":
-            content.append(parse_iref(annotationChild))
-        elif annotationChild.tag == "relref":
-            content.append(parse_relref(annotationChild))
-        elif annotationChild.tag == "spanx":
-            content.append(parse_spanx(annotationChild))
-        elif annotationChild.tag == "strong":
-            content.append(parse_strong(annotationChild))
-        elif annotationChild.tag == "sub":
-            content.append(parse_sub(annotationChild))
-        elif annotationChild.tag == "sup":
-            content.append(parse_sup(annotationChild))
-        elif annotationChild.tag == "tt":
-            content.append(parse_tt(annotationChild))
-        elif annotationChild.tag == "xref":
-            content.append(parse_xref(annotationChild))
+    parse_content(xmlElement, "annotation", content)
     return rfc.Annotation(content)
 
 
 def parse_refcontent(xmlElement: ET.Element) -> rfc.RefContent:
-    content : ListType[rfc.RefContentContent] = []
-    for refcontentChild in xmlElement:
-        if refcontentChild.tag == "bcp14":
-            content.append(parse_bcp14(refcontentChild))
-        elif refcontentChild.tag == "em":
-            content.append(parse_em(refcontentChild))
-        elif refcontentChild.tag == "strong":
-            content.append(parse_strong(refcontentChild))
-        elif refcontentChild.tag == "sub":
-            content.append(parse_sub(refcontentChild))
-        elif refcontentChild.tag == "sup":
-            content.append(parse_sup(refcontentChild))
-        elif refcontentChild.tag == "tt":
-            content.append(parse_tt(refcontentChild))
+    content : ListType[rfc.RefContentContent] = parse_content(xmlElement, "refcontent", [])
     if xmlElement.text is not None:
         content.append(rfc.Text(xmlElement.text))
     return rfc.RefContent(content)
 
 
 def parse_reference(xmlElement: ET.Element) -> rfc.Reference:
-    front   : rfc.Front
-    content : ListType[Union[rfc.Annotation, rfc.Format, rfc.RefContent, rfc.SeriesInfo]] = []
-    for referenceChild in xmlElement:
-        if referenceChild.tag == "front":
-            front = parse_front(referenceChild)
-        elif referenceChild.tag == "annotation":
-            content.append(parse_annotation(referenceChild))
-        elif referenceChild.tag == "format":
-            content.append(parse_format(referenceChild))
-        elif referenceChild.tag == "refcontent":
-            content.append(parse_refcontent(referenceChild))
-        elif referenceChild.tag == "seriesInfo":
-            content.append(parse_seriesinfo(referenceChild))
-    return rfc.Reference(front,
-                         content,
+    children = parse_children(xmlElement, "reference")
+    return rfc.Reference(last(children["front"]),
+                         children["content"],
                          xmlElement.attrib["anchor"],
                          not xmlElement.attrib.get("quoteTitle") == "false",
                          xmlElement.attrib.get("target"))
 
 
 def parse_referencegroup(xmlElement: ET.Element) -> rfc.ReferenceGroup:
-    content = []
-    for referencegroupChild in xmlElement:
-        if referencegroupChild.tag == "reference":
-            content.append(parse_reference(referencegroupChild))
-    return rfc.ReferenceGroup(content, xmlElement.attrib["anchor"])
+    return rfc.ReferenceGroup(parse_content(xmlElement, "referencegroup", []), xmlElement.attrib["anchor"])
 
 
 def parse_references(xmlElement: ET.Element) -> rfc.References:
-    name = None
-    content : ListType[Union[rfc.Reference, rfc.ReferenceGroup]] = []
-    for referencesChild in xmlElement:
-        if referencesChild.tag == "name":
-            name = parse_name(referencesChild)
-        elif referencesChild.tag == "reference":
-            content.append(parse_reference(referencesChild))
-        elif referencesChild.tag == "referencegroup":
-            content.append(parse_referencegroup(referencesChild))
-    return rfc.References(name,
-                          content,
+    children = parse_children(xmlElement, "references")
+    return rfc.References(last(children["name"]),
+                          children["content"],
                           xmlElement.attrib.get("anchor"),
                           xmlElement.attrib.get("title"))
 
@@ -1323,17 +780,8 @@ def parse_displayreference(xmlElement: ET.Element) -> rfc.DisplayReference:
 
 
 def parse_back(xmlElement: ET.Element) -> rfc.Back:
-    displayrefs = []
-    refs = []
-    sections = []
-    for backChild in xmlElement:
-        if backChild.tag == "displayreference":
-            displayrefs.append(parse_displayreference(backChild))
-        elif backChild.tag == "references":
-            refs.append(parse_references(backChild))
-        elif backChild.tag == "section":
-            sections.append(parse_section(backChild))
-    return rfc.Back(displayrefs, refs, sections)
+    children = parse_children(xmlElement, "back")
+    return rfc.Back(children["displayrefs"], children["refs"], children["sections"])
 
 
 def parse_link(xmlElement: ET.Element) -> rfc.Link:
@@ -1341,23 +789,11 @@ def parse_link(xmlElement: ET.Element) -> rfc.Link:
 
 
 def parse_rfc(xmlElement: ET.Element) -> rfc.RFC:
-    links = []
-    front  : rfc.Front
-    middle : rfc.Middle
-    back   : rfc.Back
-    for rfcChild in xmlElement:
-        if rfcChild.tag == "link":
-            links.append(parse_link(rfcChild))
-        elif rfcChild.tag == "front":
-            front = parse_front(rfcChild)
-        elif rfcChild.tag == "middle":
-            middle = parse_middle(rfcChild)
-        elif rfcChild.tag == "back":
-            back = parse_back(rfcChild)
-    return rfc.RFC(links,
-                   front,
-                   middle,
-                   back,
+    children = parse_children(xmlElement, "rfc")
+    return rfc.RFC(children["links"],
+                   last(children["front"]),
+                   last(children["middle"]),
+                   last(children["back"]),
                    xmlElement.attrib.get("category"),
                    xmlElement.attrib.get("consensus") == "true",
                    xmlElement.attrib.get("docName", None),
@@ -1376,6 +812,101 @@ def parse_rfc(xmlElement: ET.Element) -> rfc.RFC:
                    xmlElement.attrib.get("updates"),
                    xmlElement.attrib.get("version"))
 
+
+for model, slots in CONTENT_MODEL.items():
+    DISPATCH[model] = {tag: (slot, globals()["parse_" + tag.lower()]) for slot, tags in slots.items() for tag in tags}
+
+
+def _release(xmlElement: ET.Element) -> None:
+    # Free an element that has been fully processed, along with any preceding
+    # siblings, so that the tree built by iterparse() does not keep growing.
+    xmlElement.clear(keep_tail=True)
+    parent = xmlElement.getparent()
+    if parent is not None:
+        while xmlElement.getprevious() is not None:
+            del parent[0]
+
+
+def parse_rfc_stream(source: BinaryIO, front_and_back: bool = False, resolvers: Optional[ListType[ET.Resolver]] = None, **parser_options: Any) -> rfc.RFC:
+    """
+    Parse an RFC or Internet-draft in XML format incrementally, using iterparse().
+
+    Each top-level <section> in the <middle> is converted into an rfc.Section as soon
+    as its end tag is read, and the XML elements are then discarded, so the document
+    is never held in memory in its entirety. Unless `front_and_back` is True, the
+    <front> is reduced to its <title>, and the <back> is skipped.
+
+    Arguments:
+        source         -- A binary file-like object containing the XML document
+        front_and_back -- If True, parse the <front> and <back> in full
+        resolvers      -- Resolvers to use when loading the DTD and external entities
+        parser_options -- Additional keyword arguments for the lxml parser
+    """
+    events = ET.iterparse(source, events=("start", "end"), **parser_options)
+    for resolver in resolvers if resolvers is not None else []:
+        events.resolvers.add(resolver)
+
+    root   : Optional[ET.Element] = None
+    path   : ListType[str] = []
+    links  : ListType[rfc.Link] = []
+    title  : Optional[rfc.Title] = None
+    front  : Optional[rfc.Front] = None
+    middle : ListType[rfc.Section] = []
+    back   : Optional[rfc.Back] = None
+    for event, xmlElement in events:
+        if event == "start":
+            if root is None:
+                root = xmlElement
+            path.append(xmlElement.tag)
+            continue
+        path.pop()
+        if len(path) == 1:
+            # A child of the <rfc> element:
+            if xmlElement.tag == "link":
+                links.append(parse_link(xmlElement))
+            elif xmlElement.tag == "front" and front_and_back:
+                front = parse_front(xmlElement)
+            elif xmlElement.tag == "back" and front_and_back:
+                back = parse_back(xmlElement)
+            _release(xmlElement)
+        elif len(path) == 2 and path[1] == "middle":
+            if xmlElement.tag == "section":
+                middle.append(parse_section(xmlElement))
+            _release(xmlElement)
+        elif len(path) == 2 and path[1] == "front" and not front_and_back:
+            if xmlElement.tag == "title":
+                title = parse_title(xmlElement)
+            _release(xmlElement)
+        elif len(path) >= 2 and path[1] in ["front", "back"] and not front_and_back:
+            _release(xmlElement)
+
+    assert root is not None
+    if front is None:
+        assert title is not None
+        front = rfc.Front(title, [], [], None, [], [], [], None, [], None)
+    return rfc.RFC(links,
+                   front,
+                   rfc.Middle(middle),
+                   back,
+                   root.attrib.get("category"),
+                   root.attrib.get("consensus") == "true",
+                   root.attrib.get("docName", None),
+                   not root.attrib.get("indexInclude") == "false",
+                   root.attrib.get("ipr"),
+                   root.attrib.get("iprExtract"),
+                   root.attrib.get("number"),
+                   root.attrib.get("obsoletes"),
+                   root.attrib.get("prepTime"),
+                   root.attrib.get("seriesNo"),
+                   root.attrib.get("sortRefs") == "true",
+                   root.attrib.get("submissionType", "IETF"),
+                   not root.attrib.get("symRefs") == "false",
+                   root.attrib.get("tocDepth", "3"),
+                   not root.attrib.get("tocInclude") == "false",
+                   root.attrib.get("updates"),
+                   root.attrib.get("version"))
+
+
 if __name__ == "__main__":
     rfcXml = ET.parse(sys.argv[1]).getroot()
     parsed_rfc = parse_rfc(rfcXml)
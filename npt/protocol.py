@@ -28,13 +28,14 @@
 # SPDX-License-Identifier: BSD-2-Clause
 # =================================================================================================
 
-from abc         import ABC, abstractmethod
-from dataclasses import dataclass
-from typing      import Dict, List, Any, Optional, cast, Union
+from abc         import ABC, ABCMeta, abstractmethod
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing      import Dict, List, Any, Mapping, MutableMapping, Iterator, Optional, Tuple, cast, Union
 
 import copy
 import unittest
 import re
+import weakref
 
 # Type names begin with an upper case letter, function names do not:
 TYPE_NAME_REGEX = "^[A-Z][A-Za-z0-9$_]+$"
@@ -50,6 +51,19 @@ class ProtocolTypeError(Exception):
 # =================================================================================================
 # Traits:
 
+class Singleton(type):
+    _instances : Dict["Singleton", "Singleton"] = {}
+
+    def __call__(cls, *args, **kwargs):
+        if cls not in cls._instances:
+            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
+            cls._instances[cls].__post_init__()
+        return cls._instances[cls]
+
+    def __post_init__(self):
+        pass
+
+
 @dataclass(frozen=True)
 class TypeVariable:
     name : str
@@ -60,14 +74,25 @@ class TypeVariable:
 
 @dataclass(frozen=True)
 class Trait:
-    name    : str
-    methods : List["Function"]
+    """
+    A trait is a named set of methods, whose signatures are parameterised by type variables. The
+    type variable T is bound to the type implementing the trait.
+    """
+    name         : str
+    methods      : List["Function"]
+    method_table : Dict[str, "Function"] = field(init=False, repr=False, compare=False)
 
     def __eq__(self, other: object) -> bool:
         return isinstance(other, Trait) and self.name == other.name and self.methods == other.methods
 
+    def __post_init__(self):
+        object.__setattr__(self, "method_table", {method.name: method for method in self.methods})
 
-class Value(Trait):
+
+# The standard traits are instantiated only once, so their methods are shared by every type that
+# implements them:
+
+class Value(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("Value", [
             Function("get", [Parameter("self", TypeVariable("T"))], TypeVariable("T")),
@@ -75,14 +100,14 @@ class Value(Trait):
         ])
 
 
-class Sized(Trait):
+class Sized(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("Sized", [
             Function("size", [Parameter("self", TypeVariable("T"))], Number())
         ])
 
 
-class IndexCollection(Trait):
+class IndexCollection(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("IndexCollection", [
             Function("get",    [Parameter("self", TypeVariable("T")), Parameter("index", Number())], TypeVariable("ET")),
@@ -91,7 +116,7 @@ class IndexCollection(Trait):
         ])
 
 
-class Equality(Trait):
+class Equality(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("Equality", [
             Function("eq", [Parameter("self", TypeVariable("T")), Parameter("other", TypeVariable("T"))], Boolean()),
@@ -99,7 +124,7 @@ class Equality(Trait):
         ])
 
 
-class Ordinal(Trait):
+class Ordinal(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("Ordinal", [
             Function("lt", [Parameter("self", TypeVariable("T")), Parameter("other", TypeVariable("T"))], Boolean()),
@@ -109,7 +134,7 @@ class Ordinal(Trait):
         ])
 
 
-class BooleanOps(Trait):
+class BooleanOps(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("BooleanOps", [
             Function("and", [Parameter("self", TypeVariable("T")), Parameter("other", TypeVariable("T"))], Boolean()),
@@ -118,7 +143,7 @@ class BooleanOps(Trait):
         ])
 
 
-class ArithmeticOps(Trait):
+class ArithmeticOps(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("ArithmeticOps", [
             Function("plus",     [Parameter("self", TypeVariable("T")), Parameter("other", TypeVariable("T"))], TypeVariable("T")),
@@ -130,7 +155,7 @@ class ArithmeticOps(Trait):
         ])
 
 
-class NumberRepresentable(Trait):
+class NumberRepresentable(Trait, metaclass=Singleton):
     def __init__(self):
         super().__init__("NumberRepresentable", [
             Function("to_number", [Parameter("self", TypeVariable("T"))], Number())
@@ -139,22 +164,99 @@ class NumberRepresentable(Trait):
 # =================================================================================================
 # Expressions as defined in Section 3.4 of the IR specification:
 
-class Expression(ABC):
+def _intern_key(value: Any) -> Any:
+    # Values with structural equality are keyed by value. Everything else, including
+    # sub-expressions that have already been interned, is keyed by identity; the interned
+    # expression holds a reference to the value, so its identity cannot be reused.
+    if isinstance(value, list):
+        return (list, *[_intern_key(v) for v in value])
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return (type(value), value)
+    return id(value)
+
+
+class Interned(ABCMeta):
+    """
+    Expressions are hash-consed: constructing an expression that is structurally equal to
+    an existing expression returns the existing object. Equal expressions are therefore
+    identical, so they compare and hash by identity, and share their cached result types.
+    """
+    _instances : "weakref.WeakValueDictionary[Any, Expression]" = weakref.WeakValueDictionary()
+
+    def __call__(cls, *args, **kwargs):
+        expr = super().__call__(*args, **kwargs)
+        if not is_dataclass(cls):
+            return expr
+        key = (cls, *[_intern_key(getattr(expr, field.name)) for field in fields(expr)])
+        return Interned._instances.setdefault(key, expr)
+
+
+class Expression(ABC, metaclass=Interned):
     @abstractmethod
     def result_type(self, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
         """ Expression is an abstract class whose sub-classes must implement result_type() """
 
+    def operands(self) -> List["Expression"]:
+        """
+        The sub-expressions whose result types are needed to find the result type of this expression.
+        """
+        return []
 
-@dataclass(frozen=True)
+
+# Result types of expressions evaluated outside any containing type. Entries are dropped
+# when their expression is no longer used.
+_unbound_result_types : "weakref.WeakKeyDictionary[Expression, ProtocolType]" = weakref.WeakKeyDictionary()
+
+def _result_type_memo(containing_type: Optional["ProtocolType"]) -> MutableMapping[Expression, "ProtocolType"]:
+    # Interned expressions are shared between types, and live as long as any type uses
+    # them, so the result types are remembered on the containing type, keyed by expression,
+    # and are released with it.
+    if containing_type is None:
+        return _unbound_result_types
+    if containing_type._result_types is None:
+        containing_type._result_types = {}
+    return containing_type._result_types
+
+
+def cached_result_type(expr: Expression, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
+    """
+    The result type of `expr` when evaluated within `containing_type`, as returned by
+    `expr.result_type()`, but computed at most once for each expression and containing
+    type. The operands of `expr` are evaluated bottom-up using an explicit stack, so
+    deeply nested expressions, such as long chains of `plus` invocations, cannot exceed
+    the recursion limit.
+    """
+    memo = _result_type_memo(containing_type)
+    if expr in memo:
+        return memo[expr]
+    stack = [(expr, False)]
+    while stack:
+        node, operands_done = stack.pop()
+        if node in memo:
+            continue
+        if operands_done:
+            memo[node] = node.result_type(containing_type)
+        else:
+            stack.append((node, True))
+            for operand in reversed(node.operands()):
+                if operand not in memo:
+                    stack.append((operand, False))
+    return memo[expr]
+
+
+@dataclass(frozen=True, eq=False)
 class ArgumentExpression(Expression):
     arg_name: str
     arg_value: Expression
 
     def result_type(self, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
-        return self.arg_value.result_type(containing_type)
+        return cached_result_type(self.arg_value, containing_type)
 
+    def operands(self) -> List[Expression]:
+        return [self.arg_value]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, eq=False)
 class MethodInvocationExpression(Expression):
     target      : Expression
     method_name : str
@@ -165,8 +267,8 @@ class MethodInvocationExpression(Expression):
             raise ProtocolTypeError("Method {}: invalid name".format(self.method_name))
 
     def result_type(self, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
-        args   = [Argument(arg.arg_name, arg.result_type(containing_type), arg.arg_value) for arg in self.arg_exprs]
-        result = self.target.result_type(containing_type)
+        args   = [Argument(arg.arg_name, cached_result_type(arg, containing_type), arg.arg_value) for arg in self.arg_exprs]
+        result = cached_result_type(self.target, containing_type)
         method = result.get_method(self.method_name)
         if not method.is_method_accepting(result, args):
             raise ProtocolTypeError(f"Method {self.method_name}: invalid arguments")
@@ -175,22 +277,28 @@ class MethodInvocationExpression(Expression):
             raise ProtocolTypeError(f"Method {self.method_name}: unresolved type variable as return type")
         return rt
 
+    def operands(self) -> List[Expression]:
+        return [self.target, *self.arg_exprs]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, eq=False)
 class FunctionInvocationExpression(Expression):
     func      : "Function"
     arg_exprs : List[ArgumentExpression]
 
     def result_type(self, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
-        if not self.func.accepts_arguments([Argument(arg.arg_name, arg.result_type(containing_type), arg.arg_value) for arg in self.arg_exprs]):
+        if not self.func.accepts_arguments([Argument(arg.arg_name, cached_result_type(arg, containing_type), arg.arg_value) for arg in self.arg_exprs]):
             raise ProtocolTypeError(f"Function {self.func.name}: invalid arguments")
         rt = self.func.get_return_type()
         if isinstance(rt, TypeVariable):
             raise ProtocolTypeError(f"Function {self.func.name}: unresolved type variable as return type")
         return rt
 
+    def operands(self) -> List[Expression]:
+        return list(self.arg_exprs)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, eq=False)
 class FieldAccessExpression(Expression):
     """
     An expression representing access to `field` of `target`.
@@ -200,14 +308,17 @@ class FieldAccessExpression(Expression):
     field_name : str
 
     def result_type(self, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
-        if isinstance(self.target.result_type(containing_type), Struct):
-            struct = cast(Struct, self.target.result_type(containing_type))
-            return struct.field(self.field_name).field_type
+        target_type = cached_result_type(self.target, containing_type)
+        if isinstance(target_type, Struct):
+            return target_type.field(self.field_name).field_type
         else:
-            raise ProtocolTypeError(f"Cannot access fields in object of type {self.target.result_type(containing_type)}")
+            raise ProtocolTypeError(f"Cannot access fields in object of type {target_type}")
 
+    def operands(self) -> List[Expression]:
+        return [self.target]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, eq=False)
 class ContextAccessExpression(Expression):
     context    : "Context"
     field_name : str
@@ -216,22 +327,26 @@ class ContextAccessExpression(Expression):
         return self.context.field(self.field_name).field_type
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class IfElseExpression(Expression):
     condition : Expression
     if_true   : Expression
     if_false  : Expression
 
     def result_type(self, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
-        result_type = self.condition.result_type(containing_type)
+        result_type = cached_result_type(self.condition, containing_type)
         if result_type != Boolean():
             raise ProtocolTypeError("Cannot create IfElseExpression: condition is not boolean")
-        if self.if_true.result_type(containing_type) != self.if_false.result_type(containing_type):
+        true_type = cached_result_type(self.if_true, containing_type)
+        if true_type != cached_result_type(self.if_false, containing_type):
             raise ProtocolTypeError("Cannot create IfElseExpression: branch types differ")
-        return self.if_true.result_type(containing_type)
+        return true_type
 
+    def operands(self) -> List[Expression]:
+        return [self.condition, self.if_true, self.if_false]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, eq=False)
 class SelfExpression(Expression):
     def result_type(self, containing_type: Optional["ProtocolType"]) -> "ProtocolType":
         if containing_type is None:
@@ -239,7 +354,7 @@ class SelfExpression(Expression):
         return containing_type
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class ConstantExpression(Expression):
     constant_type  : "ProtocolType"
     constant_value : Any
@@ -248,48 +363,205 @@ class ConstantExpression(Expression):
         return self.constant_type
 
 
+# -------------------------------------------------------------------------------------------------
+# Simplification of arithmetic expressions, such as the sizes of types:
+
+def _number_value(expr: Expression) -> Optional[int]:
+    if isinstance(expr, ConstantExpression) and expr.constant_type == Number() and type(expr.constant_value) is int:
+        return expr.constant_value
+    return None
+
+
+def _is_binary(expr: Expression, method_name: str) -> bool:
+    return isinstance(expr, MethodInvocationExpression) and expr.method_name == method_name \
+        and len(expr.arg_exprs) == 1 and expr.arg_exprs[0].arg_name == "other"
+
+
+def _binary(target: Expression, method_name: str, other: Expression) -> Expression:
+    return MethodInvocationExpression(target, method_name, [ArgumentExpression("other", other)])
+
+
+def _simplify_binary(target: Expression, method_name: str, other: Expression) -> Expression:
+    lhs = _number_value(target)
+    rhs = _number_value(other)
+    if method_name == "multiply":
+        if lhs is not None and rhs is not None:
+            return ConstantExpression(Number(), lhs * rhs)
+        if rhs == 1:
+            return target
+        if lhs == 1:
+            return other
+        if rhs is not None and _is_binary(target, "multiply"):
+            inner  = cast(MethodInvocationExpression, target)
+            factor = _number_value(inner.arg_exprs[0].arg_value)
+            if factor is not None:
+                return _simplify_binary(inner.target, "multiply", ConstantExpression(Number(), factor * rhs))
+    elif method_name == "divide" and rhs is not None and rhs > 0:
+        if lhs is not None:
+            return ConstantExpression(Number(), lhs // rhs)
+        if rhs == 1:
+            return target
+        if _is_binary(target, "multiply") or _is_binary(target, "divide"):
+            inner  = cast(MethodInvocationExpression, target)
+            factor = _number_value(inner.arg_exprs[0].arg_value)
+            # (x * 32) / 8 is x * 4, and (x / 2) / 4 is x / 8, but (x * 4) / 8 is not x / 2
+            if factor is not None and factor > 0 and inner.method_name == "multiply" and factor % rhs == 0:
+                return _simplify_binary(inner.target, "multiply", ConstantExpression(Number(), factor // rhs))
+            if factor is not None and factor > 0 and inner.method_name == "divide":
+                return _binary(inner.target, "divide", ConstantExpression(Number(), factor * rhs))
+    elif method_name == "minus":
+        if lhs is not None and rhs is not None and lhs >= rhs:
+            return ConstantExpression(Number(), lhs - rhs)
+        if rhs == 0:
+            return target
+    return _binary(target, method_name, other)
+
+
+def simplify_expression(expr: Expression) -> Expression:
+    """
+    Simplify an arithmetic expression, returning an expression with the same value and
+    result type. Chains of `plus` invocations are flattened into a single sum, with their
+    constant terms folded into one leading constant. Other arithmetic on constants is
+    folded, and chains of multiplication and division by constants, such as conversions
+    between bits and bytes, are combined. Subtraction is not reassociated, so a simplified
+    expression cannot underflow where the original does not.
+    """
+    if _is_binary(expr, "plus"):
+        terms    : List[Expression] = []
+        constant = 0
+        # Sums can be as deep as the number of fields in a struct, so are flattened using an
+        # explicit stack:
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            if _is_binary(node, "plus"):
+                invocation = cast(MethodInvocationExpression, node)
+                stack.append(invocation.arg_exprs[0].arg_value)
+                stack.append(invocation.target)
+            else:
+                term  = simplify_expression(node)
+                value = _number_value(term)
+                if value is not None:
+                    constant += value
+                else:
+                    terms.append(term)
+        if constant != 0 or len(terms) == 0:
+            terms.insert(0, ConstantExpression(Number(), constant))
+        result = terms[0]
+        for term in terms[1:]:
+            result = _binary(result, "plus", term)
+        return result
+    elif isinstance(expr, MethodInvocationExpression):
+        target = simplify_expression(expr.target)
+        if _is_binary(expr, expr.method_name):
+            return _simplify_binary(target, expr.method_name, simplify_expression(expr.arg_exprs[0].arg_value))
+        return MethodInvocationExpression(target, expr.method_name, [ArgumentExpression(arg.arg_name, simplify_expression(arg.arg_value)) for arg in expr.arg_exprs])
+    return expr
+
+
+def field_dependencies(expr: Expression) -> List[str]:
+    """
+    The names of the fields of the containing type that `expr` accesses, i.e., the
+    targets of `FieldAccessExpression`s on `SelfExpression`, in the order they first
+    appear and without duplicates.
+    """
+    fields : Dict[str, None] = {}
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, FieldAccessExpression) and isinstance(node.target, SelfExpression):
+            fields.setdefault(node.field_name, None)
+        stack.extend(reversed(node.operands()))
+    return list(fields)
+
+
 # =================================================================================================
 # Protocol Types:
 
 # -------------------------------------------------------------------------------------------------
 # ProtocolType base class:
 
+class MethodTable(Mapping[str, "Function"]):
+    """
+    The methods of a ProtocolType. These are the methods of the traits that the type implements,
+    which are shared between all types implementing each trait; the type variables in a method
+    signature are bound when the method is looked up.
+    """
+    __slots__ = ("_ptype",)
+
+    def __init__(self, ptype: "ProtocolType"):
+        self._ptype = ptype
+
+    def __getitem__(self, method_name: str) -> "Function":
+        for trait, type_variables in self._ptype._implementations:
+            method = trait.method_table.get(method_name)
+            if method is not None:
+                return method.bind_type_variables({TypeVariable("T") : self._ptype, **type_variables})
+        raise KeyError(method_name)
+
+    def __contains__(self, method_name: object) -> bool:
+        return any(method_name in trait.method_table for trait, type_variables in self._ptype._implementations)
+
+    def __iter__(self) -> Iterator[str]:
+        for trait, type_variables in self._ptype._implementations:
+            for method in trait.methods:
+                yield method.name
+
+    def __len__(self) -> int:
+        return sum(len(trait.methods) for trait, type_variables in self._ptype._implementations)
+
+
 class ProtocolType:
     traits  : List["Trait"]
-    methods : Dict[str, "Function"]
     parent  : Optional["ProtocolType"]
 
+    # Sub-classes list the attributes they add in __slots__, so types do not carry an instance
+    # __dict__. A class can only inherit slots from one base, so the name of a ConstructableType
+    # is declared here, and the mixins below other than RepresentableType declare no slots.
+    __slots__ = ("traits", "_implementations", "_method_owners", "_method_cache", "_result_types", "parent", "name")
+
     def __init__(self, parent: Optional["ProtocolType"] = None):
         self.traits = []
-        self.methods = {}
+        self._implementations : List[Tuple[Trait, Dict[TypeVariable, "ProtocolType"]]] = []
+        self._method_owners : Optional[Dict[str, "ProtocolType"]] = None
+        self._method_cache  : Optional[Dict[str, "Function"]] = None
+        self._result_types  : Optional[Dict[Expression, "ProtocolType"]] = None
         self.parent = parent
 
+    @property
+    def methods(self) -> MethodTable:
+        return MethodTable(self)
+
     def implement_trait(self, trait: "Trait", type_variables: Dict[TypeVariable, "ProtocolType"] = {}) -> None:
-        type_variables = {TypeVariable("T") : self, **type_variables}
         if trait in self.traits:
             raise ProtocolTypeError(f"Type {self} already implements trait {trait.name}")
         else:
+            methods = self.methods
             for method in trait.methods:
-                if method.name in self.methods:
+                if method.name in methods:
                     raise ProtocolTypeError(f"Type {self} already implements a method {method.name}")
-                else:
-                    mimpl_name = method.name
-                    mimpl_rt   = method.return_type if not isinstance(method.return_type, TypeVariable) else type_variables[method.return_type]
-                    mimpl_parameters = [Parameter(p.param_name, p.param_type if not isinstance(p.param_type, TypeVariable) else type_variables[p.param_type]) for p in method.parameters]
-                    self.methods[method.name] = Function(mimpl_name, mimpl_parameters, mimpl_rt)
+            self._implementations.append((trait, type_variables))
             self.traits.append(trait)
+            self._method_owners = None
+            self._method_cache  = None
 
     def get_method(self, method_name: str) -> "Function":
-        method = None
-        current_type = self
-        while method is None:
-            method = current_type.methods.get(method_name, None)
-            if current_type.parent is not None:
+        if self._method_cache is None or self._method_owners is None:
+            # Flatten the parent chain once: methods implemented by this type take precedence
+            # over those implemented by its parents.
+            self._method_cache  = {}
+            self._method_owners = {}
+            current_type : Optional[ProtocolType] = self
+            while current_type is not None:
+                for name in current_type.methods:
+                    self._method_owners.setdefault(name, current_type)
                 current_type = current_type.parent
-            else:
-                break
+        method = self._method_cache.get(method_name)
         if method is None:
-            raise ProtocolTypeError(f"{self} and its parents do not implement the {method_name} method")
+            if method_name not in self._method_owners:
+                raise ProtocolTypeError(f"{self} and its parents do not implement the {method_name} method")
+            method = self._method_owners[method_name].methods[method_name]
+            self._method_cache[method_name] = method
         return method
 
     def is_a(self, obj):
@@ -306,22 +578,12 @@ class ProtocolType:
 # -------------------------------------------------------------------------------------------------
 # ProtocolType mixins:
 
-class Singleton(type):
-    _instances : Dict["Singleton", "Singleton"] = {}
-
-    def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-            cls._instances[cls].__post_init__()
-        return cls._instances[cls]
-
-    def __post_init__(self):
-        pass
-
 class PrimitiveType(ProtocolType, metaclass=Singleton):
     """
     PrimitiveTypes are instantiated only once, and cannot be constructed by a Protocol definition.
     """
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -341,6 +603,8 @@ class ConstructableType(ProtocolType):
     """
     name: str
 
+    __slots__ = ()
+
     def __init__(self, name: Optional[str] = None, **kwargs):
         super().__init__(**kwargs)
         if name is None:
@@ -366,7 +630,9 @@ class ConstructableType(ProtocolType):
         """
         new_type = copy.copy(self)
         new_type.name = name
-        new_type.methods = copy.copy(self.methods)
+        new_type._implementations = copy.copy(self._implementations)
+        new_type._method_owners = None
+        new_type._method_cache  = None
         for trait in also_implements:
             new_type.implement_trait(trait)
         return new_type
@@ -376,7 +642,7 @@ class InternalType(ProtocolType):
     """
     InternalTypes are types that are needed to define a Protocol, but that do not represent data sent/received by a Protocol.
     """
-    pass
+    __slots__ = ()
 
 
 class RepresentableType(ProtocolType):
@@ -385,6 +651,8 @@ class RepresentableType(ProtocolType):
     """
     size : Optional[Expression]
 
+    __slots__ = ("size",)
+
     def __init__(self, size: Optional[Expression] = None, **kwargs):
         super().__init__(**kwargs)
         self.size = size
@@ -394,6 +662,8 @@ class RepresentableType(ProtocolType):
 # Representable, primitive types:
 
 class Nothing(RepresentableType, PrimitiveType):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(size=ConstantExpression(Number(), 0))
 
@@ -404,6 +674,8 @@ class Nothing(RepresentableType, PrimitiveType):
 # Representable, constructable types:
 
 class BitString(RepresentableType, ConstructableType):
+    __slots__ = ()
+
     def __init__(self, name: str, size: Optional[Expression]):
         super().__init__(name=name, size=size)
         self.implement_trait(Value())
@@ -414,6 +686,8 @@ class BitString(RepresentableType, ConstructableType):
 class Option(RepresentableType, ConstructableType):
     reference_type : RepresentableType
 
+    __slots__ = ("reference_type",)
+
     def __init__(self, name: str, reference_type: RepresentableType) -> None:
         super().__init__(name=name, size=reference_type.size)
         self.reference_type = reference_type
@@ -425,6 +699,8 @@ class Array(RepresentableType, ConstructableType):
     parse_from   : Optional["Function"]
     serialise_to : Optional["Function"]
 
+    __slots__ = ("element_type", "length", "parse_from", "serialise_to")
+
     def __init__(self, name: str, element_type: RepresentableType, length: Optional[Expression], size: Optional[Expression] = None):
         super().__init__(name=name, size=None)
         self.element_type = element_type
@@ -447,6 +723,8 @@ class StructField():
     field_type: "RepresentableType"
     is_present: Expression
 
+    __slots__ = ("field_name", "field_type", "is_present")
+
     def __init__(self, field_name: str, field_type: "RepresentableType", is_present: Optional[Expression] = None):
         self.field_name = field_name
         if re.search(FUNC_NAME_REGEX, field_name) is None:
@@ -465,8 +743,12 @@ class Struct(RepresentableType, ConstructableType):
     parse_from   : Optional["Function"]
     serialise_to : Optional["Function"]
 
+    __slots__ = ("fields", "constraints", "actions", "parse_from", "serialise_to", "_protocol")
+
     def __init__(self, name: str, fields: List[StructField], constraints: List[Expression], actions: List[Expression]) -> None:
         super().__init__(name=name)
+        # The protocol this struct has been added to, which must re-synthesise it if it changes
+        self._protocol : Optional[Protocol] = None
         self.fields = {}
         self.constraints = []
         self.actions = []
@@ -489,15 +771,19 @@ class Struct(RepresentableType, ConstructableType):
         elif field.field_type.size is not None and self.size is not None:
             self.size = MethodInvocationExpression(self.size, "plus", [ArgumentExpression("other", field.field_type.size)])
         self.fields[field.field_name] = field
+        if self._protocol is not None:
+            self._protocol.mark_dirty(self)
 
     def add_constraint(self, constraint: Expression) -> None:
-        if constraint.result_type(self) != Boolean():
-            raise ProtocolTypeError(f"Invalid constraint: {constraint.result_type(self)} != Boolean")
+        result_type = cached_result_type(constraint, self)
+        if result_type != Boolean():
+            raise ProtocolTypeError(f"Invalid constraint: {result_type} != Boolean")
         self.constraints.append(constraint)
 
     def add_action(self, action: Expression) -> None:
-        if action.result_type(self) != Nothing():
-            raise ProtocolTypeError(f"Invalid action: {action.result_type(self)} != Nothing")
+        result_type = cached_result_type(action, self)
+        if result_type != Nothing():
+            raise ProtocolTypeError(f"Invalid action: {result_type} != Nothing")
         self.actions.append(action)
 
     def field(self, field_name: str) -> StructField:
@@ -514,6 +800,8 @@ class Enum(RepresentableType, ConstructableType):
     parse_from   : Optional["Function"]
     serialise_to : Optional["Function"]
 
+    __slots__ = ("variants", "parse_from", "serialise_to")
+
     def __init__(self, name: str, variants: List[RepresentableType]) -> None:
         super().__init__(name=name, size=None)
         self.variants = variants
@@ -525,6 +813,8 @@ class Enum(RepresentableType, ConstructableType):
 # Internal, primitive types:
 
 class Boolean(PrimitiveType, InternalType):
+    __slots__ = ()
+
     def __post_init__(self):
         ProtocolType.implement_trait(self, Value())
         ProtocolType.implement_trait(self, Equality())
@@ -532,6 +822,8 @@ class Boolean(PrimitiveType, InternalType):
 
 
 class Number(PrimitiveType, InternalType):
+    __slots__ = ()
+
     def __post_init__(self):
         ProtocolType.implement_trait(self, Value())
         ProtocolType.implement_trait(self, Equality())
@@ -558,6 +850,8 @@ class Function(InternalType, ConstructableType):
     parameters  : List[Parameter]
     return_type : Union[ProtocolType, TypeVariable]
 
+    __slots__ = ("parameters", "return_type")
+
     def __init__(self, name: str, parameters: List[Parameter], return_type : Union[ProtocolType, TypeVariable]):
         super().__init__(name=name)
         self.parameters = parameters
@@ -593,6 +887,14 @@ class Function(InternalType, ConstructableType):
     def get_return_type(self) -> Union[ProtocolType, TypeVariable]:
         return self.return_type
 
+    def bind_type_variables(self, type_variables: Dict[TypeVariable, ProtocolType]) -> "Function":
+        """
+        The function with the type variables in its signature replaced by their bindings.
+        """
+        return_type = self.return_type if not isinstance(self.return_type, TypeVariable) else type_variables[self.return_type]
+        parameters  = [Parameter(p.param_name, p.param_type if not isinstance(p.param_type, TypeVariable) else type_variables[p.param_type]) for p in self.parameters]
+        return Function(self.name, parameters, return_type)
+
     def __eq__(self, obj: object) -> bool:
         return isinstance(obj, Function) and self.name == obj.name and self.parameters == obj.parameters and self.return_type == obj.return_type
 
@@ -606,6 +908,8 @@ class ContextField():
 class Context(InternalType, ConstructableType):
     fields: Dict[str, ContextField]
 
+    __slots__ = ("fields",)
+
     def __init__(self, name: str):
         super().__init__(name=name)
         self.fields = {}
@@ -629,10 +933,14 @@ class Protocol(InternalType, ConstructableType):
     _funcs   : List[str]
     _context : Context
     _pdus    : List[str]
+    _dirty   : Dict[str, ConstructableType]
+
+    __slots__ = ("_types", "_funcs", "_context", "_pdus", "_dirty")
 
     def __init__(self):
         super().__init__(name="Protocol")
         self._types = {}
+        self._dirty = {}
         self._funcs = []
         self._context = Context("Context")
         self.add_type(self._context)
@@ -671,8 +979,23 @@ class Protocol(InternalType, ConstructableType):
         """
         self._check_typename(new_type.name)
         self._types[new_type.name] = new_type
+        if isinstance(new_type, Struct):
+            new_type._protocol = self
+        self.mark_dirty(new_type)
         return new_type
 
+    def mark_dirty(self, ptype: ConstructableType) -> None:
+        """
+        Record that a type in this protocol has been added or modified, and so must be
+        synthesised again by the next call to synthesise().
+
+        Parameters:
+            self  - the protocol containing the type
+            ptype - the type that has changed
+        """
+        if self._types.get(ptype.name) is ptype:
+            self._dirty[ptype.name] = ptype
+
     def define_pdu(self, pdu: str) -> None:
         """
         Define a PDU for this protocol.
@@ -686,7 +1009,12 @@ class Protocol(InternalType, ConstructableType):
         self._pdus.append(pdu)
 
     def synthesise(self) -> None:
-        for ptype in self._types.values():
+        """
+        Synthesise the parse and serialise functions for the types in this protocol, and the
+        sizes of the fields of its structs. Only types that have been added or modified since
+        the last call are synthesised.
+        """
+        for ptype in self._dirty.values():
             if isinstance(ptype, Struct) or isinstance(ptype, Array) or isinstance(ptype, Enum):
                 if ptype.parse_from is None:
                     pf_func = Function(f"parse_to_{ptype.name.lower()}",
@@ -717,6 +1045,7 @@ class Protocol(InternalType, ConstructableType):
                                 raise ProtocolTypeError(f"Cannot define struct type ({ptype.name}) with multiple fields of undefined length")
                     if none_size is not None and calculated_size is not None:
                         none_size.size = MethodInvocationExpression(ContextAccessExpression(self._context, "data_size"), "minus", [ArgumentExpression("other", calculated_size)])
+        self._dirty = {}
 
     def get_protocol_name(self) -> Optional[str]:
         return self.name
@@ -747,4 +1076,63 @@ class Protocol(InternalType, ConstructableType):
     def get_type_names(self) -> List[str]:
         return list(self._types.keys())
 
+    def simplify_sizes(self) -> None:
+        """
+        Simplify the size expressions of the types in this protocol, and the lengths of its
+        arrays, using simplify_expression(). This is done before the protocol is formatted,
+        so that generated size checks are a single flat arithmetic expression.
+        """
+        for ptype in self._types.values():
+            if isinstance(ptype, RepresentableType) and ptype.size is not None:
+                ptype.size = simplify_expression(ptype.size)
+            if isinstance(ptype, Array) and ptype.length is not None:
+                ptype.length = simplify_expression(ptype.length)
+
+    def type_dependencies(self, ptype: ProtocolType) -> List[ProtocolType]:
+        """
+        The types that must be defined before `ptype` can be defined.
+        """
+        if isinstance(ptype, Struct) or isinstance(ptype, Context):
+            return [field.field_type for field in ptype.get_fields()]
+        elif isinstance(ptype, Array):
+            return [ptype.element_type]
+        elif isinstance(ptype, Enum):
+            return list(ptype.variants)
+        elif isinstance(ptype, Function):
+            dependencies = [p.param_type for p in ptype.parameters]
+            dependencies.append(ptype.return_type)
+            return [t for t in dependencies if isinstance(t, ConstructableType)]
+        return []
+
+    def topological_sort(self) -> List[str]:
+        """
+        The names of the bit string, struct, array, enum, function, and context types reachable
+        from the PDUs and the context of this protocol, ordered so that every type follows the
+        types it depends on. Each type is visited once, using an explicit stack rather than
+        recursion, so the sort takes time linear in the size of the type graph.
+        """
+        sortable = (BitString, Struct, Array, Enum, Function, Context)
+        roots : List[ProtocolType] = [self.get_pdu(pdu_name) for pdu_name in self._pdus]
+        roots.append(self._context)
+
+        type_names : List[str] = []
+        seen_names = set()
+        visited    = set()
+        stack      = [(ptype, False) for ptype in reversed(roots)]
+        while stack:
+            ptype, dependencies_done = stack.pop()
+            if dependencies_done:
+                # Distinct types may share a name; only the first is listed
+                name = cast(ConstructableType, ptype).name
+                if name not in seen_names:
+                    seen_names.add(name)
+                    type_names.append(name)
+            elif id(ptype) not in visited and isinstance(ptype, sortable):
+                visited.add(id(ptype))
+                stack.append((ptype, True))
+                for dependency in reversed(self.type_dependencies(ptype)):
+                    if id(dependency) not in visited:
+                        stack.append((dependency, False))
+        return type_names
+
 # vim: set tw=0 ai:
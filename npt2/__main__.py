@@ -33,7 +33,6 @@ import spacy
 import en_core_web_sm        # type: ignore
 
 from npt2.loader             import Loader
-from npt2.cleanup_text_nodes import cleanup_text_nodes
 from npt2.core_nlp           import core_nlp
 
 def main():
@@ -41,6 +40,7 @@ def main():
     #ap.add_argument("-d", dest="outdir", required=True,  help="directory for output files")
     #ap.add_argument("-f", dest="format",  required=True,  help="output format")
     ap.add_argument("-v", dest="verbose", action="store_true", help="verbose")
+    ap.add_argument("-j", dest="jobs", type=int, default=1, help="number of processes for linguistic annotation (default: 1)")
     ap.add_argument("document", help="document to process")
     args = ap.parse_args()
 
@@ -48,9 +48,8 @@ def main():
         print("*** Network Protocol Tool v2")
 
     nlp = en_core_web_sm.load()
-    doc = Loader(args.document).load(verbose=args.verbose)
-    cleanup_text_nodes(doc, args.verbose)
-    core_nlp(doc.root().child("middle"), nlp, args.verbose)
+    doc = Loader(args.document).load(verbose=args.verbose, cleanup=True)
+    core_nlp(doc.root().child("middle"), nlp, args.verbose, n_process=args.jobs)
 
 
     # Print out the documents
@@ -30,59 +30,64 @@
 
 from npt2.document import Document, Node
 
-def cleanup_text_nodes(doc: Document, verbose:bool=False) -> None:
-    # In the RFC 7991 format, a number of elements have a content model that
-    # contains either text or child elements. Find such elements that only
-    # contain text, and replace that text with an equivalent <text> element.
-    # This ensures that all such elements contain a list of child elements,
-    # rather than having some with text and some with child elements.
-    cleanup_tags = [
-            "annotation",
-            "blockquote",
-            "xref",
-            "dd",
-            "dt",
-            "em",
-            "li",
-            "name",
-            "refcontent",
-            "strong",
-            "sub",
-            "sup",
-            "t",
-            "td",
-            "th",
-            "tt"
-        ]
+# In the RFC 7991 format, a number of elements have a content model that
+# contains either text or child elements:
+CLEANUP_TAGS = frozenset([
+        "annotation",
+        "blockquote",
+        "xref",
+        "dd",
+        "dt",
+        "em",
+        "li",
+        "name",
+        "refcontent",
+        "strong",
+        "sub",
+        "sup",
+        "t",
+        "td",
+        "th",
+        "tt"
+    ])
 
-    for tag in cleanup_tags:
-        if verbose:
-            print(f"Cleaning up <{tag}> nodes")
-        for node in doc.root().children(recursive=True, with_tag=tag):
-            if node.has_text():
-                text = Node("text")
-                text.add_text(node.text().replace("\n", " ").strip())
-                node.remove_text()
-                node.add_child(text)
 
-    # Find the <text> nodes, and collapse unnecessary white space
-    if verbose:
-        print(f"Cleaning up <text> nodes")
-    for tag in cleanup_tags:
-        for node in doc.root().children(recursive=True, with_tag=tag):
-            first = True
-            for child in node.children():
-                if child.tag() == "text":
-                    if child.text()[0].isspace() and not first:
-                        head = " "
-                    else:
-                        head = ""
-                    main = " ".join(child.text().split())
-                    if child.text()[-1].isspace():
-                        tail = " "
-                    else:
-                        tail = ""
-                    child.replace_text(head + main + tail)
-                first = False
+def cleanup_text_node(node: Node) -> None:
+    # If node is one of the CLEANUP_TAGS elements, and only contains text,
+    # replace that text with an equivalent <text> element. This ensures that
+    # all such elements contain a list of child elements, rather than having
+    # some with text and some with child elements. Then collapse unnecessary
+    # white space in its <text> children. This depends only on the node and
+    # its children, so can be done as soon as its children have been added.
+    if node.tag() not in CLEANUP_TAGS:
+        return
+    if node.has_text():
+        text = Node("text")
+        text.add_text(node.text().replace("\n", " ").strip())
+        node.remove_text()
+        node.add_child(text)
+
+    first = True
+    for child in node.children():
+        if child.tag() == "text":
+            if child.text()[0].isspace() and not first:
+                head = " "
+            else:
+                head = ""
+            main = " ".join(child.text().split())
+            if child.text()[-1].isspace():
+                tail = " "
+            else:
+                tail = ""
+            child.replace_text(head + main + tail)
+        first = False
 
 
+def cleanup_text_nodes(doc: Document, verbose:bool=False) -> None:
+    # Clean up the text of each of the CLEANUP_TAGS elements in the document,
+    # in a single traversal. Documents loaded with cleanup=True have already
+    # been cleaned up as they were built, and do not need this.
+    if verbose:
+        print(f"Cleaning up <text> nodes")
+    for node in doc.root().iter_descendants():
+        cleanup_text_node(node)
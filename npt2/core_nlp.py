@@ -31,20 +31,41 @@
 import spacy
 import spacy.lang.en
 
+from typing        import Iterator, Sequence
 from npt2.document import Document, Node
 
-def core_nlp(base: Node, nlp: spacy.lang.en.English, verbose:bool=False):
-    if verbose:
-        print(f"Generating linguistic annotations")
-    for node in base.children():
-        if node.tag() == "section":
-            core_nlp(node, nlp)
+# Pipeline components whose annotations are not used by later stages, so are not run:
+DISABLED_COMPONENTS = ("ner",)
+
+
+def _annotation_targets(base: Node) -> Iterator[Node]:
+    # The <t> and <name> nodes in base and its sections, in document order
+    stack = [iter(base.children())]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+        elif node.tag() == "section":
+            stack.append(iter(node.children()))
         elif node.tag() in ["t", "name"]:
-            doc = nlp(node.text(recursive=True))
-            node.add_metadata("spacy-doc", doc)
+            yield node
         elif node.tag() in ["figure", "artwork"]:
             # Don't try to process text in these nodes
-            pass 
+            pass
         else:
             print(f"  cannot process <{node.tag()}>")
 
+
+def core_nlp(base: Node, nlp: spacy.lang.en.English, verbose:bool=False, batch_size:int=64, n_process:int=1, disable:Sequence[str]=DISABLED_COMPONENTS):
+    """
+    Annotate each <t> and <name> node in `base` and its sections with the spaCy
+    document for its text, as its "spacy-doc" metadata. The texts are annotated
+    in batches of `batch_size` using `n_process` processes, skipping the pipeline
+    components named in `disable`.
+    """
+    if verbose:
+        print(f"Generating linguistic annotations")
+    nodes = list(_annotation_targets(base))
+    texts = [node.text(recursive=True) for node in nodes]
+    for node, doc in zip(nodes, nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disable)):
+        node.add_metadata("spacy-doc", doc)
@@ -29,35 +29,56 @@
 # =================================================================================================
 
 from __future__ import annotations
-from typing     import Any, Dict, List, Iterator, Optional
+from types      import MappingProxyType
+from typing     import Any, Dict, List, Iterator, Mapping, Optional, cast
+
+import sys
+
+_NO_ATTRIBUTES : Mapping[str,str] = MappingProxyType({})
+
 
 class Node:
-    _parent     : Optional[Node]
-    _tag        : str
-    _attributes : Dict[str,str]
-    _text       : str              # If self._text != "", len(self._children) == 0
-    _children   : List[Node]       # if len(self._children) > 0, self._text == ""
-    _meta       : Dict[str,Any]
+    # Most nodes are text leaves, so the attributes, metadata, and tag counts of a node are
+    # allocated only when it has some, and are None otherwise.
+    __slots__ = ("_parent", "_tag", "_attributes", "_text", "_first_child", "_last_child",
+                 "_prev", "_next", "_tag_counts", "_meta")
+
+    _parent      : Optional[Node]
+    _tag         : str
+    _attributes  : Optional[Dict[str,str]]
+    _text        : str              # If self._text != "", self._first_child is None
+    _first_child : Optional[Node]   # If self._first_child is not None, self._text == ""
+    _last_child  : Optional[Node]
+    _prev        : Optional[Node]   # The previous and next children of self._parent
+    _next        : Optional[Node]
+    _tag_counts  : Optional[Dict[str,int]]  # The number of descendants of self with each tag
+    _meta        : Optional[Dict[str,Any]]
 
     # ---------------------------------------------------------------------------------------------
     # Methods to initialise and modify a Node:
 
     def __init__(self, tag) -> None:
-        self._tag        = tag
-        self._parent     = None
-        self._attributes = {}
-        self._text       = ""
-        self._children   = []
-        self._meta       = {}
+        self._tag         = sys.intern(str(tag))
+        self._parent      = None
+        self._attributes  = None
+        self._text        = ""
+        self._first_child = None
+        self._last_child  = None
+        self._prev        = None
+        self._next        = None
+        self._tag_counts  = None
+        self._meta        = None
 
 
     def add_attribute(self, attribute: str, value: str) -> None:
+        if self._attributes is None:
+            self._attributes = {}
         assert attribute not in self._attributes
         self._attributes[attribute] = value
 
 
     def add_text(self, text: str) -> None:
-        assert self._children == []
+        assert self._first_child is None
         assert self._text == ""
         self._text = text
 
@@ -65,30 +86,28 @@ class Node:
     def add_child(self, child: Node) -> None:
         assert self._text == ""
         assert child._parent is None
-        child._parent = self
-        self._children.append(child)
+        self._link_child(child, self._last_child, None)
 
 
     def add_child_after(self, new_child: Node, after: Node) -> None:
         assert self._text == ""
         assert new_child._parent is None
-        children = []
-        for child in self._children:
-            children.append(child)
-            if id(child) == id(after):
-                new_child._parent = self
-                children.append(new_child)
-        self._children = children
+        assert after._parent is self
+        self._link_child(new_child, after, after._next)
 
 
     def add_metadata(self, name:str, value:Any) -> None:
+        if self._meta is None:
+            self._meta = {}
         assert name not in self._meta
         self._meta[name] = value
 
 
     def remove_attribute(self, attribute: str) -> None:
-        assert attribute in self._attributes
+        assert self._attributes is not None and attribute in self._attributes
         del self._attributes[attribute]
+        if len(self._attributes) == 0:
+            self._attributes = None
 
 
     def remove_text(self) -> None:
@@ -102,47 +121,94 @@ class Node:
 
 
     def remove_child(self, remove: Node) -> Node:
-        removed  = None
-        children = []
-        for child in self._children:
-            if id(child) != id(remove):
-                children.append(child)
-            else:
-                removed = child
-                removed._parent = None
-        self._children = children
-        assert removed is not None
-        return removed
+        assert remove._parent is self
+        self._unlink_child(remove)
+        return remove
 
 
     def replace_child(self, old_child: Node, new_child: Node) -> Node:
-        removed  = None
-        children = []
-        for child in self._children:
-            if id(child) == id(old_child):
-                new_child._parent = self
-                children.append(new_child)
-                removed = child
-                removed._parent = None
-            else:
-                children.append(child)
-        self._children = children
-        assert removed is not None
-        return removed
+        assert old_child._parent is self
+        assert new_child._parent is None
+        prev = old_child._prev
+        next = old_child._next
+        self._unlink_child(old_child)
+        self._link_child(new_child, prev, next)
+        return old_child
+
+
+    def _link_child(self, child: Node, prev: Optional[Node], next: Optional[Node]) -> None:
+        child._parent = self
+        child._prev   = prev
+        child._next   = next
+        if prev is None:
+            self._first_child = child
+        else:
+            prev._next = child
+        if next is None:
+            self._last_child = child
+        else:
+            next._prev = child
+        self._count_tags(child, 1)
+
+
+    def _unlink_child(self, child: Node) -> None:
+        if child._prev is None:
+            self._first_child = child._next
+        else:
+            child._prev._next = child._next
+        if child._next is None:
+            self._last_child = child._prev
+        else:
+            child._next._prev = child._prev
+        child._parent = None
+        child._prev   = None
+        child._next   = None
+        self._count_tags(child, -1)
+
+
+    def _count_tags(self, child: Node, sign: int) -> None:
+        # Add (or, if sign is -1, remove) the tags of child and its descendants to the tag
+        # counts of self and each of its ancestors. This takes time proportional to the
+        # depth of self multiplied by the number of distinct tags in the subtree rooted at
+        # child, so linking or unlinking a leaf is cheap, but moving a large subtree deep
+        # in the tree is not.
+        counts = [(child._tag, 1)]
+        if child._tag_counts is not None:
+            counts.extend(child._tag_counts.items())
+        node : Optional[Node] = self
+        while node is not None:
+            tag_counts = node._tag_counts
+            if tag_counts is None:
+                tag_counts = node._tag_counts = {}
+            for tag, count in counts:
+                total = tag_counts.get(tag, 0) + sign * count
+                if total == 0:
+                    del tag_counts[tag]
+                else:
+                    tag_counts[tag] = total
+            if len(tag_counts) == 0:
+                node._tag_counts = None
+            node = node._parent
 
     # ---------------------------------------------------------------------------------------------
     # Methods to query the contents of a Node:
 
     def has_attribute(self, attribute:str) -> bool:
-        return attribute in self._attributes
+        return self._attributes is not None and attribute in self._attributes
 
 
     def attribute(self, attribute:str) -> str:
+        if self._attributes is None:
+            raise KeyError(attribute)
         return self._attributes[attribute]
 
 
-    def attributes(self) -> Dict[str,str]:
-        return self._attributes
+    def attributes(self) -> Mapping[str,str]:
+        # A read-only view of the attributes. Use add_attribute() and remove_attribute()
+        # to change them.
+        if self._attributes is None:
+            return _NO_ATTRIBUTES
+        return MappingProxyType(self._attributes)
 
 
     def tag(self) -> str:
@@ -155,26 +221,55 @@ class Node:
 
 
     def text(self, recursive:bool=False) -> str:
-        text = self._text
         if recursive:
-            for child in self.children(recursive=True):
-                text += child.text(recursive=True)
-        return text
+            return "".join(self.iter_text())
+        return self._text
 
 
     def children(self, recursive:bool = False, with_tag:Optional[str] = None) -> List[Node]:
+        if recursive:
+            return list(self.iter_descendants(with_tag))
         children = []
-        for child in self._children:
-            if with_tag is None or child.tag() == with_tag:
-                assert child.parent() == self
-                children.append(child)
-            if recursive:
-                for node in child.children(recursive = True, with_tag = with_tag):
-                    if with_tag is None or node.tag() == with_tag:
-                        children.append(node)
+        node = self._first_child
+        while node is not None:
+            if with_tag is None or node._tag == with_tag:
+                children.append(node)
+            node = node._next
         return children
 
 
+    def iter_descendants(self, with_tag:Optional[str] = None) -> Iterator[Node]:
+        """
+        Generate the descendants of this node, optionally only those with the given tag, in
+        document order. The traversal follows the parent and sibling links, so needs no stack
+        and is not limited by the depth of the tree, and skips subtrees that contain no nodes
+        with the requested tag.
+        """
+        if with_tag is not None and (self._tag_counts is None or with_tag not in self._tag_counts):
+            return
+        node = self._first_child
+        while node is not None:
+            if with_tag is None or node._tag == with_tag:
+                yield node
+            if node._first_child is not None and (with_tag is None or with_tag in cast(Dict[str,int], node._tag_counts)):
+                node = node._first_child
+            else:
+                while node is not self and node._next is None:
+                    node = cast(Node, node._parent)
+                node = None if node is self else node._next
+
+
+    def iter_text(self) -> Iterator[str]:
+        """
+        Generate the text of this node and its descendants, in document order.
+        """
+        if self._text != "":
+            yield self._text
+        for node in self.iter_descendants():
+            if node._text != "":
+                yield node._text
+
+
     def child(self, tag: str) -> Node:
         nlist = self.children(recursive=False, with_tag=tag)
         assert len(nlist) == 1
@@ -189,19 +284,41 @@ class Node:
     # Method to print a Node
 
     def __str__(self):
-        s  = f"<{self._tag}"
-        for k, v in self._meta.items():
-            s += f" [meta {k}={v}]"
-        for k, v in self.attributes().items():
-            s += f" {k}={v}"
-        s += ">\n"
-        if self.has_text():
-            s += f"  {self.text()}\n"
-        for c in self.children():
-            for l in str(c).splitlines():
-                s += f"  {l}\n"
-        s += f"</{self._tag}>\n"
-        return s
+        # Each node is printed as its start tag, its text, its children indented by two spaces,
+        # then its end tag:
+        def indent(s: str, depth: int) -> str:
+            if depth == 0:
+                return s
+            return "".join(f"{'  ' * depth}{l}\n" for l in s.splitlines())
+
+        parts = []
+        node  = self
+        depth = 0
+        while True:
+            s = f"<{node._tag}"
+            if node._meta is not None:
+                for k, v in node._meta.items():
+                    s += f" [meta {k}={v}]"
+            for k, v in node.attributes().items():
+                s += f" {k}={v}"
+            s += ">\n"
+            if node.has_text():
+                s += f"  {node._text}\n"
+            parts.append(indent(s, depth))
+            if node._first_child is not None:
+                node   = node._first_child
+                depth += 1
+                continue
+            # Close this node, and each ancestor of which it is the last descendant:
+            while True:
+                parts.append(indent(f"</{node._tag}>\n", depth))
+                if node is self:
+                    return "".join(parts)
+                if node._next is not None:
+                    node = node._next
+                    break
+                node   = cast(Node, node._parent)
+                depth -= 1
 
 
 # =================================================================================================
@@ -31,21 +31,28 @@
 import errno
 import json
 import os
-import requests
 
+from concurrent.futures   import ThreadPoolExecutor
 from ietfdata.datatracker import DataTracker
 from pathlib              import Path
 from typing               import List, Union, Optional, Tuple, Dict, Iterator
 
+from npt.http_cache       import FETCH_WORKERS, HTTPCache, http_cache
 from npt2.document        import Node, Document
 from npt2.loader_txt      import load_txt
 from npt2.loader_xml      import load_xml
 
+# Where documents are fetched from. Tests can point these at a local server.
+IETF_ARCHIVE_URL = "https://www.ietf.org/archive/id"
+RFC_EDITOR_URL   = "https://www.rfc-editor.org"
+
 
 class Loader:
-    docname : str
+    docname  : str
+    cache    : HTTPCache
+    _fetched : Optional[Tuple[str, bytes]]
 
-    def __init__(self, docname:str) -> None:
+    def __init__(self, docname:str, cache:Optional[HTTPCache] = None) -> None:
         """
         A loader for an RFC or Internet draft.
 
@@ -56,9 +63,11 @@ class Loader:
         "draft-ietf-quic-transport-15.txt". If the extension or version number are not
         specified, they will default to the most recent version and most semantically
         rich format available. If the document does not exist as a local file, it will
-        be fetched.
+        be fetched, using the given `cache` or, by default, the process-wide `http_cache()`.
         """
         self.docname = docname
+        self.cache   = cache if cache is not None else http_cache()
+        self._fetched = None
 
 
     def _is_local_file(self) -> bool:
@@ -68,9 +77,9 @@ class Loader:
     def _url_draft(self) -> Optional[str]:
         assert not self._is_local_file()
         if self.docname.endswith(".txt"):
-            return f"https://www.ietf.org/archive/id/{self.docname}"
+            return f"{IETF_ARCHIVE_URL}/{self.docname}"
         elif self.docname.endswith(".xml"):
-            return f"https://www.ietf.org/archive/id/{self.docname}"
+            return f"{IETF_ARCHIVE_URL}/{self.docname}"
         else:
             dt = DataTracker()
             if self.docname[-3] == "-" and self.docname[-2].isdecimal() and self.docname[-1].isdecimal():
@@ -84,40 +93,41 @@ class Loader:
             if rev == None:
                 rev = doc.rev
             if doc.submissions != []:
-                for submission_uri in doc.submissions:
-                    submission = dt.submission(submission_uri)
+                # Look up the submissions concurrently, since there can be many of them:
+                with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+                    submissions = list(executor.map(dt.submission, doc.submissions))
+                for submission in submissions:
                     assert submission is not None
                     if submission.rev == rev:
                         if ".xml" in submission.file_types.split(","):
-                            return f"https://www.ietf.org/archive/id/{submission.name}-{submission.rev}.xml"
+                            return f"{IETF_ARCHIVE_URL}/{submission.name}-{submission.rev}.xml"
                         elif ".txt" in submission.file_types.split(","):
-                            return f"https://www.ietf.org/archive/id/{submission.name}-{submission.rev}.txt"
+                            return f"{IETF_ARCHIVE_URL}/{submission.name}-{submission.rev}.txt"
                         else:
                             raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.docname)
-            return f"https://www.ietf.org/archive/id/{doc.name}-{rev}.txt"
+            return f"{IETF_ARCHIVE_URL}/{doc.name}-{rev}.txt"
 
 
     def _url_rfc(self) -> Optional[str]:
         assert not self._is_local_file()
         if self.docname.endswith(".txt"):
-            return f"https://www.rfc-editor.org/rfc/{self.docname}"
+            return f"{RFC_EDITOR_URL}/rfc/{self.docname}"
         elif self.docname.endswith(".xml"):
-            return f"https://www.rfc-editor.org/rfc/{self.docname}"
+            return f"{RFC_EDITOR_URL}/rfc/{self.docname}"
         else:
-            with requests.Session() as session:
-                response = session.get(f"https://www.rfc-editor.org/rfc/{self.docname}.json", verify=True)
-                if response.status_code == 200:
-                    meta = json.loads(response.text)
-                    if "XML" in meta['format']:
-                        return f"https://www.rfc-editor.org/rfc/{self.docname}.xml"
-                    elif "TXT" in meta['format']:
-                        return f"https://www.rfc-editor.org/rfc/{self.docname}.txt"
-                    elif "ASCII" in meta['format']:
-                        return f"https://www.rfc-editor.org/rfc/{self.docname}.txt"
-                    else:
-                        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.docname)
+            data = self.cache.fetch(f"{RFC_EDITOR_URL}/rfc/{self.docname}.json")
+            if data is not None:
+                meta = json.loads(data)
+                if "XML" in meta['format']:
+                    return f"{RFC_EDITOR_URL}/rfc/{self.docname}.xml"
+                elif "TXT" in meta['format']:
+                    return f"{RFC_EDITOR_URL}/rfc/{self.docname}.txt"
+                elif "ASCII" in meta['format']:
+                    return f"{RFC_EDITOR_URL}/rfc/{self.docname}.txt"
                 else:
                     raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.docname)
+            else:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.docname)
 
 
     def _url(self) -> Optional[str]:
@@ -129,27 +139,69 @@ class Loader:
         return None
 
 
-    def load(self, verbose:Optional[bool] = False) -> Document:
+    def fetch(self) -> Tuple[str, bytes]:
+        """
+        Find and download the document, if it is not a local file, returning its URL
+        and contents. The download is kept, so a later call to `load()` will not repeat it.
+        """
+        assert not self._is_local_file()
+        if self._fetched is None:
+            try:
+                url = self._url()
+            except SystemExit:
+                # ietfdata exits, rather than raising an exception, if the DataTracker
+                # cannot be reached. Report that as failing to find this document.
+                url = None
+            if url is not None:
+                data = self.cache.fetch(url)
+                if data is not None:
+                    self._fetched = (url, data)
+        if self._fetched is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.docname)
+        return self._fetched
+
+
+    def load(self, verbose:Optional[bool] = False, cleanup:bool = False) -> Document:
+        """
+        Load the document. If `cleanup` is set, the text of each node is cleaned up as
+        by `cleanup_text_nodes()` while the document is loaded.
+        """
         if self._is_local_file():
             if verbose:
                 print(f"Loading {self.docname}")
             if self.docname.endswith(".txt"):
                 with open(self.docname, "r") as inf:
-                    return load_txt(inf.read())
+                    return load_txt(inf.read(), cleanup)
             if self.docname.endswith(".xml"):
                 with open(self.docname, "rb") as inf:
-                    return load_xml(inf.read())
+                    return load_xml(inf.read(), cleanup)
         else:
-            url = self._url()
-            if url is not None:
-                if verbose:
-                    print(f"Loading {url}")
-                with requests.Session() as session:
-                    response = session.get(url, verify=True)
-                    if response.status_code == 200:
-                        if url.endswith(".txt"):
-                            return load_txt(response.text)
-                        if url.endswith(".xml"):
-                            return load_xml(response.content)
+            url, data = self.fetch()
+            if verbose:
+                print(f"Loading {url}")
+            if url.endswith(".txt"):
+                return load_txt(data.decode("utf-8"), cleanup)
+            if url.endswith(".xml"):
+                return load_xml(data, cleanup)
         raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.docname)
 
+
+def _prefetch(loader: Loader) -> None:
+    try:
+        loader.fetch()
+    except (Exception, SystemExit):
+        # Leave the error to be reported when the document is loaded.
+        pass
+
+
+def prefetch(docnames:List[str], cache:Optional[HTTPCache] = None) -> Dict[str, Loader]:
+    """
+    Create a Loader for each of the `docnames`, and find and download those that are
+    not local files concurrently, so that they can then be loaded without waiting for
+    the network.
+    """
+    loaders = {docname: Loader(docname, cache) for docname in docnames}
+    remote  = [loader for loader in loaders.values() if not loader._is_local_file()]
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        list(executor.map(_prefetch, remote))
+    return loaders
@@ -34,8 +34,9 @@ from typing        import List, Union, Optional, Tuple, Dict, Iterator
 from pathlib       import Path
 from lark          import Lark, Tree, Token
 
-from npt2.document import Node, Document
-from slugify       import slugify
+from npt2.document           import Node, Document
+from npt2.cleanup_text_nodes import cleanup_text_node
+from slugify                 import slugify
 
 # =================================================================================================
 # The Lark grammar for a textual format RFC or Internet-draft:
@@ -254,7 +255,7 @@ grammar = r"""
 
 # =================================================================================================
 
-def _load_tree(tree: Tree) -> List[Node]:
+def _load_tree(tree: Tree, cleanup: bool = False) -> List[Node]:
     node = Node(tree.data)
 
     only_has_text = True
@@ -270,12 +271,14 @@ def _load_tree(tree: Tree) -> List[Node]:
     else:
         for elem in tree.children:
             if isinstance(elem, Tree):
-                for child in _load_tree(elem):
+                for child in _load_tree(elem, cleanup):
                     node.add_child(child)
             if isinstance(elem, Token):
                 text = Node("text")
                 text.add_text(elem)
                 node.add_child(text)
+    if cleanup:
+        cleanup_text_node(node)
     return [node]
 
 
@@ -367,7 +370,7 @@ def _update_links(doc: Document) -> None:
     pass
 
 
-def _update_sections(doc: Document) -> None:
+def _update_sections(doc: Document, cleanup: bool) -> None:
     # Rewrite <section> nodes to better match the structure of XML RFCs. This turns:
     #
     #   <section>
@@ -397,6 +400,8 @@ def _update_sections(doc: Document) -> None:
         name = Node("name")
         name.add_text(title.text())
         name.add_attribute("slugifiedName", f"name-{slugify(title.text())}")
+        if cleanup:
+            cleanup_text_node(name)
         section.replace_child(head, name)
         section.add_attribute("numbered", "true")
         section.add_attribute("toc", "include")
@@ -409,16 +414,20 @@ def _update_sections(doc: Document) -> None:
 
 
 
-def load_txt(content: str) -> Document:
+def load_txt(content: str, cleanup: bool = False) -> Document:
+    """
+    Load a plain text RFC. If `cleanup` is set, the text of each node is cleaned
+    up as by `cleanup_text_nodes()` as the tree is built.
+    """
     parser = Lark(grammar, start = "rfc")
 
     tree  = parser.parse(content)
-    nodes = _load_tree(tree)
+    nodes = _load_tree(tree, cleanup)
     assert len(nodes) == 1
     doc = Document(nodes[0])
     _update_links(doc)
     _update_front(doc)
-    _update_sections(doc)
+    _update_sections(doc, cleanup)
     return doc
 
 
@@ -32,9 +32,10 @@ from typing        import List, Union, Optional, Tuple, Dict
 from lxml          import etree as ET # type: ignore
 from pathlib       import Path
 
-from npt2.document import Node, Document
+from npt2.document           import Node, Document
+from npt2.cleanup_text_nodes import cleanup_text_node
 
-def _load_xml(xmlElement:ET.Element, parent:Optional[Node] = None) -> List[Node]:
+def _load_xml(xmlElement:ET.Element, parent:Optional[Node] = None, cleanup:bool = False) -> List[Node]:
     node = Node(xmlElement.tag)
 
     for k, v in xmlElement.attrib.items():
@@ -49,10 +50,13 @@ def _load_xml(xmlElement:ET.Element, parent:Optional[Node] = None) -> List[Node]
             node.add_child(text)
 
     for elem in xmlElement:
-        for child in _load_xml(elem, node):
+        for child in _load_xml(elem, node, cleanup):
             assert child.parent() == None
             node.add_child(child)
 
+    if cleanup:
+        cleanup_text_node(node)
+
     if xmlElement.tail is not None and len(xmlElement.tail.strip()) > 0:
         tail = Node("text")
         tail.add_text(xmlElement.tail)
@@ -62,9 +66,13 @@ def _load_xml(xmlElement:ET.Element, parent:Optional[Node] = None) -> List[Node]
 
 
 
-def load_xml(content : bytes) -> Document:
+def load_xml(content : bytes, cleanup:bool = False) -> Document:
+    """
+    Load an RFC 7991 format XML document. If `cleanup` is set, the text of each
+    node is cleaned up as by `cleanup_text_nodes()` as the tree is built.
+    """
     xml   = ET.fromstring(content)
-    nodes = _load_xml(xml)
+    nodes = _load_xml(xml, cleanup=cleanup)
     assert len(nodes) == 1
     return Document(nodes[0])
 
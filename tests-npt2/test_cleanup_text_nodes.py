@@ -0,0 +1,63 @@
+# =================================================================================================
+# Copyright (C) 2022 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+import os
+import sys
+import unittest
+
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from npt2.document           import Node
+from npt2.loader_xml         import load_xml
+from npt2.cleanup_text_nodes import cleanup_text_node, cleanup_text_nodes
+
+class TestCleanupTextNodes(unittest.TestCase):
+    def test_cleanup_text_node(self) -> None:
+        t = Node("t")
+        t.add_text("  Some\n  text  ")
+        cleanup_text_node(t)
+        self.assertFalse(t.has_text())
+        self.assertEqual([c.tag() for c in t.children()], ["text"])
+        self.assertEqual(t.child("text").text(), "Some text")
+
+        artwork = Node("artwork")
+        artwork.add_text("  Some\n  text  ")
+        cleanup_text_node(artwork)
+        self.assertEqual(artwork.text(), "  Some\n  text  ")
+
+
+    def test_cleanup_text_nodes_on_load(self) -> None:
+        content = b"<rfc><section><name>A\n  section</name><t>Some <em>emphasised</em>\n  text </t><artwork>  a  b  </artwork></section></rfc>"
+        doc = load_xml(content)
+        cleanup_text_nodes(doc)
+        self.assertEqual(str(load_xml(content, cleanup=True).root()), str(doc.root()))
+        self.assertEqual(doc.root().child("section").child("t").text(recursive=True), "Some emphasised text ")
@@ -0,0 +1,66 @@
+# =================================================================================================
+# Copyright (C) 2022 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+import os
+import sys
+import unittest
+
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import spacy.lang.en
+
+from npt2.document import Node
+from npt2.core_nlp import core_nlp
+
+class TestCoreNLP(unittest.TestCase):
+    def test_core_nlp(self) -> None:
+        middle  = Node("middle")
+        section = Node("section")
+        name    = Node("name")
+        t1      = Node("t")
+        t2      = Node("t")
+        figure  = Node("figure")
+        name.add_text("Introduction")
+        t1.add_text("The first paragraph.")
+        t2.add_text("The second paragraph.")
+        figure.add_text("Not annotated")
+        section.add_child(name)
+        section.add_child(t1)
+        section.add_child(figure)
+        middle.add_child(section)
+        middle.add_child(t2)
+
+        core_nlp(middle, spacy.lang.en.English(), batch_size=2)
+        for node in [name, t1, t2]:
+            assert node._meta is not None
+            self.assertEqual(node._meta["spacy-doc"].text, node.text(recursive=True))
+        self.assertIsNone(figure._meta)
@@ -0,0 +1,106 @@
+# =================================================================================================
+# Copyright (C) 2022 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests')))
+
+import npt2.loader
+
+from npt.http_cache  import HTTPCache
+from npt2.loader     import Loader, prefetch
+from stand_ins       import ExitingDataTracker, StandInServer
+
+
+class TestLoaderCache(unittest.TestCase):
+    def setUp(self) -> None:
+        with open("examples/rfc/rfc9293/rfc9293.xml", "rb") as inf:
+            self.document = inf.read()
+        self.server    = StandInServer({"/rfc/rfc9293.json": b'{"format": ["ASCII", "HTML", "PDF", "XML"]}',
+                                        "/rfc/rfc9293.xml" : self.document})
+        self.cache_dir = tempfile.mkdtemp(prefix="test_loader_cache")
+        self.saved_url = npt2.loader.RFC_EDITOR_URL
+        npt2.loader.RFC_EDITOR_URL = self.server.url
+
+
+    def tearDown(self) -> None:
+        npt2.loader.RFC_EDITOR_URL = self.saved_url
+        self.server.close()
+        shutil.rmtree(self.cache_dir)
+
+
+    def test_loader_cache__loader_revalidate(self) -> None:
+        for _ in range(2):
+            d = Loader("rfc9293", HTTPCache(self.cache_dir)).load()
+            self.assertEqual(d.root().tag(), "rfc")
+        self.assertEqual(self.server.requests, [("/rfc/rfc9293.json", 200), ("/rfc/rfc9293.xml", 200),
+                                                ("/rfc/rfc9293.json", 304), ("/rfc/rfc9293.xml", 304)])
+
+
+    def test_loader_cache__loader_offline(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            Loader("rfc9293", HTTPCache(self.cache_dir, offline=True)).load()
+        Loader("rfc9293", HTTPCache(self.cache_dir)).load()
+        self.server.close()
+        d = Loader("rfc9293", HTTPCache(self.cache_dir, offline=True)).load()
+        self.assertEqual(d.root().tag(), "rfc")
+        self.assertEqual(self.server.requests, [("/rfc/rfc9293.json", 200), ("/rfc/rfc9293.xml", 200)])
+
+
+    def test_loader_cache__prefetch(self) -> None:
+        loaders = prefetch(["rfc9293", "rfc9292.xml", "examples/rfc/rfc9293/rfc9293.xml"], HTTPCache())
+        self.assertEqual(sorted(self.server.requests), [("/rfc/rfc9292.xml", 404), ("/rfc/rfc9293.json", 200), ("/rfc/rfc9293.xml", 200)])
+        # Documents that were prefetched are loaded without further requests:
+        self.assertEqual(loaders["rfc9293"].load().root().tag(), "rfc")
+        self.assertEqual(loaders["examples/rfc/rfc9293/rfc9293.xml"].load().root().tag(), "rfc")
+        self.assertEqual(len(self.server.requests), 3)
+        with self.assertRaises(FileNotFoundError):
+            loaders["rfc9292.xml"].load()
+
+
+    def test_loader_cache__prefetch_exit(self) -> None:
+        saved = npt2.loader.DataTracker
+        try:
+            npt2.loader.DataTracker = ExitingDataTracker # type: ignore
+            loaders = prefetch(["draft-ietf-example-protocol", "rfc9293.xml"], HTTPCache())
+            self.assertEqual(loaders["rfc9293.xml"].load().root().tag(), "rfc")
+            with self.assertRaises(FileNotFoundError):
+                loaders["draft-ietf-example-protocol"].load()
+        finally:
+            npt2.loader.DataTracker = saved # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# =================================================================================================
+# Copyright (C) 2022 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+import os
+import sys
+import unittest
+
+from pathlib import Path
+
+from npt2.loader_txt         import load_txt
+from npt2.cleanup_text_nodes import cleanup_text_nodes
+
+class TestLoaderTxt(unittest.TestCase):
+    def setUp(self) -> None:
+        with open("examples/rfc/rfc9000/rfc9000.txt", "r") as inf:
+            self.content = inf.read()
+
+
+    def test_load_txt(self) -> None:
+        doc = load_txt(self.content)
+        r = doc.root()
+        self.assertEqual(r.tag(), "rfc")
+        self.assertEqual([c.tag() for c in r.children()], ["front", "middle", "back"])
+        self.assertEqual(len(r.children(recursive=True)), 2183)
+        self.assertEqual(r.child("middle").children(with_tag="section")[0].child("name").text(recursive=True), "Overview")
+
+
+    def test_load_txt_cleanup(self) -> None:
+        doc = load_txt(self.content)
+        cleanup_text_nodes(doc)
+        self.assertEqual(str(load_txt(self.content, cleanup=True).root()), str(doc.root()))
@@ -36,6 +36,7 @@ from pathlib import Path
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from lark                import Token
 from npt2.document       import Node
 
 class TestNode(unittest.TestCase):
@@ -59,6 +60,14 @@ class TestNode(unittest.TestCase):
         n.remove_attribute("category")
         self.assertEqual(n.has_attribute("category"), False)
 
+        # The attributes can only be changed through the node:
+        with self.assertRaises(TypeError):
+            n.attributes()["category"] = "test" # type: ignore
+        n.add_attribute("category", "test")
+        with self.assertRaises(TypeError):
+            n.attributes()["category"] = "changed" # type: ignore
+        self.assertEqual(n.attributes(), {"category": "test"})
+
 
     def test_node__text(self) -> None:
         n = Node("test")
@@ -128,3 +137,117 @@ class TestNode(unittest.TestCase):
 
 
 
+
+
+    def test_node__children_recursive_after_changes(self) -> None:
+        p  = Node("test")
+        c1 = Node("child")
+        c2 = Node("child-two")
+        c3 = Node("child")
+        c4 = Node("subchild")
+        c1.add_child(c3)
+        c3.add_child(c4)
+        p.add_child(c1)
+        p.add_child(c2)
+        self.assertEqual(p.children(recursive = True, with_tag = "subchild"), [c4])
+
+        p.remove_child(c1)
+        self.assertEqual(p.children(recursive = True, with_tag = "subchild"), [])
+        self.assertEqual(p.children(recursive = True, with_tag = "child"), [])
+        self.assertEqual(p.children(recursive = True), [c2])
+
+        p.add_child_after(c1, c2)
+        self.assertEqual(p.children(recursive = True), [c2, c1, c3, c4])
+        self.assertEqual(p.children(recursive = True, with_tag = "child"), [c1, c3])
+
+        c5 = Node("subchild")
+        c1.replace_child(c3, c5)
+        self.assertEqual(p.children(recursive = True), [c2, c1, c5])
+        self.assertEqual(p.children(recursive = True, with_tag = "subchild"), [c5])
+        self.assertEqual(p.children(recursive = True, with_tag = "child"), [c1])
+        self.assertEqual(c3.children(recursive = True, with_tag = "subchild"), [c4])
+
+
+    def test_node__iter_descendants(self) -> None:
+        p  = Node("test")
+        c1 = Node("child")
+        c2 = Node("child")
+        c3 = Node("subchild")
+        p.add_child(c1)
+        p.add_child(c2)
+        c1.add_child(c3)
+
+        descendants = p.iter_descendants()
+        self.assertEqual(next(descendants), c1)
+        self.assertEqual(list(descendants), [c3, c2])
+        self.assertEqual(list(p.iter_descendants(with_tag = "child")), [c1, c2])
+        self.assertEqual(list(c1.iter_descendants()), [c3])
+        self.assertEqual(list(c3.iter_descendants()), [])
+
+
+    def test_node__text_recursive(self) -> None:
+        p  = Node("test")
+        c1 = Node("child")
+        c2 = Node("text")
+        c3 = Node("text")
+        c4 = Node("text")
+        c2.add_text("one ")
+        c3.add_text("two ")
+        c4.add_text("three")
+        c1.add_child(c2)
+        c1.add_child(c3)
+        p.add_child(c1)
+        p.add_child(c4)
+
+        self.assertEqual(list(p.iter_text()), ["one ", "two ", "three"])
+        self.assertEqual(p.text(recursive = True), "one two three")
+        self.assertEqual(p.text(), "")
+        self.assertEqual(c2.text(recursive = True), "one ")
+
+
+    def test_node__str(self) -> None:
+        p  = Node("test")
+        c1 = Node("child")
+        c2 = Node("text")
+        c1.add_attribute("anchor", "c1")
+        c2.add_text("one\ntwo")
+        c1.add_child(c2)
+        p.add_child(c1)
+        p.add_child(Node("empty"))
+
+        self.assertEqual(str(p), "<test>\n  <child anchor=c1>\n    <text>\n      one\n    two\n    </text>\n  </child>\n  <empty>\n  </empty>\n</test>\n")
+        self.assertEqual(str(c2), "<text>\n  one\ntwo\n</text>\n")
+
+
+    def test_node__deep_tree(self) -> None:
+        root = Node("child")
+        root.add_text("leaf")
+        for i in range(5 * sys.getrecursionlimit() - 1):
+            parent = Node("child")
+            parent.add_child(root)
+            root = parent
+        parent = Node("test")
+        parent.add_child(root)
+        root = parent
+
+        self.assertEqual(len(root.children(recursive = True)), 5 * sys.getrecursionlimit())
+        self.assertEqual(root.text(recursive = True), "leaf")
+        self.assertTrue(str(root).endswith("</test>\n"))
+
+
+    def test_node__storage(self) -> None:
+        n = Node("".join(["te", "st"]))
+        self.assertIs(n.tag(), Node("test").tag())
+        self.assertFalse(hasattr(n, "__dict__"))
+
+        # The text loader creates nodes with lark Token tags:
+        t = Node(Token("RULE", "test"))
+        self.assertIs(type(t.tag()), str)
+        self.assertIs(t.tag(), n.tag())
+
+        self.assertEqual(n.has_attribute("category"), False)
+        self.assertRaises(KeyError, n.attribute, "category")
+        n.add_attribute("category", "test")
+        n.add_metadata("source", "test")
+        self.assertEqual(n.attributes(), {"category": "test"})
+        self.assertEqual(str(n), "<test [meta source=test] category=test>\n</test>\n")
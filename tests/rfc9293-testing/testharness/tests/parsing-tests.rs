@@ -378,7 +378,7 @@ fn test_parse_tcp_header_payload() {
     match parse_tcp_header_data((&data, 0), &mut context, 5) {
         (Result::Ok(((_, _), payload)), _) => {
             assert_eq!(payload.0.len(), data.len());
-            assert_eq!(payload.0, data);
+            assert_eq!(payload.0[..], data[..]);
         },
         _ => panic!("Invalid packet")
     }
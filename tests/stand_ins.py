@@ -0,0 +1,91 @@
+# =================================================================================================
+# Copyright (C) 2021 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+# Stand-ins for the services the loaders depend on, shared by the npt and npt2 tests.
+
+import sys
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing      import Dict, List, Tuple
+
+
+class StandInServer:
+    """
+    A local HTTP server that serves fixed documents with an ETag, and records the
+    requests it receives.
+    """
+    def __init__(self, documents: Dict[str, bytes]) -> None:
+        self.documents = documents
+        self.requests  : List[Tuple[str, int]] = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                # Record the request before responding, so the client cannot see the
+                # response before it is recorded:
+                if self.path not in stand_in.documents:
+                    stand_in.requests.append((self.path, 404))
+                    self.send_response(404)
+                    self.end_headers()
+                elif self.headers.get("If-None-Match") == '"v1"':
+                    stand_in.requests.append((self.path, 304))
+                    self.send_response(304)
+                    self.end_headers()
+                else:
+                    stand_in.requests.append((self.path, 200))
+                    body = stand_in.documents[self.path]
+                    self.send_response(200)
+                    self.send_header("ETag", '"v1"')
+                    self.send_header("Last-Modified", "Mon, 01 Aug 2022 00:00:00 GMT")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url    = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ExitingDataTracker:
+    """
+    Stands in for ietfdata's DataTracker when the DataTracker cannot be reached, in
+    which case it exits.
+    """
+    def __init__(self) -> None:
+        sys.exit("cannot reach the DataTracker")
@@ -0,0 +1,38 @@
+// Throughput of the generated TCP parser, in packets per second, over the packets in the test
+// pcaps. Generate the parser with `-f rust-zerocopy` rather than `-f rust` to measure the
+// zero-copy mode, in which the payload is borrowed from the packet rather than copied.
+
+extern crate criterion;
+extern crate draft_mcquistin_augmented_tcp_example_02;
+extern crate pcap;
+
+use criterion::{black_box, criterion_group, criterion_main, Criterion, Throughput};
+use draft_mcquistin_augmented_tcp_example_02::*;
+use pcap::Capture;
+
+fn load_tcp_packets(filename: &str) -> Vec<Vec<u8>> {
+    let mut cap = Capture::from_file(filename).unwrap();
+    let mut packets = Vec::new();
+    while let Ok(packet) = cap.next() {
+        let ip_packet = &packet.data[14..];
+        let ip_hdr_len = ip_packet[0] & 0xF;
+        packets.push(ip_packet[(ip_hdr_len*4) as usize..].to_vec());
+    }
+    packets
+}
+
+fn bench_parse_pdu(c: &mut Criterion) {
+    let packets = load_tcp_packets("../pcaps/tcp-ten-packets.pcap");
+    let mut group = c.benchmark_group("tcp");
+    group.throughput(Throughput::Elements(packets.len() as u64));
+    group.bench_function("parse_pdu", |b| b.iter(|| {
+        for tcp_packet in &packets {
+            let mut context = Context { data_size: (tcp_packet.len()*8) as u32 };
+            black_box(parse_pdu((black_box(&tcp_packet[..]), 0), &mut context).0.is_ok());
+        }
+    }));
+    group.finish();
+}
+
+criterion_group!(benches, bench_parse_pdu);
+criterion_main!(benches);
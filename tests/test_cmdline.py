@@ -99,6 +99,42 @@ class Test_Cmdline(unittest.TestCase):
         tmpdir.rmdir()
 
 
+    def test_cmdline_batch(self):
+        # Can we process several documents, one listed in a manifest, each into its
+        # own subdirectory, and is a document that cannot be loaded reported?
+        tmpdir = Path(tempfile.mkdtemp(prefix="test_cmdline"))
+        subdir = tmpdir / "output"
+        manifest = tmpdir / "manifest.txt"
+        with open(manifest, "w") as outf:
+            outf.write("# Documents to process\n")
+            outf.write("examples/draft-mcquistin-augmented-udp-example-00.xml\n")
+        result = subprocess.run(["python", "-m", "npt", "batch", "-d", subdir, "-f", "simple", "-j", "2", "-m", manifest,
+                                 "examples/draft-mcquistin-augmented-ascii-diagrams-07.xml", "examples/missing.xml"],
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Processed 3 documents", result.stdout)
+        self.assertIn("examples/missing.xml: ValueError", result.stdout)
+        self.assertTrue((subdir / "draft-mcquistin-augmented-udp-example-00" / "description.txt").is_file())
+        self.assertTrue((subdir / "draft-mcquistin-augmented-ascii-diagrams-07" / "description.txt").is_file())
+        self.assertFalse((subdir / "missing").exists())
+        shutil.rmtree(tmpdir)
+
+
+
+    def test_cmdline_batch_same_name(self):
+        # Are documents whose output would be written to the same subdirectory rejected
+        # before any are processed?
+        tmpdir = Path(tempfile.mkdtemp(prefix="test_cmdline"))
+        subdir = tmpdir / "output"
+        result = subprocess.run(["python", "-m", "npt", "batch", "-d", subdir, "-f", "simple",
+                                 "examples/draft-mcquistin-augmented-udp-example-00.xml", "draft-mcquistin-augmented-udp-example-00.txt"],
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("examples/draft-mcquistin-augmented-udp-example-00.xml and draft-mcquistin-augmented-udp-example-00.txt would be written to the same directory", result.stdout)
+        self.assertFalse(subdir.exists())
+        shutil.rmtree(tmpdir)
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,91 @@
+# =================================================================================================
+# Copyright (C) 2021 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+import os
+import sys
+import unittest
+
+from typing import Any, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from npt.formatter_simple import SimpleFormatter
+from npt.helpers          import ExpressionTraversal
+from npt.protocol         import *
+
+
+class CountingFormatter(SimpleFormatter):
+    def __init__(self):
+        super().__init__()
+        self.invocations : List[str] = []
+
+    def format_methodinvocationexpr(self, target: Any, method_name: str, arg_exprs: List[Any]) -> Any:
+        self.invocations.append(method_name)
+        return super().format_methodinvocationexpr(target, method_name, arg_exprs)
+
+
+class TestHelpers(unittest.TestCase):
+    def size_chain(self, length: int) -> Expression:
+        size : Expression = ConstantExpression(Number(), 0)
+        for i in range(length):
+            size = MethodInvocationExpression(size, "plus", [ArgumentExpression("other", ConstantExpression(Number(), i))])
+        return size
+
+
+    def test_expression_traversal(self):
+        formatter = CountingFormatter()
+        traversal = ExpressionTraversal(formatter)
+        length = MethodInvocationExpression(FieldAccessExpression(SelfExpression(), "length"), "to_number", [])
+        size = MethodInvocationExpression(length, "plus", [ArgumentExpression("other", length)])
+
+        self.assertEqual(traversal.dfs_expression(size), "Self.length.to_number().plus(other=Self.length.to_number())")
+        self.assertEqual(traversal.dfs_expression(size), "Self.length.to_number().plus(other=Self.length.to_number())")
+        self.assertEqual(formatter.invocations, ["to_number", "plus"])
+        self.assertIsNone(traversal.dfs_expression(None))
+
+
+    def test_expression_traversal_use_stack(self):
+        size = self.size_chain(10)
+
+        self.assertEqual(ExpressionTraversal(SimpleFormatter(), use_stack=True).dfs_expression(size),
+                         ExpressionTraversal(SimpleFormatter()).dfs_expression(size))
+
+
+    def test_expression_traversal_use_stack_deep(self):
+        size = self.size_chain(5 * sys.getrecursionlimit())
+
+        formatted = ExpressionTraversal(SimpleFormatter(), use_stack=True).dfs_expression(size)
+        self.assertTrue(formatted.startswith("0.plus(other=0).plus(other=1)"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# vim: set tw=0 ai:
@@ -0,0 +1,155 @@
+# =================================================================================================
+# Copyright (C) 2021 University of Glasgow
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+# =================================================================================================
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import npt.http_cache
+import npt.loader
+
+from npt.http_cache import HTTPCache
+from stand_ins      import ExitingDataTracker, StandInServer
+
+
+class Test_HTTPCache(unittest.TestCase):
+    def setUp(self) -> None:
+        with open("examples/draft-mcquistin-augmented-udp-example-00.xml", "rb") as inf:
+            self.document = inf.read()
+        self.server    = StandInServer({"/rfc/rfc9999.xml": self.document})
+        self.cache_dir = tempfile.mkdtemp(prefix="test_http_cache")
+
+    def tearDown(self) -> None:
+        self.server.close()
+        shutil.rmtree(self.cache_dir)
+
+
+    def test_http_cache_revalidate(self) -> None:
+        cache = HTTPCache(self.cache_dir)
+        url = f"{self.server.url}/rfc/rfc9999.xml"
+        self.assertEqual(cache.fetch(url), self.document)
+        self.assertEqual(HTTPCache(self.cache_dir).fetch(url), self.document)
+        self.assertIsNone(cache.fetch(f"{self.server.url}/rfc/missing.xml"))
+        self.assertEqual(self.server.requests, [("/rfc/rfc9999.xml", 200), ("/rfc/rfc9999.xml", 304), ("/rfc/missing.xml", 404)])
+
+
+    def test_http_cache_offline(self) -> None:
+        url = f"{self.server.url}/rfc/rfc9999.xml"
+        self.assertIsNone(HTTPCache(self.cache_dir, offline=True).fetch(url))
+        self.assertEqual(HTTPCache(self.cache_dir).fetch(url), self.document)
+        self.server.close()
+        self.assertEqual(HTTPCache(self.cache_dir, offline=True).fetch(url), self.document)
+        self.assertEqual(self.server.requests, [("/rfc/rfc9999.xml", 200)])
+
+
+    def test_http_cache_interrupted_store(self) -> None:
+        # A body that does not match the stored meta data is not used:
+        url = f"{self.server.url}/rfc/rfc9999.xml"
+        self.assertEqual(HTTPCache(self.cache_dir).fetch(url), self.document)
+        body_path, meta_path = HTTPCache(self.cache_dir)._paths(url)
+        with open(body_path, "wb") as outf:
+            outf.write(b"partial")
+        self.assertIsNone(HTTPCache(self.cache_dir, offline=True).fetch(url))
+        self.assertEqual(HTTPCache(self.cache_dir).fetch(url), self.document)
+        self.assertEqual(HTTPCache(self.cache_dir, offline=True).fetch(url), self.document)
+        self.assertEqual(self.server.requests, [("/rfc/rfc9999.xml", 200), ("/rfc/rfc9999.xml", 200)])
+
+
+    def test_http_cache_concurrent_store(self) -> None:
+        cache = HTTPCache(self.cache_dir)
+        url = f"{self.server.url}/rfc/rfc9999.xml"
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bodies = list(executor.map(lambda _: cache.fetch(url), range(16)))
+        self.assertEqual(bodies, [self.document] * 16)
+        self.assertEqual([name for name in os.listdir(self.cache_dir) if name.endswith(".tmp")], [])
+        self.assertEqual(HTTPCache(self.cache_dir, offline=True).fetch(url), self.document)
+
+
+    def test_http_cache_no_dir(self) -> None:
+        cache = HTTPCache()
+        url = f"{self.server.url}/rfc/rfc9999.xml"
+        self.assertEqual(cache.fetch(url), self.document)
+        self.assertEqual(cache.fetch(url), self.document)
+        self.assertEqual(self.server.requests, [("/rfc/rfc9999.xml", 200), ("/rfc/rfc9999.xml", 200)])
+
+
+    def test_http_cache_loader(self) -> None:
+        saved = (npt.loader.RFC_EDITOR_URL, npt.http_cache._http_cache)
+        try:
+            npt.loader.RFC_EDITOR_URL   = self.server.url
+            npt.http_cache._http_cache  = HTTPCache(self.cache_dir)
+            for _ in range(2):
+                inf = npt.loader.load_file("rfc9999.xml")
+                assert inf is not None
+                self.assertEqual(inf.fmt,  ".xml")
+                self.assertEqual(inf.data, self.document)
+            self.assertEqual(self.server.requests, [("/rfc/rfc9999.xml", 200), ("/rfc/rfc9999.xml", 304)])
+        finally:
+            npt.loader.RFC_EDITOR_URL, npt.http_cache._http_cache = saved
+
+
+    def test_http_cache_prefetch(self) -> None:
+        saved = (npt.loader.RFC_EDITOR_URL, npt.http_cache._http_cache)
+        try:
+            npt.loader.RFC_EDITOR_URL   = self.server.url
+            npt.http_cache._http_cache  = HTTPCache()
+            docs = npt.loader.prefetch(["rfc9999.xml", "rfc9998.xml", "examples/draft-mcquistin-augmented-udp-example-00.xml"])
+            self.assertEqual(list(docs), ["rfc9999.xml", "rfc9998.xml", "examples/draft-mcquistin-augmented-udp-example-00.xml"])
+            self.assertEqual(docs["rfc9999.xml"], npt.loader.InputFile(".xml", self.document))
+            self.assertIsNone(docs["rfc9998.xml"])
+            self.assertEqual(docs["examples/draft-mcquistin-augmented-udp-example-00.xml"], npt.loader.InputFile(".xml", self.document))
+            self.assertEqual(sorted(self.server.requests), [("/rfc/rfc9998.xml", 404), ("/rfc/rfc9999.xml", 200)])
+            self.assertIs(npt.http_cache.http_session(), npt.http_cache.http_session())
+        finally:
+            npt.loader.RFC_EDITOR_URL, npt.http_cache._http_cache = saved
+
+
+    def test_http_cache_prefetch_exit(self) -> None:
+        saved = (npt.loader.RFC_EDITOR_URL, npt.loader.DataTracker, npt.http_cache._http_cache)
+        try:
+            npt.loader.RFC_EDITOR_URL   = self.server.url
+            npt.loader.DataTracker      = ExitingDataTracker # type: ignore
+            npt.http_cache._http_cache  = HTTPCache()
+            docs = npt.loader.prefetch(["draft-ietf-example-protocol", "rfc9999.xml"])
+            self.assertIsNone(docs["draft-ietf-example-protocol"])
+            self.assertEqual(docs["rfc9999.xml"], npt.loader.InputFile(".xml", self.document))
+        finally:
+            npt.loader.RFC_EDITOR_URL, npt.loader.DataTracker, npt.http_cache._http_cache = saved # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -78,6 +78,32 @@ class Test_Parse_Draft_McQuistin_Augmented_Ascii_Diagrams(unittest.TestCase):
             if back is not None :
                 self._verify_rfc_dom_back(back)
 
+    def test_xml_rfc_stream(self):
+        with open("examples/draft-mcquistin-augmented-ascii-diagrams-08.xml" , 'rb') as fd:
+            node = npt.parser_rfc_xml.parse_rfc_stream(fd)
+            self.assertEqual(node.docName, "draft-mcquistin-augmented-ascii-diagrams-08")
+            self._verify_rfc_middle(node.middle)
+            self.assertEqual(node.front.title.content.content.strip(), "Describing Protocol Data Units with Augmented Packet Header Diagrams")
+            self.assertEqual(node.front.authors, [])
+            self.assertIsNone(node.back)
+
+    def test_xml_rfc_stream_front_and_back(self):
+        with open("examples/draft-mcquistin-augmented-ascii-diagrams-08.xml" , 'rb') as fd:
+            xml_tree = ET.fromstring(fd.read())
+            fd.seek(0)
+            node = npt.parser_rfc_xml.parse_rfc_stream(fd, front_and_back=True)
+            self.assertEqual(node, npt.parser_rfc_xml.parse_rfc(xml_tree))
+
+    def test_xml_content_model(self):
+        for model, slots in npt.parser_rfc_xml.CONTENT_MODEL.items():
+            self.assertTrue(hasattr(npt.parser_rfc_xml, "parse_" + model.lower()))
+            self.assertEqual(set(npt.parser_rfc_xml.DISPATCH[model]), {tag for tags in slots.values() for tag in tags})
+        section = npt.parser_rfc_xml.parse_section(ET.fromstring(
+            "<section anchor='s'><name>Title</name><t>One</t><unknown/><artwork>Two</artwork><section><t>Three</t></section></section>"))
+        self.assertEqual(section.name, rfc.Name([rfc.Text("Title")]))
+        self.assertEqual([type(elem) for elem in section.content], [rfc.T, rfc.Artwork])
+        self.assertEqual([len(s.content) for s in section.sections or []], [1])
+
     def test_txt_rfc_root(self):
         with open("examples/draft-mcquistin-augmented-ascii-diagrams-08.txt" , 'r') as fd:
             content = fd.readlines()
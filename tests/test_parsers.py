@@ -30,6 +30,7 @@
 
 import os
 import sys
+import tempfile
 import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -44,7 +45,8 @@ import npt.parser_rfc_txt
 import npt.parser_rfc_xml
 
 from npt.parser               import Parser
-from npt.parser_asciidiagrams import AsciiDiagramsParser
+from npt.parser_asciidiagrams import AsciiDiagramsParser, DiagramCache, GRAMMAR_FILE, compiled_grammar
+from pathlib                  import Path
 
 class TestParsers(unittest.TestCase):
     def setUp(self):
@@ -59,3 +61,68 @@ class TestParsers(unittest.TestCase):
         self.assertEqual(protocol.get_protocol_name(),  "Example")
         self.assertEqual(len(protocol.get_pdu_names()), 4)
         #TODO
+
+    def test_asciidiagram_classify_statement(self):
+        parser = AsciiDiagramsParser()
+        self.assertEqual(parser.classify_statement("An Example PDU is formatted as follows:"), ["preamble"])
+        self.assertEqual(parser.classify_statement("A Flag is either a Set Flag or a Clear Flag."), ["enum"])
+        self.assertEqual(parser.classify_statement("The checksum function is defined as:"), ["function"])
+        self.assertEqual(parser.classify_statement("This field carries the source port."), [])
+
+    def test_asciidiagram_probe_counts(self):
+        ascii_diagram_parser = AsciiDiagramsParser()
+        ascii_diagram_parser.build_protocol(None, self.content)
+        self.assertEqual(ascii_diagram_parser.probe_hits["protocol_definition"], 1)
+        for rule, hits in ascii_diagram_parser.probe_hits.items():
+            self.assertLessEqual(hits, ascii_diagram_parser.probe_attempts[rule])
+
+    def test_asciidiagram_diagram_cache(self):
+        diagram = """
+    0                   1
+    0 1 2 3 4 5 6 7 8 9 0 1 2 3 4 5
+   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+   |          Source Port          |
+   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+"""
+        parser = AsciiDiagramsParser()
+        parser.proto = Protocol()
+        parser.diagram_cache = DiagramCache(max_entries=1)
+        grammar = parser.build_parser()
+        fields = parser.process_diagram(diagram, grammar)
+        self.assertEqual(fields, [(16, "Source Port")])
+        self.assertEqual(len(parser.diagram_cache._entries), 1)
+        # A cached diagram is not parsed again
+        self.assertEqual(parser.process_diagram(diagram, None), fields)
+        # Only max_entries diagrams are held in memory
+        parser.process_diagram(diagram.replace("Source", "Target"), grammar)
+        self.assertEqual(len(parser.diagram_cache._entries), 1)
+
+    def test_asciidiagram_diagram_cache_db(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "diagrams.sqlite"
+            DiagramCache(db_path=db_path).put("key", [("var", "Options"), (16, "Source Port")])
+            self.assertEqual(DiagramCache(db_path=db_path).get("key"), [("var", "Options"), (16, "Source Port")])
+            self.assertIsNone(DiagramCache(db_path=db_path).get("other"))
+
+    def test_asciidiagram_grammar_cache(self):
+        # The grammar is compiled once, but each parser binds its own callbacks
+        self.assertIs(compiled_grammar(GRAMMAR_FILE), compiled_grammar(GRAMMAR_FILE))
+        parser1 = AsciiDiagramsParser()
+        parser1.proto = Protocol()
+        parser2 = AsciiDiagramsParser()
+        parser2.proto = Protocol()
+        grammar1 = parser1.build_parser()
+        grammar2 = parser2.build_parser()
+        self.assertIsNot(grammar1._grammarClass, grammar2._grammarClass)
+        self.assertIs(grammar1._grammarClass.globals["protocol"], parser1.proto)
+        self.assertIs(grammar2._grammarClass.globals["protocol"], parser2.proto)
+        self.assertEqual(grammar1("An Example PDU is formatted as follows:").preamble(), "Example PDU")
+
+    def test_asciidiagram_grammar_cache_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            grammar_file = Path(tmpdir) / "grammar.txt"
+            with open(grammar_file, "w") as outf:
+                outf.write("digits = <digit+>:ds -> int(ds)\n")
+            cache_dir = Path(tmpdir) / "cache"
+            compiled_grammar(grammar_file, cache_dir)
+            self.assertEqual(len(list(cache_dir.glob("grammar-*.py"))), 1)
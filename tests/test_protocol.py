@@ -34,6 +34,7 @@ import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import gc
 import re
 from npt.protocol import *
 
@@ -431,6 +432,98 @@ class TestProtocol(unittest.TestCase):
         self.assertEqual(str(pte.exception), "Cannot create IfElseExpression: branch types differ")
 
 
+    def test_simplify_expression(self):
+        def binary(target, method_name, other):
+            return MethodInvocationExpression(target, method_name, [ArgumentExpression("other", other)])
+
+        struct = Struct("Test", [StructField("length", BitString("Length", ConstantExpression(Number(), 8)))], [], [])
+        length = MethodInvocationExpression(FieldAccessExpression(SelfExpression(), "length"), "to_number", [])
+        size = ConstantExpression(Number(), 2)
+        for term in [binary(length, "multiply", ConstantExpression(Number(), 8)), ConstantExpression(Number(), 1), ConstantExpression(Number(), 4)]:
+            size = binary(size, "plus", term)
+
+        self.assertIs(simplify_expression(size), binary(ConstantExpression(Number(), 7), "plus", binary(length, "multiply", ConstantExpression(Number(), 8))))
+        self.assertIs(simplify_expression(binary(binary(length, "multiply", ConstantExpression(Number(), 32)), "divide", ConstantExpression(Number(), 8))),
+                      binary(length, "multiply", ConstantExpression(Number(), 4)))
+        self.assertIs(simplify_expression(binary(binary(length, "multiply", ConstantExpression(Number(), 8)), "divide", ConstantExpression(Number(), 8))), length)
+        self.assertIs(simplify_expression(binary(binary(length, "multiply", ConstantExpression(Number(), 4)), "divide", ConstantExpression(Number(), 8))),
+                      binary(binary(length, "multiply", ConstantExpression(Number(), 4)), "divide", ConstantExpression(Number(), 8)))
+        self.assertIs(simplify_expression(binary(binary(length, "minus", ConstantExpression(Number(), 5)), "plus", ConstantExpression(Number(), 5))),
+                      binary(ConstantExpression(Number(), 5), "plus", binary(length, "minus", ConstantExpression(Number(), 5))))
+        self.assertEqual(cached_result_type(simplify_expression(size), struct), Number())
+
+
+    def test_simplify_expression_deep_chain(self):
+        size : Expression = ConstantExpression(Number(), 0)
+        for i in range(5 * sys.getrecursionlimit()):
+            size = MethodInvocationExpression(size, "plus", [ArgumentExpression("other", ConstantExpression(Number(), 8))])
+
+        self.assertIs(simplify_expression(size), ConstantExpression(Number(), 40 * sys.getrecursionlimit()))
+
+
+    def test_field_dependencies(self):
+        # self.a + self.b < self.a + self.ab
+        left  = MethodInvocationExpression(FieldAccessExpression(SelfExpression(), "a"), "plus", [ArgumentExpression("other", FieldAccessExpression(SelfExpression(), "b"))])
+        right = MethodInvocationExpression(FieldAccessExpression(SelfExpression(), "a"), "plus", [ArgumentExpression("other", FieldAccessExpression(SelfExpression(), "ab"))])
+        constraint = MethodInvocationExpression(left, "lt", [ArgumentExpression("other", right)])
+
+        self.assertEqual(field_dependencies(constraint), ["a", "b", "ab"])
+        self.assertEqual(field_dependencies(ContextAccessExpression(Context("Context"), "a")), [])
+
+
+    def test_cached_result_type(self):
+        evaluated = []
+
+        @dataclass(frozen=True)
+        class CountingExpression(Expression):
+            value: int
+
+            def result_type(self, containing_type: Optional[ProtocolType]) -> ProtocolType:
+                evaluated.append(self.value)
+                return Number()
+
+        ifelse_expression = IfElseExpression(ConstantExpression(Boolean(), True), CountingExpression(1), CountingExpression(2))
+
+        self.assertEqual(cached_result_type(ifelse_expression, None), Number())
+        self.assertEqual(cached_result_type(ifelse_expression, None), Number())
+        self.assertEqual(ifelse_expression.result_type(None), Number())
+        self.assertEqual(evaluated, [1, 2])
+
+
+    def test_cached_result_type_deep_chain(self):
+        size : Expression = ConstantExpression(Number(), 0)
+        for i in range(5 * sys.getrecursionlimit()):
+            size = MethodInvocationExpression(size, "plus", [ArgumentExpression("other", ConstantExpression(Number(), 8))])
+
+        self.assertEqual(cached_result_type(size, None), Number())
+        self.assertEqual(size.result_type(None), Number())
+
+
+    def test_cached_result_type_collected(self):
+        # The interned constraint outlives the struct, but must not keep it alive
+        constraint = ConstantExpression(Boolean(), True)
+        struct = Struct("Collected", [StructField("test", Nothing())], [constraint], [])
+        self.assertEqual(cached_result_type(constraint, struct), Boolean())
+
+        del struct
+        gc.collect()
+        self.assertEqual([obj for obj in gc.get_objects() if isinstance(obj, Struct) and obj.name == "Collected"], [])
+
+
+    def test_interned_expressions(self):
+        context = Context("Context")
+        expr1 = MethodInvocationExpression(ContextAccessExpression(context, "data_size"), "minus", [ArgumentExpression("other", ConstantExpression(Number(), 8))])
+        expr2 = MethodInvocationExpression(ContextAccessExpression(context, "data_size"), "minus", [ArgumentExpression("other", ConstantExpression(Number(), 8))])
+
+        self.assertIs(expr1, expr2)
+        self.assertEqual(hash(expr1), hash(expr2))
+        self.assertIs(SelfExpression(), SelfExpression())
+        self.assertIsNot(ConstantExpression(Number(), 1), ConstantExpression(Boolean(), True))
+        self.assertIsNot(ConstantExpression(Number(), 1), ConstantExpression(Number(), 2))
+        self.assertIsNot(ContextAccessExpression(context, "data_size"), ContextAccessExpression(Context("Context"), "data_size"))
+        self.assertEqual(len({expr1, expr2, ConstantExpression(Number(), 8)}), 2)
+
+
     def test_self_expression(self):
         self_expression = SelfExpression()
 
@@ -579,6 +672,33 @@ class TestProtocol(unittest.TestCase):
         self.assertEqual(bitstring.traits[4], test_trait)
 
 
+    def test_bitstring_shared_methods(self):
+        bitstring1 = BitString("Test", ConstantExpression(Number(), 1))
+        bitstring2 = BitString("Tester", ConstantExpression(Number(), 2))
+
+        self.assertIs(bitstring1.traits[1], bitstring2.traits[1])
+        self.assertIs(bitstring1.methods["get"].return_type, bitstring1)
+        self.assertIs(bitstring2.methods["get"].return_type, bitstring2)
+        self.assertEqual(list(bitstring1.methods), ["size", "get", "set", "eq", "ne", "to_number"])
+        self.assertFalse(hasattr(bitstring1, "__dict__"))
+        self.assertFalse(hasattr(StructField("test", bitstring1), "__dict__"))
+
+
+    def test_get_method(self):
+        bitstring = BitString("Test", ConstantExpression(Number(), 1))
+        child = ProtocolType(parent=bitstring)
+
+        self.assertIs(bitstring.get_method("eq"), bitstring.get_method("eq"))
+        self.assertIs(child.get_method("eq").parameters[0].param_type, bitstring)
+        self.assertIs(Value().method_table["get"], Value().methods[0])
+
+        with self.assertRaises(ProtocolTypeError) as pte:
+            child.get_method("plus")
+
+        bitstring.implement_trait(ArithmeticOps())
+        self.assertIs(bitstring.get_method("plus").return_type, bitstring)
+
+
     # ---------------------------------------------------------------------------------------------
     # Test cases for Option:
 
@@ -1191,6 +1311,64 @@ class TestProtocol(unittest.TestCase):
 
         self.assertTrue(context.get_fields(), [cf])
 
+    # ---------------------------------------------------------------------------------------------
+    # Test cases for Protocol:
+
+    def test_protocol_topological_sort(self):
+        bits = BitString("Bits", ConstantExpression(Number(), 8))
+        array = Array("Bytes", bits, ConstantExpression(Number(), 4))
+        header = Struct("Header", [StructField("first", bits), StructField("second", array)], [], [])
+        packet = Struct("Packet", [StructField("header", header), StructField("payload", array)], [], [])
+        protocol = Protocol()
+        protocol.add_type(bits)
+        protocol.add_type(array)
+        protocol.add_type(header)
+        protocol.add_type(packet)
+        protocol.define_pdu("Packet")
+
+        self.assertEqual(protocol.topological_sort(), ["Bits", "Bytes", "Header", "Packet", "Context"])
+
+
+    def test_protocol_topological_sort_deep(self):
+        protocol = Protocol()
+        bits = BitString("Bits", ConstantExpression(Number(), 8))
+        protocol.add_type(bits)
+        element : RepresentableType = bits
+        depth = 5 * sys.getrecursionlimit()
+        for i in range(depth):
+            array = Array(f"Nested{i}", element, ConstantExpression(Number(), 1))
+            protocol.add_type(array)
+            element = array
+        protocol.define_pdu(f"Nested{depth - 1}")
+
+        type_names = protocol.topological_sort()
+        self.assertEqual(len(type_names), depth + 2)
+        self.assertEqual(type_names[:2], ["Bits", "Nested0"])
+        self.assertEqual(type_names[-2:], [f"Nested{depth - 1}", "Context"])
+
+
+    def test_protocol_synthesise_incremental(self):
+        header = Struct("Header", [StructField("first", BitString("Bits", ConstantExpression(Number(), 8)))], [], [])
+        protocol = Protocol()
+        protocol.add_type(header)
+        protocol.synthesise()
+        parse_from = header.parse_from
+
+        payload = BitString("Payload", None)
+        packet = Struct("Packet", [StructField("header", header), StructField("payload", payload)], [], [])
+        protocol.add_type(packet)
+        protocol.synthesise()
+
+        self.assertIs(header.parse_from, parse_from)
+        self.assertIsNotNone(packet.parse_from)
+        self.assertEqual(payload.size, MethodInvocationExpression(ContextAccessExpression(protocol.get_context(), "data_size"), "minus", [ArgumentExpression("other", ConstantExpression(Number(), 8))]))
+
+        trailer = BitString("Trailer", None)
+        header.add_field(StructField("trailer", trailer))
+        protocol.synthesise()
+
+        self.assertEqual(trailer.size, MethodInvocationExpression(ContextAccessExpression(protocol.get_context(), "data_size"), "minus", [ArgumentExpression("other", ConstantExpression(Number(), 8))]))
+
 # =================================================================================================
 if __name__ == "__main__":
     unittest.main()
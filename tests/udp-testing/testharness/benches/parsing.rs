@@ -0,0 +1,36 @@
+// Throughput of the generated UDP parser, in packets per second, over the packets in the test
+// pcaps. Generate the parser with `-f rust-zerocopy` rather than `-f rust` to measure the
+// zero-copy mode, in which the payload is borrowed from the packet rather than copied.
+
+extern crate criterion;
+extern crate draft_mcquistin_augmented_udp_example_00;
+extern crate pcap;
+
+use criterion::{black_box, criterion_group, criterion_main, Criterion, Throughput};
+use draft_mcquistin_augmented_udp_example_00::*;
+use pcap::Capture;
+
+fn load_packets(filename: &str) -> Vec<Vec<u8>> {
+    let mut cap = Capture::from_file(filename).unwrap();
+    let mut packets = Vec::new();
+    while let Ok(packet) = cap.next() {
+        packets.push(packet.data.to_vec());
+    }
+    packets
+}
+
+fn bench_parse_pdu(c: &mut Criterion) {
+    let packets = load_packets("../pcaps/udp-valid-1.pcap");
+    let mut group = c.benchmark_group("udp");
+    group.throughput(Throughput::Elements(packets.len() as u64));
+    group.bench_function("parse_pdu", |b| b.iter(|| {
+        for packet in &packets {
+            let mut context = Context { data_size: packet.len() as u32 };
+            black_box(parse_pdu((black_box(&packet[..]), 0), &mut context).0.is_ok());
+        }
+    }));
+    group.finish();
+}
+
+criterion_group!(benches, bench_parse_pdu);
+criterion_main!(benches);